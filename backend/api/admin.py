@@ -1,10 +1,35 @@
+from datetime import datetime, time, timedelta
+
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.db.models.expressions import RawSQL
+from django.http import Http404, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from . import archive, export, search
+from .changelist import HighVolumeAdminMixin, update_in_chunks
 from .models import (
     PersonalInfo, About, SocialLink, Contact, Project, 
-    Skill, Experience, Certification, Education
+    Skill, Experience, Certification, Education, OutboxEmail, BlockedSender,
+    Technology
 )
 
 
+class FullTextSearchMixin:
+    """
+    Search the model's full-text index instead of LIKE over search_fields
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        kind = search.KINDS[self.model]
+        if search.backend() is None or not search.terms(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=RawSQL(*search.matching_ids(kind, search_term))), False
+
+
 @admin.register(PersonalInfo)
 class PersonalInfoAdmin(admin.ModelAdmin):
     list_display = ['name', 'title', 'email', 'is_active']
@@ -34,23 +59,88 @@ class SocialLinkAdmin(admin.ModelAdmin):
     ordering = ['order']
 
 
+class ArchiveSearchForm(forms.Form):
+    q = forms.CharField(label='Words', required=False)
+    email = forms.CharField(required=False)
+    since = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+    until = forms.DateField(required=False, widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def filters(self):
+        def start_of(day):
+            return timezone.make_aware(datetime.combine(day, time.min)) if day else None
+
+        data = self.cleaned_data
+        until = data['until'] and data['until'] + timedelta(days=1)
+        return {'query': data['q'], 'email': data['email'], 'since': start_of(data['since']), 'until': start_of(until)}
+
+
 @admin.register(Contact)
-class ContactAdmin(admin.ModelAdmin):
-    list_display = ['name', 'email', 'subject', 'created_at', 'is_read']
-    list_filter = ['is_read', 'created_at']
+class ContactAdmin(HighVolumeAdminMixin, FullTextSearchMixin, admin.ModelAdmin):
+    list_display = ['name', 'email', 'subject', 'created_at', 'is_read', 'is_spam']
+    list_filter = ['is_read', 'is_spam', 'created_at']
     search_fields = ['name', 'email', 'subject']
     readonly_fields = ['created_at']
-    ordering = ['-created_at']
+    date_hierarchy = 'created_at'
+    keyset_ordering = ('-created_at', '-id')
+    change_list_template = 'admin/api/contact/change_list.html'
+    archive_results = 100
+    
+    def get_urls(self):
+        # Archived messages are read from api/archive.py segments on demand
+        return [
+            path('archive/', self.admin_site.admin_view(self.archive_view), name='api_contact_archive'),
+            path(
+                'archive/<int:pk>/', self.admin_site.admin_view(self.archived_view),
+                name='api_contact_archived',
+            ),
+        ] + super().get_urls()
+    
+    def archive_context(self, request, title):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        return {**self.admin_site.each_context(request), 'opts': self.model._meta, 'title': title}
+    
+    def archive_view(self, request):
+        context = self.archive_context(request, 'Archived messages')
+        form = ArchiveSearchForm(request.GET or None)
+        if form.is_valid() and any(form.cleaned_data.values()):
+            context['results'] = archive.find(**form.filters(), limit=self.archive_results)
+        context['form'] = form
+        context['limit'] = self.archive_results
+        return TemplateResponse(request, 'admin/api/contact/archive.html', context)
+    
+    def archived_view(self, request, pk):
+        context = self.archive_context(request, 'Archived message')
+        message = archive.get(pk)
+        if message is None:
+            raise Http404('No archived message with this id')
+        context['message'] = message
+        return TemplateResponse(request, 'admin/api/contact/archived.html', context)
     
     def mark_as_read(self, request, queryset):
-        queryset.update(is_read=True)
+        updated = update_in_chunks(queryset, is_read=True)
+        self.message_user(request, f"Marked {updated} messages as read.")
     mark_as_read.short_description = "Mark selected messages as read"
     
-    actions = [mark_as_read]
+    def block_senders(self, request, queryset):
+        emails = {email.strip().lower() for email in queryset.values_list('email', flat=True).distinct()}
+        for email in emails:
+            BlockedSender.objects.get_or_create(value=email, defaults={'reason': 'Blocked from admin'})
+        update_in_chunks(queryset, is_spam=True)
+    block_senders.short_description = "Block senders and mark as spam"
+    
+    def export_csv(self, request, queryset):
+        return StreamingHttpResponse(
+            export.stream(queryset), content_type=export.CONTENT_TYPES['csv'],
+            headers={'Content-Disposition': 'attachment; filename="contacts.csv"'},
+        )
+    export_csv.short_description = "Export selected messages as CSV"
+    
+    actions = [mark_as_read, block_senders, export_csv]
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'status', 'is_featured', 'created_at']
     list_filter = ['status', 'is_featured', 'created_at']
     search_fields = ['title', 'description']
@@ -59,7 +149,7 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(Skill)
-class SkillAdmin(admin.ModelAdmin):
+class SkillAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['name', 'category', 'level', 'icon']
     list_filter = ['category']
     search_fields = ['name']
@@ -67,7 +157,7 @@ class SkillAdmin(admin.ModelAdmin):
 
 
 @admin.register(Experience)
-class ExperienceAdmin(admin.ModelAdmin):
+class ExperienceAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ['title', 'company', 'start_date', 'end_date', 'is_current']
     list_filter = ['is_current', 'company']
     search_fields = ['title', 'company']
@@ -88,3 +178,30 @@ class EducationAdmin(admin.ModelAdmin):
     list_filter = ['is_current', 'institution']
     search_fields = ['degree', 'institution']
     ordering = ['-start_date']
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'created_at', 'attempts', 'next_attempt_at', 'sent_at', 'failed_at']
+    list_filter = ['sent_at', 'failed_at']
+    search_fields = ['subject']
+    readonly_fields = ['created_at', 'attempts', 'last_error', 'claim', 'sent_at', 'failed_at']
+
+
+@admin.register(BlockedSender)
+class BlockedSenderAdmin(admin.ModelAdmin):
+    list_display = ['value', 'reason', 'created_at']
+    search_fields = ['value']
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'project_count', 'experience_count', 'created_at']
+    search_fields = ['key']
+    
+    def has_add_permission(self, request):
+        # Maintained from the technologies lists of projects and experience
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,333 @@
+"""
+Tiered storage of old contact messages.
+
+``manage.py archive_contacts`` moves read messages older than
+``API_CONTACT_ARCHIVE_DAYS`` out of the Contact table into append-only
+segment files in ``API_CONTACT_ARCHIVE_DIR``, so the live table only holds
+the messages anyone still looks at.
+
+A segment ``contacts-<time>-<id>.ndjson.gz`` holds up to SEGMENT_ROWS
+messages, oldest first, one JSON object per line. Every BLOCK_ROWS lines
+are a separate gzip member: the members together are a plain gzip file
+(``zcat`` reads it), and the sidecar ``<segment>.index.json`` records each
+block's byte range, ``created_at`` range, id range and a Bloom filter of
+its sender emails, so a lookup decompresses only the blocks that can match.
+Segments are never changed once written.
+
+A run writes the segment and its index under temporary names, fsyncs and
+renames them, then deletes the archived rows CHUNK_SIZE per transaction.
+Until the deletes finish a ``<segment>.pending`` marker stays next to it,
+and the next run completes them first, so a crash never archives a message
+twice. The directory must be on persistent storage.
+"""
+import base64
+import fcntl
+import gzip
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import search
+from .cache import bump_version, scope_for_model
+from .models import Contact, ContactFingerprint
+from .spam import BloomFilter
+
+FIELDS = (
+    'id', 'name', 'email', 'subject', 'message', 'created_at', 'updated_at',
+    'is_read', 'is_spam', 'submission_id',
+)
+SEGMENT_ROWS = 100_000
+BLOCK_ROWS = 1000
+# Rows deleted per transaction
+CHUNK_SIZE = 1000
+SUFFIX = '.ndjson.gz'
+
+
+class ArchiveBusy(Exception):
+    """
+    Another process is archiving into the same directory
+    """
+
+
+def archive_dir():
+    return Path(settings.API_CONTACT_ARCHIVE_DIR)
+
+
+def email_key(email):
+    return (email or '').strip().lower()
+
+
+def index_path(segment):
+    return segment.with_name(segment.name[:-len(SUFFIX)] + '.index.json')
+
+
+def pending_path(segment):
+    return segment.with_name(segment.name[:-len(SUFFIX)] + '.pending')
+
+
+def write_durably(path, data):
+    temporary = path.with_name('.tmp-' + path.name)
+    with open(temporary, 'wb') as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def sync_dir(directory):
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+@contextmanager
+def locked():
+    directory = archive_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'archive.lock', 'w') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ArchiveBusy(f'{directory} is locked by another archive run')
+        yield directory
+
+
+def archivable(cutoff):
+    # Oldest first, read backwards along contact_created_id_idx
+    return Contact.objects.filter(is_read=True, created_at__lt=cutoff).order_by('created_at', 'id')
+
+
+def encode_value(value):
+    # Full precision, unlike DjangoJSONEncoder's milliseconds
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def encode_block(rows):
+    lines = ''.join(json.dumps(row, default=encode_value, separators=(',', ':')) + '\n' for row in rows)
+    emails = BloomFilter(len(rows))
+    for row in rows:
+        emails.add(email_key(row['email']))
+    data = gzip.compress(lines.encode(), mtime=0)
+    return data, {
+        'rows': len(rows),
+        'first': rows[0]['created_at'].isoformat(),
+        'last': rows[-1]['created_at'].isoformat(),
+        'min_id': min(row['id'] for row in rows),
+        'max_id': max(row['id'] for row in rows),
+        'emails': base64.b64encode(bytes(emails.bits)).decode(),
+    }
+
+
+def write_segment(directory, rows, block_rows=BLOCK_ROWS):
+    """
+    Write ``rows`` (oldest first) as a new segment; return its path and ids
+    """
+    name = f"contacts-{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}{SUFFIX}"
+    segment = directory / name
+    temporary = directory / ('.tmp-' + name)
+    blocks, offset = [], 0
+    with open(temporary, 'wb') as file:
+        for start in range(0, len(rows), block_rows):
+            data, block = encode_block(rows[start:start + block_rows])
+            file.write(data)
+            blocks.append({'offset': offset, 'length': len(data), **block})
+            offset += len(data)
+        file.flush()
+        os.fsync(file.fileno())
+    ids = [row['id'] for row in rows]
+    index = {
+        'rows': len(rows),
+        'first': blocks[0]['first'],
+        'last': blocks[-1]['last'],
+        'blocks': blocks,
+    }
+    # The marker goes first: a segment without index or deletes is unfinished
+    write_durably(pending_path(segment), b'')
+    os.replace(temporary, segment)
+    write_durably(index_path(segment), json.dumps(index).encode())
+    sync_dir(directory)
+    return segment, ids
+
+
+def delete_contacts(ids):
+    """
+    Delete the contacts ``ids`` and the rows derived from them, in chunks
+    """
+    quote_name = connection.ops.quote_name
+    deleted = 0
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        # Raw deletes: Model.delete() would load every row to send signals.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote_name(ContactFingerprint._meta.db_table)} '
+                f'WHERE {quote_name("contact_id")} IN ({placeholders})', chunk,
+            )
+            cursor.execute(
+                f'DELETE FROM {quote_name(Contact._meta.db_table)} WHERE {quote_name("id")} IN ({placeholders})',
+                chunk,
+            )
+            deleted += cursor.rowcount
+            search.remove(Contact, chunk)
+    if deleted:
+        bump_version(scope_for_model(Contact))
+    return deleted
+
+
+def finish_pending(directory):
+    """
+    Complete the deletes of segments left by an interrupted run
+    """
+    for temporary in directory.glob('.tmp-contacts-*'):
+        temporary.unlink()
+    deleted = 0
+    for marker in sorted(directory.glob('contacts-*.pending')):
+        segment = marker.with_name(marker.name[:-len('.pending')] + SUFFIX)
+        if index_path(segment).exists():
+            deleted += delete_contacts([row['id'] for row in read_rows(segment)])
+        else:
+            # Interrupted before the index was written: nothing was deleted
+            segment.unlink(missing_ok=True)
+        marker.unlink()
+    return deleted
+
+
+def archive(cutoff=None, segment_rows=SEGMENT_ROWS, block_rows=BLOCK_ROWS):
+    """
+    Move read contacts created before ``cutoff`` into new segments.
+
+    ``cutoff`` defaults to ``API_CONTACT_ARCHIVE_DAYS`` ago. Returns the
+    number of messages archived and of segments written.
+    """
+    if cutoff is None:
+        cutoff = timezone.now() - timedelta(days=settings.API_CONTACT_ARCHIVE_DAYS)
+    archived = written = 0
+    with locked() as directory:
+        finish_pending(directory)
+        while True:
+            rows = list(archivable(cutoff).values(*FIELDS)[:segment_rows])
+            if not rows:
+                return archived, written
+            segment, ids = write_segment(directory, rows, block_rows)
+            delete_contacts(ids)
+            pending_path(segment).unlink()
+            archived += len(rows)
+            written += 1
+
+
+_indexes = {}
+
+
+def load_index(segment):
+    # Indexes never change once written, so each is parsed once per process
+    index = _indexes.get(segment.name)
+    if index is None:
+        index = json.loads(index_path(segment).read_text())
+        for block in index['blocks']:
+            block['first'] = parse_datetime(block['first'])
+            block['last'] = parse_datetime(block['last'])
+        _indexes[segment.name] = index
+    return index
+
+
+def segments():
+    """
+    Finished segments, newest first
+    """
+    directory = archive_dir()
+    if not directory.is_dir():
+        return []
+    found = [
+        path for path in directory.glob('contacts-*' + SUFFIX)
+        if index_path(path).exists() and not pending_path(path).exists()
+    ]
+    return sorted(found, reverse=True)
+
+
+def read_block(segment, block):
+    with open(segment, 'rb') as file:
+        file.seek(block['offset'])
+        data = gzip.decompress(file.read(block['length']))
+    rows = []
+    for line in data.decode().splitlines():
+        row = json.loads(line)
+        row['created_at'] = parse_datetime(row['created_at'])
+        row['updated_at'] = parse_datetime(row['updated_at'])
+        rows.append(row)
+    return rows
+
+
+def read_rows(segment):
+    with gzip.open(segment, 'rt') as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def may_contain(block, email):
+    emails = BloomFilter(block['rows'])
+    emails.bits = bytearray(base64.b64decode(block['emails']))
+    return email in emails
+
+
+def matches_text(row, words):
+    text = search.text(row[name] for name in ('name', 'email', 'subject', 'message'))
+    found = set(search.WORD.findall(text.lower()))
+    return all(any(word.startswith(term) for word in found) for term in words)
+
+
+def find(query='', email=None, since=None, until=None, limit=50):
+    """
+    Archived messages matching every given filter, newest segments first.
+
+    ``query`` words are matched as prefixes like the full-text search,
+    ``email`` exactly but case-insensitively, and ``since``/``until``
+    bound ``created_at`` (inclusive, exclusive).
+    """
+    words = search.terms(query or '')
+    email = email_key(email) or None
+    results = []
+    for segment in segments():
+        for block in reversed(load_index(segment)['blocks']):
+            if since is not None and block['last'] < since:
+                continue
+            if until is not None and block['first'] >= until:
+                continue
+            if email is not None and not may_contain(block, email):
+                continue
+            for row in reversed(read_block(segment, block)):
+                if since is not None and row['created_at'] < since:
+                    continue
+                if until is not None and row['created_at'] >= until:
+                    continue
+                if email is not None and email_key(row['email']) != email:
+                    continue
+                if words and not matches_text(row, words):
+                    continue
+                results.append(row)
+                if len(results) >= limit:
+                    return results
+    return results
+
+
+def get(pk):
+    """
+    The archived message with id ``pk``, or None
+    """
+    for segment in segments():
+        for block in load_index(segment)['blocks']:
+            if block['min_id'] <= pk <= block['max_id']:
+                for row in read_block(segment, block):
+                    if row['id'] == pk:
+                        return row
+    return None
@@ -0,0 +1,64 @@
+"""
+Async counterparts of the snapshot cache in api/cache.py, for the ASGI views.
+
+Versions and sections live in the same cache and process snapshots as
+those of the sync views; only the waiting differs. The version comes from
+``cache.aget`` and each section declared with ``query_section`` reads its
+rows through the async ORM, so a request waiting on the database holds no
+thread of its own; other sections are built in a worker thread.
+Django runs async ORM calls on the request's sync thread, one at a time, so
+``asyncio.gather`` overlaps a view's cache reads and section builds but not
+its queries.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .cache import (
+    QUERY_SECTIONS, SECTIONS, MISSING, VERSION_KEY, Version,
+    cached_section, fingerprint_query, get_snapshot, section_key,
+    store_section, version_of,
+)
+from .compiled import compile_serializer
+from .metrics import record_cache
+
+
+async def aget_version(scope):
+    """
+    ``get_version`` without blocking the event loop
+    """
+    key = VERSION_KEY.format(scope=scope)
+    version = await cache.aget(key)
+    record_cache('version', version is not None)
+    if version is None:
+        rows = [row async for row in fingerprint_query(scope)]
+        await cache.aadd(key, tuple(version_of(rows)), None)
+        version = await cache.aget(key)
+    return Version(*version)
+
+
+async def aget_section(name, request=None):
+    """
+    ``get_section`` without blocking the event loop
+    """
+    scope, builder = SECTIONS[name]
+    snapshot = get_snapshot(scope, await aget_version(scope))
+    key = section_key(name, request)
+    data = cached_section(snapshot, key)
+    if data is MISSING:
+        context = {'request': request} if request is not None else {}
+        declared = QUERY_SECTIONS.get(name)
+        if declared is not None:
+            rows = await aserialize(declared.serializer_class, declared.queryset(), context)
+            data = declared.finish(rows)
+        else:
+            # The summary is a single query; nothing to overlap
+            data = await sync_to_async(builder)(context)
+        store_section(snapshot, key, data)
+    return data
+
+
+async def aserialize(serializer_class, queryset, context):
+    compiled = compile_serializer(serializer_class)
+    rows = [row async for row in queryset.values_list(*compiled.columns)]
+    return compiled.serialize_rows(rows, context)
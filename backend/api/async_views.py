@@ -0,0 +1,241 @@
+"""
+Async read views, routed in place of the DRF ones under ASGI.
+
+With ``API_ASYNC_VIEWS`` on (portfolio_backend/asgi.py turns it on),
+api/urls.py puts these routes ahead of the sync ones, under the same names.
+They answer from the same snapshot sections and materialized responses with
+the same bytes, but wait on the cache and the database through Django's
+async API (see api/async_sections.py), so a slow query holds a coroutine
+instead of a worker thread.
+
+Requests they do not handle are passed to the sync view in a worker thread:
+other methods, keyset cursors and technology filters. That includes contact
+submissions, whose spam screening and outbox insert run off the event loop.
+The notification email itself is sent later from the outbox.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.urls import path, re_path, reverse
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import views
+from .async_sections import aget_section
+from .compiled import compile_serializer
+from .materialized import amaterialized
+from .models import Certification, Contact, Education, Experience, Project, Skill
+from .serializers import (
+    CertificationSerializer, ContactSerializer, EducationSerializer,
+    ExperienceSerializer, ProjectSerializer, SkillSerializer,
+)
+
+renderer = JSONRenderer()
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    return HttpResponse(renderer.render(data), status=status, content_type='application/json')
+
+
+def page_response(data, request):
+    """
+    The page of ``data`` DRF's default pagination would return
+    """
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    try:
+        page = paginator.paginate_queryset(data, Request(request))
+    except NotFound as error:
+        return json_response({'detail': error.detail}, status=status.HTTP_404_NOT_FOUND)
+    return json_response(paginator.get_paginated_response(page).data)
+
+
+def drf_headers(sync_view):
+    """
+    The headers DRF adds to every response of ``sync_view``: Allow, and
+    Vary: Accept when it has several renderers
+    """
+    instance = sync_view.cls(**sync_view.initkwargs)
+    # Bound as DRF and Django bind them when dispatching
+    for method, action in getattr(sync_view, 'actions', {}).items():
+        setattr(instance, method, getattr(instance, action))
+    if hasattr(instance, 'get') and not hasattr(instance, 'head'):
+        instance.head = instance.get
+    return instance.default_response_headers
+
+
+def sync_fallback(sync_view, params=()):
+    """
+    Send requests with other methods or query parameters to ``sync_view``
+    """
+    fallback = sync_to_async(sync_view)
+    headers = drf_headers(sync_view)
+    vary = headers.pop('Vary', None)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or any(name not in params for name in request.GET):
+                return await fallback(request, *args, **kwargs)
+            response = await view(request, *args, **kwargs)
+            if vary is not None:
+                patch_vary_headers(response, [vary])
+            for header, value in headers.items():
+                response.headers[header] = value
+            return response
+        # Like the DRF views they stand in for; Django 4.2's csrf_exempt
+        # would turn the coroutine function into a sync one.
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+
+def section_list(section, sync_view, scope='content', params=('page',), paginated=True):
+    """
+    Async list view of a snapshot section; ``section`` may pick it per request
+    """
+    @sync_fallback(sync_view, params)
+    @amaterialized(scope, params)
+    async def view(request):
+        name = section(request) if callable(section) else section
+        data = await aget_section(name, request)
+        return page_response(data, request) if paginated else json_response(data)
+    return view
+
+
+def detail(model, serializer_class, sync_view):
+    """
+    Async retrieve view reading one row through ``afirst``
+    """
+    compiled = compile_serializer(serializer_class)
+
+    @sync_fallback(sync_view)
+    async def view(request, pk):
+        try:
+            pk = model._meta.pk.to_python(pk)
+        except ValidationError:
+            row = None
+        else:
+            row = await model._default_manager.filter(pk=pk).values_list(*compiled.columns).afirst()
+        if row is None:
+            return json_response({'detail': NotFound.default_detail}, status=status.HTTP_404_NOT_FOUND)
+        return json_response(compiled.serialize_rows([row], {'request': request})[0])
+    return view
+
+
+def single(section, sync_view, missing=None, failed=None):
+    """
+    Async view of one section, with the error bodies of ``sync_view``: 404
+    with ``missing`` when the section is empty, 500 with ``failed`` (or the
+    exception) when it cannot be built
+    """
+    @sync_fallback(sync_view)
+    @amaterialized('content')
+    async def view(request):
+        try:
+            data = await aget_section(section, request)
+        except Exception as e:
+            return json_response({'error': failed or str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        if missing is not None and not data:
+            return json_response({'error': missing}, status=status.HTTP_404_NOT_FOUND)
+        return json_response(data)
+    return view
+
+
+def bootstrap_view(sync_view):
+    @sync_fallback(sync_view, ('sections',))
+    @amaterialized('content', ('sections',))
+    async def bootstrap(request):
+        requested = request.GET.get('sections')
+        if requested:
+            names = [name.strip() for name in requested.split(',') if name.strip()]
+            unknown = [name for name in names if name not in views.BOOTSTRAP_SECTIONS]
+            if unknown:
+                return json_response(
+                    {'error': f"Unknown sections: {', '.join(unknown)}",
+                     'sections': list(views.BOOTSTRAP_SECTIONS)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            names = list(views.BOOTSTRAP_SECTIONS)
+
+        try:
+            # Every section at once; only the missing ones are built
+            payloads = await asyncio.gather(*(
+                aget_section(views.BOOTSTRAP_SECTIONS[name][0], request) for name in names
+            ))
+            data = {}
+            for name, payload in zip(names, payloads):
+                section, route, query = views.BOOTSTRAP_SECTIONS[name]
+                if route is not None:
+                    payload = views.first_page(payload, request.build_absolute_uri(reverse(route)) + query)
+                data[name] = payload
+            return json_response(data)
+        except Exception:
+            return json_response(
+                {'error': 'Failed to fetch portfolio bootstrap'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    return bootstrap
+
+
+def project_section(request):
+    return 'featured_projects' if request.GET.get('featured') == 'true' else 'projects'
+
+
+# Route prefix -> (model, serializer, list section, list query parameters);
+# the inbox list has no section and stays on the sync keyset view
+LISTS = {
+    'contact': (Contact, ContactSerializer, None, ()),
+    'projects': (Project, ProjectSerializer, project_section, ('featured', 'page')),
+    'skills': (Skill, SkillSerializer, 'skills', ()),
+    'experience': (Experience, ExperienceSerializer, 'experience', ('page',)),
+    'certifications': (Certification, CertificationSerializer, 'certifications', ('page',)),
+    'education': (Education, EducationSerializer, 'education', ('page',)),
+}
+
+
+def urlpatterns_for(router):
+    """
+    Async routes for the sync ones of ``router`` and api/views.py
+    """
+    callbacks = {}
+    for pattern in router.urls:
+        callbacks.setdefault(pattern.name, pattern.callback)
+    basenames = {prefix: basename for prefix, viewset, basename in router.registry}
+
+    patterns = []
+    for prefix, (model, serializer_class, section, params) in LISTS.items():
+        basename = basenames[prefix]
+        if section is not None:
+            patterns.append(re_path(
+                rf'^{prefix}/$',
+                section_list(section, callbacks[f'{basename}-list'], params=params, paginated=model is not Skill),
+                name=f'{basename}-list',
+            ))
+        patterns += [
+            re_path(
+                rf'^{prefix}/(?P<pk>[^/.]+)/$',
+                detail(model, serializer_class, callbacks[f'{basename}-detail']),
+                name=f'{basename}-detail',
+            ),
+        ]
+    return patterns + [
+        path('personal-info/', single('personal_info', views.personal_info, 'Personal info not found'),
+             name='personal-info'),
+        path('about/', single('about', views.about_info, 'About info not found'), name='about-info'),
+        path('social-links/', single('social_links', views.social_links), name='social-links'),
+        path(
+            'portfolio-summary/',
+            single('portfolio_summary', views.portfolio_summary, failed='Failed to fetch portfolio summary'),
+            name='portfolio-summary',
+        ),
+        path('bootstrap/', bootstrap_view(views.bootstrap), name='bootstrap'),
+        path('technologies/', single('technologies', views.technology_facets), name='technologies'),
+    ]
@@ -0,0 +1,375 @@
+"""
+Versioned snapshot cache for the public portfolio API.
+
+Serialized sections are held in process memory and keyed by a content
+version token kept in the shared Django cache. Model signals replace the
+token whenever content changes, so until the next edit a read is a
+dictionary lookup instead of ORM queries and DRF serialization.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import namedtuple
+from operator import itemgetter
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max, Value
+
+from .compiled import compile_serializer
+from .metrics import record_cache
+from .models import (
+    PersonalInfo, About, SocialLink, Contact, Project,
+    Skill, Experience, Certification, Education, BlockedSender, Technology
+)
+from .serializers import (
+    PersonalInfoSerializer, AboutSerializer, SocialLinkSerializer,
+    ProjectSerializer, SkillSerializer,
+    ExperienceSerializer, CertificationSerializer, EducationSerializer,
+    TechnologySerializer
+)
+
+VERSION_KEY = 'api:version:{scope}'
+
+# Contact submissions arrive far more often than portfolio edits, so they get
+# their own version and never invalidate the public content snapshot.
+SCOPES = {
+    'content': (
+        PersonalInfo, About, SocialLink, Project,
+        Skill, Experience, Certification, Education,
+    ),
+    'contacts': (Contact,),
+    # Versions the Bloom filter of api/spam.py; no snapshot sections
+    'blocklist': (BlockedSender,),
+}
+
+SECTIONS = {}
+# Sections that serialize one queryset (see ``query_section``)
+QUERY_SECTIONS = {}
+QuerySection = namedtuple('QuerySection', ['serializer_class', 'queryset', 'finish'])
+# Marks a section not built yet; None is a valid section value
+MISSING = object()
+
+# Rendered responses kept per scope and content version
+MAX_RESPONSES = 1024
+
+# ``modified`` is a Unix timestamp used for Last-Modified headers.
+Version = namedtuple('Version', ['token', 'modified'])
+
+_snapshots = {}
+_lock = threading.Lock()
+
+
+def scope_for_model(model):
+    for scope, models in SCOPES.items():
+        if issubclass(model, models):
+            return scope
+    return None
+
+
+def fingerprint_query(scope):
+    """
+    Row count and newest ``updated_at`` of every model in a scope, as one query
+    """
+    queries = [
+        model.objects.order_by()
+        .annotate(model=Value(model._meta.label))
+        .values('model')
+        .annotate(rows=Count('pk'), modified=Max('updated_at'))
+        for model in SCOPES[scope]
+    ]
+    return queries[0].union(*queries[1:], all=True).values_list('model', 'rows', 'modified')
+
+
+def version_of(rows):
+    rows = sorted(rows)
+    token = hashlib.sha1(repr(rows).encode()).hexdigest()
+    modified = max((row[2].timestamp() for row in rows if row[2]), default=time.time())
+    return Version(token, modified)
+
+
+def fingerprint(scope):
+    """
+    Derive a version from the row counts and newest ``updated_at`` of every
+    model in a scope, in a single query
+    """
+    return version_of(fingerprint_query(scope))
+
+
+def get_version(scope):
+    """
+    Return the current version of a scope.
+
+    Costs no query while the version is cached, and one fingerprint query
+    when it is not.
+    """
+    key = VERSION_KEY.format(scope=scope)
+    version = cache.get(key)
+    record_cache('version', version is not None)
+    if version is None:
+        cache.add(key, tuple(fingerprint(scope)), None)
+        version = cache.get(key)
+    return Version(*version)
+
+
+def bump_version(scope):
+    """
+    Invalidate every snapshot of a scope, in this and all other workers
+    """
+    key = VERSION_KEY.format(scope=scope)
+
+    def bump():
+        cache.set(key, (uuid.uuid4().hex, time.time()), None)
+
+    # Bump now so this process never serves the old snapshot, and again on
+    # commit so other workers cannot keep a snapshot built mid-transaction.
+    bump()
+    transaction.on_commit(bump)
+
+
+def clear_snapshots():
+    with _lock:
+        _snapshots.clear()
+
+
+def section(name, scope='content'):
+    """
+    Register a builder returning the serialized data of a snapshot section
+    """
+    def decorator(builder):
+        SECTIONS[name] = (scope, builder)
+        return builder
+    return decorator
+
+
+def get_snapshot(scope, version=None):
+    """
+    Return the in-process snapshot of a scope, dropping it if outdated
+    """
+    if version is None:
+        version = get_version(scope)
+    snapshot = _snapshots.get(scope)
+    if snapshot is None or snapshot['version'] != version:
+        snapshot = {'version': version, 'sections': {}, 'responses': {}}
+        with _lock:
+            _snapshots[scope] = snapshot
+    return snapshot
+
+
+def get_section(name, request=None):
+    """
+    Return serialized section data for the current content version
+    """
+    scope, builder = SECTIONS[name]
+    snapshot = get_snapshot(scope)
+    key = section_key(name, request)
+    data = cached_section(snapshot, key)
+    if data is MISSING:
+        data = builder({'request': request} if request is not None else {})
+        store_section(snapshot, key, data)
+    return data
+
+
+def section_key(name, request):
+    # Image fields are rendered as absolute URLs of the requesting host.
+    return name, request.build_absolute_uri('/') if request is not None else ''
+
+
+def cached_section(snapshot, key):
+    data = snapshot['sections'].get(key, MISSING)
+    record_cache('section', data is not MISSING)
+    return data
+
+
+def store_section(snapshot, key, data):
+    with _lock:
+        snapshot['sections'][key] = data
+
+
+def get_response(scope, version, key):
+    """
+    Return a materialized ``({coding: content}, headers)`` pair, or None
+    """
+    return get_snapshot(scope, version)['responses'].get(key)
+
+
+def store_response(scope, version, key, variants, headers):
+    responses = get_snapshot(scope, version)['responses']
+    # Bound memory: every distinct URL is a key.
+    if len(responses) < MAX_RESPONSES:
+        with _lock:
+            responses[key] = (variants, headers)
+
+
+def serialize(serializer_class, queryset, context):
+    return compile_serializer(serializer_class).serialize(queryset, context)
+
+
+def query_section(name, serializer_class, finish=None, scope='content'):
+    """
+    Register a section serializing the queryset the decorated function
+    returns, its rows passed through ``finish``.
+
+    The declaration is kept in QUERY_SECTIONS, so api/async_sections.py
+    builds the same section through the async ORM.
+    """
+    def decorator(queryset):
+        declared = QUERY_SECTIONS[name] = QuerySection(serializer_class, queryset, finish or list)
+
+        def build(context):
+            return declared.finish(serialize(serializer_class, queryset(), context))
+
+        section(name, scope)(build)
+        return queryset
+    return decorator
+
+
+def first_row(rows):
+    return rows[0] if rows else None
+
+
+def group_skills(skills):
+    categories = dict(Skill.CATEGORY_CHOICES)
+    skills_by_category = {}
+    for skill in skills:
+        category = categories.get(skill['category'], skill['category'])
+        if category not in skills_by_category:
+            skills_by_category[category] = []
+        skills_by_category[category].append(skill)
+    return skills_by_category
+
+
+def used_technologies(technologies):
+    # Counts change with the projects and experience that hold them, which
+    # already replace the content version. Unused names are left in place.
+    return [row for row in technologies if row['project_count'] or row['experience_count']]
+
+
+@query_section('personal_info', PersonalInfoSerializer, first_row)
+def personal_info_queryset():
+    return PersonalInfo.objects.filter(is_active=True)[:1]
+
+
+@query_section('about', AboutSerializer, first_row)
+def about_queryset():
+    return About.objects.filter(is_active=True)[:1]
+
+
+@query_section('social_links', SocialLinkSerializer)
+def social_links_queryset():
+    return SocialLink.objects.filter(is_active=True).order_by('order')
+
+
+@query_section('projects', ProjectSerializer)
+def projects_queryset():
+    return Project.objects.order_by('-created_at', '-id')
+
+
+@query_section('featured_projects', ProjectSerializer)
+def featured_projects_queryset():
+    return Project.objects.filter(is_featured=True).order_by('-created_at', '-id')
+
+
+# Grouped by category
+@query_section('skills', SkillSerializer, group_skills)
+def skills_queryset():
+    return Skill.objects.all()
+
+
+@query_section('experience', ExperienceSerializer)
+def experience_queryset():
+    return Experience.objects.order_by('-start_date', '-id')
+
+
+@query_section('certifications', CertificationSerializer)
+def certifications_queryset():
+    return Certification.objects.order_by('-date_issued', '-id')
+
+
+@query_section('education', EducationSerializer)
+def education_queryset():
+    return Education.objects.order_by('-start_date', '-id')
+
+
+@query_section('technologies', TechnologySerializer, used_technologies)
+def technologies_queryset():
+    return Technology.objects.order_by('-project_count', '-experience_count', 'name')
+
+
+def counts_and_rows(counted, parts, context):
+    """
+    Count the rows of several tables and read the first rows of several
+    querysets, all in a single query.
+
+    ``parts`` are ``(serializer_class, queryset)`` pairs, each queryset
+    ordered and sliced. Every slice is LEFT JOINed to a one-row anchor and
+    the counts are scalar subqueries; as the result is the cross product of
+    the slices, only the first part may hold more than one row. Returns
+    the counts and the serialized rows of each part, in queryset order.
+    """
+    quote_name = connection.ops.quote_name
+    select = [f'(SELECT COUNT(*) FROM {quote_name(model._meta.db_table)})' for model in counted]
+    joins = []
+    params = []
+    sources = []
+    for index, (serializer_class, queryset) in enumerate(parts):
+        compiled = compile_serializer(serializer_class)
+        compiler = queryset.values_list(*compiled.columns).query.get_compiler(connection=connection)
+        sql, part_params = compiler.as_sql()
+        alias = quote_name(f'part{index}')
+        select.append(f'{alias}.*')
+        joins.append(f'LEFT JOIN ({sql}) AS {alias} ON 1 = 1')
+        params.extend(part_params)
+        sources.append((compiled, compiler, queryset.model._meta.pk.attname))
+
+    sql = f"SELECT {', '.join(select)} FROM (SELECT 1) AS anchor {' '.join(joins)}"
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    start = len(counted)
+    results = []
+    for compiled, compiler, pk in sources:
+        width = len(compiled.columns)
+        key = compiled.columns.index(pk)
+        # Each row of a slice repeats once per row of the first part; an
+        # empty slice reads as one row of NULLs.
+        found = {}
+        for row in rows:
+            part = row[start:start + width]
+            if part[key] is not None:
+                found.setdefault(part[key], part)
+        converters = compiler.get_converters([expression for expression, _, _ in compiler.select])
+        part_rows = list(compiler.apply_converters(found.values(), converters) if converters else found.values())
+        # The joined rows come in no particular order; a few rows at most
+        for name in reversed(compiler.query.order_by):
+            position = compiled.columns.index(name.lstrip('-'))
+            part_rows.sort(key=itemgetter(position), reverse=name.startswith('-'))
+        results.append(compiled.serialize_rows(part_rows, context))
+        start += width
+    return rows[0][:len(counted)], results
+
+
+@section('portfolio_summary')
+def build_portfolio_summary(context):
+    # Counts, featured projects and the latest education and experience in
+    # one query, cold or warm, instead of building three whole sections.
+    counts, (projects, education, experience) = counts_and_rows(
+        (Skill, Experience, Certification),
+        [
+            (ProjectSerializer, Project.objects.filter(is_featured=True).order_by('-created_at', '-id')[:6]),
+            (EducationSerializer, Education.objects.order_by('-start_date', '-id')[:1]),
+            (ExperienceSerializer, Experience.objects.order_by('-start_date', '-id')[:1]),
+        ],
+        context,
+    )
+    skills_count, experience_count, certifications_count = counts
+    return {
+        'projects': projects,
+        'skills_count': skills_count,
+        'experience_count': experience_count,
+        'certifications_count': certifications_count,
+        'education': education[0] if education else None,
+        'latest_experience': experience[0] if experience else None,
+    }
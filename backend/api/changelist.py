@@ -0,0 +1,246 @@
+"""
+Admin changelist for tables too large to count or page by offset.
+
+Django's changelist counts the filtered rows and the whole table, pages with
+``OFFSET`` and lists date hierarchy links with ``SELECT DISTINCT`` over the
+selected range, so every page load grows with the table. HighVolumeAdminMixin
+keeps it constant:
+
+* Counts stop at COUNT_LIMIT rows. Past that the changelist shows the
+  planner's estimate (``EXPLAIN`` on PostgreSQL, ``sqlite_stat1`` for an
+  unfiltered SQLite table) or just "more than COUNT_LIMIT".
+* Pages are keyset ranges of ``keyset_ordering`` (see api/pagination.py)
+  linked with ``?cursor=``; column sorting is disabled.
+* Date hierarchy links are found by seeking the index for the first row of
+  each next year, month or day, one query per link.
+* ``update_in_chunks`` lets actions update a selection of any size in
+  short transactions.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.db import OperationalError, connections, transaction
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound
+
+from .pagination import KeysetPagination
+
+CURSOR_VAR = 'cursor'
+COUNT_LIMIT = 1000
+CHUNK_SIZE = 1000
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset``, or None
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            return int(cursor.fetchone()[0][0]['Plan']['Plan Rows'])
+    if connection.vendor == 'sqlite' and not queryset.query.where:
+        # Rows per index at the last ANALYZE; partial indexes hold fewer
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [queryset.model._meta.db_table])
+                counts = [int(stat.split()[0]) for stat, in cursor.fetchall()]
+        except OperationalError:
+            return None
+        return max(counts, default=None)
+    return None
+
+
+def update_in_chunks(queryset, **values):
+    """
+    Update the rows of ``queryset`` not yet matching ``values``; return how many.
+
+    Each chunk of CHUNK_SIZE rows is its own short transaction, so marking a
+    million messages never holds the write lock for long. Updated rows stop
+    matching, so every chunk starts again from the front of the queryset.
+    """
+    pending = queryset.order_by()
+    for name, value in values.items():
+        # ``flag = False`` seeks an index where ``NOT flag = True`` cannot
+        if isinstance(value, bool):
+            pending = pending.filter(**{name: not value})
+        else:
+            pending = pending.exclude(**{name: value})
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pending.values_list('pk', flat=True)[:CHUNK_SIZE])
+            if not ids:
+                return total
+            total += queryset.model._default_manager.filter(pk__in=ids).update(**values)
+
+
+class HighVolumeChangeList(ChangeList):
+    """
+    ChangeList with bounded counts, keyset pages and index-seek date links
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Filter and date links start again from the first page
+        return super().get_query_string({CURSOR_VAR: None, **(new_params or {})}, remove)
+
+    def get_results(self, request):
+        paginator = KeysetPagination(self.model_admin.keyset_ordering, self.list_per_page)
+        encoded = request.GET.get(CURSOR_VAR)
+        queryset = self.queryset
+        reverse = False
+        if encoded:
+            try:
+                values, reverse = paginator.decode_cursor(self.model, encoded)
+            except NotFound:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(paginator.after(values, reverse))
+
+        ordering = paginator.ordering
+        if reverse:
+            ordering = [name[1:] if name.startswith('-') else '-' + name for name in ordering]
+        rows = list(queryset.order_by(*ordering)[:self.list_per_page + 1])
+        has_more = len(rows) > self.list_per_page
+        rows = rows[:self.list_per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(encoded)
+
+        def link(row, backwards):
+            values = [getattr(row, name) for name in paginator.fields]
+            return self.get_query_string({CURSOR_VAR: paginator.encode_cursor(values, backwards)})
+
+        self.next_url = link(rows[-1], False) if rows and has_next else None
+        self.previous_url = link(rows[0], True) if rows and has_previous else None
+
+        count = self.queryset.order_by().values('pk')[:COUNT_LIMIT + 1].count()
+        self.count_is_exact = count <= COUNT_LIMIT
+        if not self.count_is_exact:
+            estimate = estimate_count(self.queryset)
+            count = max(estimate or 0, count)
+            self.count_is_estimate = estimate is not None and estimate > COUNT_LIMIT
+        else:
+            self.count_is_estimate = False
+
+        self.result_count = count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_next or has_previous
+        self.paginator = None
+
+    def count_display(self):
+        if self.count_is_exact:
+            return formats.number_format(self.result_count, force_grouping=True)
+        if self.count_is_estimate:
+            return _('about %s') % formats.number_format(self.result_count, force_grouping=True)
+        return _('more than %s') % formats.number_format(COUNT_LIMIT, force_grouping=True)
+
+    def first_row(self, start=None):
+        field = self.date_hierarchy
+        queryset = self.queryset
+        if start is not None:
+            # SQLite seeks from the first of several lower bounds, so this
+            # one goes before those of the selected date range
+            queryset = self.model._default_manager.filter(**{f'{field}__gte': start}) & queryset
+        return queryset.order_by(field).values_list(field, flat=True).first()
+
+    def periods(self, start_of, next_of):
+        """
+        Starts of the periods that have rows, one index seek each
+        """
+        starts = []
+        value = self.first_row()
+        while value is not None:
+            start = start_of(timezone.localtime(value) if settings.USE_TZ else value)
+            starts.append(start)
+            value = self.first_row(next_of(start))
+        return starts
+
+    def date_navigation(self):
+        """
+        Context for admin/date_hierarchy.html, like Django's date_hierarchy tag
+        """
+        field = self.date_hierarchy
+        year_field, month_field, day_field = f'{field}__year', f'{field}__month', f'{field}__day'
+        year, month, day = (self.params.get(name) for name in (year_field, month_field, day_field))
+        remove = [year_field, month_field, day_field]
+
+        def aware(*args):
+            value = datetime(*args)
+            return timezone.make_aware(value) if settings.USE_TZ else value
+
+        if year and month and day:
+            selected = datetime(int(year), int(month), int(day))
+            return {
+                'back': {
+                    'link': self.get_query_string({year_field: year, month_field: month}, [day_field]),
+                    'title': capfirst(formats.date_format(selected, 'YEAR_MONTH_FORMAT')),
+                },
+                'choices': [{'title': capfirst(formats.date_format(selected, 'MONTH_DAY_FORMAT'))}],
+            }
+        if year and month:
+            days = self.periods(
+                lambda value: aware(value.year, value.month, value.day),
+                lambda start: start + timedelta(days=1),
+            )
+            return {
+                'back': {'link': self.get_query_string({year_field: year}, [month_field]), 'title': str(year)},
+                'choices': [{
+                    'link': self.get_query_string({year_field: year, month_field: month, day_field: start.day}),
+                    'title': capfirst(formats.date_format(start, 'MONTH_DAY_FORMAT')),
+                } for start in days],
+            }
+        if year:
+            months = self.periods(
+                lambda value: aware(value.year, value.month, 1),
+                lambda start: aware(start.year + start.month // 12, start.month % 12 + 1, 1),
+            )
+            return {
+                'back': {'link': self.get_query_string(remove=remove), 'title': _('All dates')},
+                'choices': [{
+                    'link': self.get_query_string({year_field: year, month_field: start.month}),
+                    'title': capfirst(formats.date_format(start, 'YEAR_MONTH_FORMAT')),
+                } for start in months],
+            }
+        years = self.periods(lambda value: aware(value.year, 1, 1), lambda start: aware(start.year + 1, 1, 1))
+        return {
+            'back': None,
+            'choices': [{'link': self.get_query_string({year_field: start.year}), 'title': str(start.year)}
+                        for start in years],
+        }
+
+
+class HighVolumeAdminMixin:
+    """
+    ModelAdmin mixin for tables of millions of rows (see module docstring).
+
+    ``keyset_ordering`` is a ``('-sort_key', '-id')`` pair with a matching
+    index, and one led by each boolean ``list_filter`` field; the sort key
+    is also the ``date_hierarchy`` field, a DateTimeField. ``list_editable``
+    is not supported.
+    """
+    keyset_ordering = ('-created_at', '-id')
+    change_list_template = 'admin/api/high_volume_change_list.html'
+    show_full_result_count = False
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return HighVolumeChangeList
+
+    def get_ordering(self, request):
+        return list(self.keyset_ordering)
@@ -0,0 +1,164 @@
+"""
+Compiled fast-path serializers for read-only lists.
+
+``compile_serializer`` inspects a ModelSerializer's fields once and
+generates a flat function turning a ``values_list()`` row into the exact
+dict the serializer would produce, without model instances, field lookups
+or per-field method dispatch. Output is kept byte-for-byte identical to DRF
+(see CompiledSerializerParityTestCase).
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import fields as drf_fields
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged
+RAW_FIELDS = (
+    drf_fields.IntegerField, drf_fields.CharField, drf_fields.BooleanField,
+    drf_fields.ChoiceField, drf_fields.JSONField, drf_fields.ReadOnlyField,
+)
+
+
+def date_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return field.to_representation
+
+    def convert(value):
+        return value.isoformat() if value else None
+    return convert
+
+
+def datetime_converter(field):
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != drf_fields.ISO_8601:
+        return field.to_representation
+    enforce_timezone = field.enforce_timezone
+
+    def convert(value):
+        if not value:
+            return None
+        value = enforce_timezone(value).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def file_converter(field, model_field, context):
+    if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+        return lambda name: name or None
+    storage = model_field.storage
+    request = context.get('request')
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+class CompiledSerializer:
+    """
+    Row-to-dict serializer generated from a ModelSerializer's fields.
+
+    ``columns`` are the attribute names to pass to ``values_list()``.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        model = serializer_class.Meta.model
+        serializer = serializer_class()
+
+        columns = []
+        model_fields = {}
+        for field in serializer.fields.values():
+            if field.write_only or field.source == '*':
+                raise TypeError(f'{serializer_class.__name__}.{field.field_name} cannot be compiled')
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.is_relation:
+                columns.append(model_field.attname)
+                model_fields[field.field_name] = model_field
+        self.columns = tuple(columns)
+        self.Row = namedtuple(f'{model.__name__}Row', self.columns)
+
+        items = []
+        converters = []
+        needs_row = False
+        for field in serializer.fields.values():
+            model_field = model_fields.get(field.field_name)
+            if model_field is not None:
+                value = f'row[{columns.index(model_field.attname)}]'
+            else:
+                attribute = getattr(model, field.source, None)
+                if not isinstance(attribute, property):
+                    raise TypeError(f'{serializer_class.__name__}.{field.field_name} cannot be compiled')
+                # Properties are evaluated against a namedtuple of the row.
+                converters.append(('property', attribute.fget))
+                value = f'c{len(converters) - 1}(named)'
+                needs_row = True
+
+            if isinstance(field, drf_fields.DateTimeField):
+                converters.append(('datetime', field))
+            elif isinstance(field, drf_fields.DateField):
+                converters.append(('date', field))
+            elif isinstance(field, drf_fields.FileField):
+                converters.append(('file', (field, model_field)))
+            elif isinstance(field, RAW_FIELDS):
+                items.append(f'{field.field_name!r}: {value}')
+                continue
+            else:
+                converters.append(('generic', field))
+            items.append(f'{field.field_name!r}: None if {value} is None else c{len(converters) - 1}({value})')
+
+        self.converters = converters
+        names = ', '.join(f'c{i}' for i in range(len(converters)))
+        lines = [f'def make({names}):', '    def to_dict(row):']
+        if needs_row:
+            lines.append('        named = Row._make(row)')
+        lines += [f'        return {{{", ".join(items)}}}', '    return to_dict']
+        source = '\n'.join(lines) + '\n'
+        namespace = {'Row': self.Row}
+        exec(compile(source, f'<compiled {serializer_class.__name__}>', 'exec'), namespace)
+        self.make = namespace['make']
+        self.source = source
+
+    def bind(self, context=None):
+        """
+        Return the row-to-dict function for a serializer context
+        """
+        context = context or {}
+        bound = []
+        for kind, target in self.converters:
+            if kind == 'property':
+                bound.append(target)
+            elif kind == 'datetime':
+                bound.append(datetime_converter(target))
+            elif kind == 'date':
+                bound.append(date_converter(target))
+            elif kind == 'file':
+                bound.append(file_converter(*target, context))
+            else:
+                bound.append(target.to_representation)
+        return self.make(*bound)
+
+    def serialize_rows(self, rows, context=None):
+        to_dict = self.bind(context)
+        return [to_dict(row) for row in rows]
+
+    def serialize(self, queryset, context=None):
+        """
+        Serialize a queryset through ``values_list()``
+        """
+        return self.serialize_rows(queryset.values_list(*self.columns), context)
+
+
+@lru_cache(maxsize=None)
+def compile_serializer(serializer_class):
+    return CompiledSerializer(serializer_class)
@@ -0,0 +1,66 @@
+"""
+Conditional GET for the cached read endpoints.
+
+ETag and Last-Modified are derived from the snapshot content version, so a
+revalidation is answered with 304 before any serializer runs. The check costs
+no query while the version is cached and one fingerprint query when it is not.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def get_validators(request, versions, coding='identity', negotiated=False):
+    """
+    Return the (strong ETag, Last-Modified timestamp) of a request.
+
+    ``negotiated`` is for responses rendered per request, whose format and
+    indentation DRF picks from the Accept header; stored responses are one
+    JSON rendering whatever the client accepts.
+    """
+    # The full URL identifies the representation: path, query-parameter
+    # variant and the host used for absolute image URLs.
+    parts = [request.build_absolute_uri()]
+    if negotiated:
+        parts.append('accept:' + request.META.get('HTTP_ACCEPT', ''))
+    variant = '\n'.join(parts + [v.token for v in versions])
+    tag = hashlib.sha1(variant.encode()).hexdigest()
+    # Each content-coding is a different byte sequence, so a different tag.
+    if coding != 'identity':
+        tag = f'{tag}-{coding}'
+    return '"%s"' % tag, int(max(v.modified for v in versions))
+
+
+def conditional_response(request, validators, view, *args, **kwargs):
+    """
+    Answer a conditional GET with 304, or call ``view`` and tag its response
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+    return tag_response(response, validators)
+
+
+async def aconditional_response(request, validators, view, *args, **kwargs):
+    """
+    ``conditional_response`` for an async ``view``
+    """
+    etag, last_modified = validators
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await view(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+    return tag_response(response, validators)
+
+
+def tag_response(response, validators):
+    etag, last_modified = validators
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
@@ -0,0 +1,148 @@
+"""
+Streaming CSV and NDJSON export of contacts and portfolio content.
+
+Rows are read in primary key order with ``.iterator(chunk_size=...)``, a
+server-side cursor on PostgreSQL and ``fetchmany`` batches on SQLite, and
+written out in pieces of about BUFFER_SIZE bytes, optionally through an
+incremental gzip or brotli compressor. Nothing holds more than one batch,
+so memory stays flat however many rows are exported.
+
+``/api/export/<name>/`` streams an export to staff users and to holders of
+``API_EXPORT_TOKEN``; ``manage.py export_data`` writes one to a file. Under
+ASGI it streams ``astream``: Django would read a sync iterator into a list
+first.
+"""
+import csv
+import hmac
+import io
+import json
+import zlib
+from datetime import date, time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Certification, Contact, Education, Experience, Project, Skill
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+EXPORTS = {
+    'contacts': Contact,
+    'projects': Project,
+    'skills': Skill,
+    'experience': Experience,
+    'certifications': Certification,
+    'education': Education,
+}
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+# Rows per batch fetched from the cursor
+CHUNK_SIZE = 2000
+# Bytes of output collected before they are compressed and sent
+BUFFER_SIZE = 64 * 1024
+# Leading characters that make a spreadsheet read a CSV cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def is_authorized(request):
+    if request.user.is_active and request.user.is_staff:
+        return True
+    token = getattr(settings, 'API_EXPORT_TOKEN', '')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    return bool(token) and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def json_value(value):
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    # UUIDs and decimals
+    return str(value)
+
+
+def csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Spreadsheets would run a submitted "=HYPERLINK(...)" as a formula
+        return "'" + value
+    return value
+
+
+def drain(buffer):
+    data = buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+def csv_chunks(fields, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+        if buffer.tell() >= BUFFER_SIZE:
+            yield drain(buffer)
+    yield drain(buffer)
+
+
+def ndjson_chunks(fields, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(json.dumps(dict(zip(fields, row)), default=json_value, separators=(',', ':')))
+        buffer.write('\n')
+        if buffer.tell() >= BUFFER_SIZE:
+            yield drain(buffer)
+    yield drain(buffer)
+
+
+ENCODERS = {'csv': csv_chunks, 'ndjson': ndjson_chunks}
+
+
+def compressed(chunks, coding):
+    if coding == 'gzip':
+        compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        process, finish = compressor.compress, compressor.flush
+    else:
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT)
+        process, finish = compressor.process, compressor.finish
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def stream(queryset, file_format='csv', coding='identity', chunk_size=CHUNK_SIZE):
+    """
+    Yield ``queryset`` as ``file_format`` bytes, compressed with ``coding``
+    """
+    fields = columns(queryset.model)
+    rows = queryset.order_by('pk').values_list(*fields).iterator(chunk_size=chunk_size)
+    chunks = ENCODERS[file_format](fields, rows)
+    return chunks if coding == 'identity' else compressed(chunks, coding)
+
+
+async def astream(*args, **kwargs):
+    """
+    ``stream`` as an async iterator, advanced one piece at a time
+    """
+    chunks = stream(*args, **kwargs)
+    # Thread-sensitive, so the cursor stays on the thread that opened it
+    step = sync_to_async(next)
+    try:
+        while (chunk := await step(chunks, None)) is not None:
+            yield chunk
+    finally:
+        await sync_to_async(chunks.close)()
@@ -0,0 +1,304 @@
+"""
+Write-behind ingestion of contact form submissions.
+
+With ``API_CONTACT_WRITE_BEHIND`` on, ``ContactViewSet.create`` validates a
+submission, appends it as one JSON line to this process's segment file in
+``API_CONTACT_BUFFER_DIR``, fsyncs it and answers 202. The request never
+takes the database write lock. A background flush seals the segment once it
+holds ``API_CONTACT_FLUSH_SIZE`` submissions, or ``API_CONTACT_FLUSH_INTERVAL``
+seconds after the first one, screens it for spam (see api/spam.py) and
+inserts it with one ``bulk_create`` and the matching outbox emails in a
+single transaction.
+
+Segment files move through ``active-<pid>`` (being appended to),
+``sealed-<pid>-<ns>`` (waiting) and ``flushing-<pid>-<sealed name>``
+(claimed by a flusher, by atomic rename). Active and flushing segments of
+processes that no longer exist are sealed again by the next flush, so a
+crash loses no acknowledged submission; each worker runs one at start (see
+gunicorn.conf.py). Every submission carries a ``submission_id`` that is
+unique on Contact, and replaying a segment skips the ids already inserted.
+The buffer directory must be local to the machine, because liveness is
+judged by pid.
+
+A segment that fails to insert goes back as ``sealed-<pid>-<ns>-<attempts>``
+while the flush goes on with the others, and after MAX_ATTEMPTS failures it
+is set aside as ``quarantined-<pid>-<ns>`` for an operator; renaming it to
+``sealed-<pid>-<ns>.jsonl`` replays it. Errors of the database connection
+are not the segment's fault: they end the flush without counting.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from . import outbox, spam
+from .models import Contact, OutboxEmail
+
+logger = logging.getLogger('api.ingest')
+
+# Fields copied from a buffered record onto the Contact row
+FIELDS = ('name', 'email', 'subject', 'message')
+# Rows per INSERT and submission ids per IN (...) lookup
+BATCH_SIZE = 500
+# Failed flushes of one segment before it is quarantined
+MAX_ATTEMPTS = 3
+
+
+def buffer_dir():
+    return Path(settings.API_CONTACT_BUFFER_DIR)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ContactBuffer:
+    """
+    Append-only segment file of one process, flushed in the background
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.file = None
+        self.count = 0
+        self.timer = None
+
+    def check_fork(self):
+        # A worker forked from a preloaded master must not share its file.
+        if self.pid != os.getpid():
+            self.reset()
+
+    def append(self, record):
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+        with self.lock:
+            self.check_fork()
+            if self.file is None:
+                self.open()
+            self.file.write(line)
+            os.fsync(self.file.fileno())
+            self.count += 1
+            if self.count >= settings.API_CONTACT_FLUSH_SIZE:
+                self.seal()
+                self.schedule_flush(0)
+            elif self.timer is None:
+                self.schedule_flush(settings.API_CONTACT_FLUSH_INTERVAL)
+
+    def open(self):
+        directory = buffer_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'active-{self.pid}.jsonl'
+        if path.exists():
+            # Left by a dead process with our pid; it may end in a torn line.
+            seal(path, self.pid)
+        self.file = open(path, 'ab', buffering=0)
+
+    def seal(self):
+        if self.file is not None:
+            self.file.close()
+            seal(Path(self.file.name), self.pid)
+            self.file = None
+            self.count = 0
+
+    def schedule_flush(self, delay):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(delay, self.background_flush)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def flush(self):
+        """
+        Seal the current segment and insert every sealed one
+        """
+        with self.lock:
+            self.check_fork()
+            self.timer = None
+            self.seal()
+        flush_pending()
+
+    def background_flush(self):
+        try:
+            self.flush()
+        except Exception:
+            # The segments stay sealed; retry them even if no submission
+            # comes to schedule the next flush.
+            logger.exception('Contact buffer flush failed')
+            with self.lock:
+                if self.timer is None:
+                    self.schedule_flush(settings.API_CONTACT_FLUSH_INTERVAL)
+        finally:
+            # Timer threads are not request threads, so nothing else closes
+            # their connection.
+            connections.close_all()
+
+
+def seal(path, pid):
+    os.replace(path, path.with_name(f'sealed-{pid}-{time.time_ns()}.jsonl'))
+
+
+def recover(directory):
+    """
+    Seal again the segments of processes that died appending or flushing
+    """
+    for path in directory.glob('*.jsonl'):
+        kind, pid = path.stem.split('-')[:2]
+        if kind not in ('active', 'flushing') or int(pid) == os.getpid() or is_alive(int(pid)):
+            continue
+        try:
+            if kind == 'active':
+                seal(path, pid)
+            else:
+                os.replace(path, path.with_name(path.name.split('-', 2)[2]))
+        except FileNotFoundError:
+            # Recovered by another process first
+            continue
+        logger.warning('Recovered contact buffer segment %s', path.name)
+
+
+def read_segment(path):
+    records = []
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # A write torn by a crash; it was never acknowledged.
+                logger.warning('Skipping torn line %s of %s', number, path.name)
+    return records
+
+
+def insert(records):
+    """
+    Insert buffered submissions not already in Contact; return the count
+    """
+    ids = [uuid.UUID(record['submission_id']) for record in records]
+    # Looked up before the transaction: a segment has one flusher at a time,
+    # and on SQLite a read transaction that later writes fails with "database
+    # is locked" instead of waiting for the lock.
+    existing = set()
+    for start in range(0, len(ids), BATCH_SIZE):
+        existing.update(
+            Contact.objects.filter(submission_id__in=ids[start:start + BATCH_SIZE])
+            .values_list('submission_id', flat=True)
+        )
+    contacts = []
+    for submission_id, record in zip(ids, records):
+        if submission_id in existing:
+            continue
+        existing.add(submission_id)
+        contacts.append(Contact(
+            submission_id=submission_id, created_at=parse_datetime(record['created_at']),
+            **{name: record[name] for name in FIELDS},
+        ))
+    keys = spam.screen(contacts)
+    with transaction.atomic():
+        Contact.objects.bulk_create(contacts, batch_size=BATCH_SIZE)
+        spam.index(contacts, keys)
+        emails = OutboxEmail.objects.bulk_create(
+            [outbox.contact_notification(contact) for contact in contacts if not contact.is_spam],
+            batch_size=BATCH_SIZE,
+        )
+        if emails:
+            outbox.queued()
+    return len(contacts)
+
+
+def put_back(claimed, path):
+    """
+    Return a segment that failed to the sealed ones, or quarantine it
+    """
+    pid, sealed_at, *attempts = path.stem.split('-')[1:]
+    attempts = int(attempts[0]) + 1 if attempts else 1
+    if attempts < MAX_ATTEMPTS:
+        os.replace(claimed, path.with_name(f'sealed-{pid}-{sealed_at}-{attempts}.jsonl'))
+        return
+    quarantined = path.with_name(f'quarantined-{pid}-{sealed_at}.jsonl')
+    os.replace(claimed, quarantined)
+    logger.error('Quarantined contact buffer segment %s after %s failed flushes', quarantined.name, attempts)
+
+
+def flush_pending(directory=None):
+    """
+    Insert every sealed segment in ``directory``; return the rows inserted
+    """
+    directory = directory or buffer_dir()
+    if not directory.exists():
+        return 0
+    recover(directory)
+    inserted = 0
+    error = None
+    for path in sorted(directory.glob('sealed-*.jsonl')):
+        claimed = path.with_name(f'flushing-{os.getpid()}-{path.name}')
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            # Claimed by another flusher
+            continue
+        try:
+            records = read_segment(claimed)
+            if records:
+                inserted += insert(records)
+        except (OperationalError, InterfaceError):
+            # The database, not the segment: every other one would fail too
+            os.replace(claimed, path)
+            raise
+        except Exception as e:
+            logger.exception('Failed to flush contact buffer segment %s', path.name)
+            put_back(claimed, path)
+            error = e
+            continue
+        claimed.unlink()
+    if error is not None:
+        # So the caller retries the segments put back
+        raise error
+    return inserted
+
+
+def flush_at_start():
+    """
+    Replay, in the background, the segments earlier workers left behind
+    """
+    with buffer.lock:
+        buffer.check_fork()
+        if buffer.timer is None:
+            buffer.schedule_flush(0)
+
+
+buffer = ContactBuffer()
+
+
+def shutdown():
+    # Insert what this process buffered rather than leave it to recovery
+    if buffer.pid == os.getpid() and buffer.file is not None:
+        buffer.background_flush()
+
+
+atexit.register(shutdown)
+
+
+def submit(contact):
+    """
+    Durably buffer an unsaved, validated Contact for a later batch insert
+    """
+    record = {name: getattr(contact, name) for name in FIELDS}
+    record['submission_id'] = str(contact.submission_id)
+    record['created_at'] = contact.created_at.isoformat()
+    buffer.append(record)
@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move read contact messages older than --days into compressed '
+        'segments in API_CONTACT_ARCHIVE_DIR'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.API_CONTACT_ARCHIVE_DAYS,
+            help=f'archive messages older than this (default {settings.API_CONTACT_ARCHIVE_DAYS})',
+        )
+        parser.add_argument(
+            '--segment-rows', type=int, default=archive.SEGMENT_ROWS,
+            help=f'messages per segment file (default {archive.SEGMENT_ROWS})',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['segment_rows'] < 1:
+            raise CommandError('--days must not be negative and --segment-rows must be positive')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        try:
+            archived, written = archive.archive(cutoff, options['segment_rows'])
+        except archive.ArchiveBusy as error:
+            raise CommandError(str(error))
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived:,} messages into {written} segments'))
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api import export
+
+
+class Command(BaseCommand):
+    help = (
+        'Stream every row of a model to a CSV or NDJSON file, e.g. '
+        'contacts --format ndjson --gzip --output contacts.ndjson.gz'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=export.EXPORTS, help='what to export')
+        parser.add_argument('--format', choices=export.CONTENT_TYPES, default='csv', help='file format (default csv)')
+        parser.add_argument('--gzip', action='store_true', help='compress the output')
+        parser.add_argument('--output', '-o', help='file to write (default stdout)')
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE,
+            help=f'rows fetched per batch (default {export.CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        queryset = export.EXPORTS[options['name']]._default_manager.all()
+        chunks = export.stream(
+            queryset, options['format'], 'gzip' if options['gzip'] else 'identity', options['chunk_size']
+        )
+        written = 0
+        output = open(options['output'], 'wb') if options['output'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if options['output']:
+                output.close()
+        # stdout may be the export itself
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written:,} bytes of {options['name']}"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.ingest import flush_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert buffered write-behind contact submissions, including those '
+        'left by crashed processes'
+    )
+
+    def handle(self, *args, **options):
+        inserted = flush_pending()
+        self.stdout.write(self.style.SUCCESS(f'Inserted {inserted} contact submissions'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import search
+
+
+class Command(BaseCommand):
+    help = 'Repopulate the full-text search index from the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kinds', nargs='*', metavar='kind',
+            help=f"kinds to rebuild: {', '.join(search.DOCUMENTS)} (default all)",
+        )
+
+    def handle(self, *args, **options):
+        if search.backend() is None:
+            raise CommandError('The database has no full-text search support')
+        unknown = [kind for kind in options['kinds'] if kind not in search.DOCUMENTS]
+        if unknown:
+            raise CommandError(f"Unknown kinds: {', '.join(unknown)}")
+        indexed = search.rebuild(options['kinds'] or search.DOCUMENTS)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed:,} rows'))
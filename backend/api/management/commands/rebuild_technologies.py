@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import technologies
+
+
+class Command(BaseCommand):
+    help = 'Recompute technology links and counts from the project and experience lists'
+
+    def handle(self, *args, **options):
+        count = technologies.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Linked {count:,} technologies'))
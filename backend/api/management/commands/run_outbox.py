@@ -0,0 +1,34 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbox emails in batches, with retries and backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='messages per SMTP connection')
+        parser.add_argument('--interval', type=float, default=2.0, help='seconds to wait when idle')
+        parser.add_argument('--once', action='store_true', help='drain the due messages and exit')
+
+    def handle(self, *args, **options):
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+
+        while self.running:
+            close_old_connections()
+            sent, failed = deliver_batch(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}')
+            elif options['once']:
+                break
+            else:
+                time.sleep(options['interval'])
+
+    def stop(self, signum, frame):
+        # Finish the current batch, then exit
+        self.running = False
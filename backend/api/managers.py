@@ -0,0 +1,48 @@
+from django.db import models
+from django.utils import timezone
+
+from .signals import bulk_changed
+
+
+class ContentQuerySet(models.QuerySet):
+    """
+    QuerySet that announces bulk writes, which bypass model signals
+    """
+
+    def _has_updated_at(self):
+        return any(f.name == 'updated_at' for f in self.model._meta.concrete_fields)
+
+    def update(self, **kwargs):
+        # auto_now is only applied by Model.save()
+        if 'updated_at' not in kwargs and self._has_updated_at():
+            kwargs['updated_at'] = timezone.now()
+        rows = super().update(**kwargs)
+        if rows:
+            bulk_changed.send(sender=self.model, queryset=self, fields=list(kwargs))
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            bulk_changed.send(sender=self.model, objs=objs)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'updated_at' not in fields and self._has_updated_at():
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, 'updated_at']
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows:
+            bulk_changed.send(sender=self.model, objs=objs, fields=list(fields))
+        return rows
+
+    bulk_update.alters_data = True
+
+
+ContentManager = models.Manager.from_queryset(ContentQuerySet)
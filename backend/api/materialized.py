@@ -0,0 +1,182 @@
+"""
+Materialized responses for the public read endpoints.
+
+The first request for a URL after a content change renders it once; the
+final bytes, precompressed gzip and brotli copies and the headers are stored
+in the scope snapshot. Every later request is answered with the stored
+variant matching its Accept-Encoding, skipping DRF serialization, content
+negotiation, JSONRenderer and compression entirely. ``amaterialized`` does
+the same for the async views of api/async_views.py, sharing the store.
+"""
+import gzip
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .async_sections import aget_version
+from .cache import get_response, get_version, store_response
+from .conditional import aconditional_response, conditional_response, get_validators
+from .metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# Bodies smaller than this are not worth compressing (same as GZipMiddleware)
+MIN_COMPRESS_LENGTH = 200
+
+# Server preference when the client accepts several codings equally
+CODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(content):
+    """
+    Return ``{coding: bytes}`` with every variant smaller than the original
+    """
+    variants = {'identity': content}
+    if len(content) < MIN_COMPRESS_LENGTH:
+        return variants
+    compressed = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed['br'] = brotli.compress(content, mode=brotli.MODE_TEXT)
+    for coding, body in compressed.items():
+        if len(body) < len(content):
+            variants[coding] = body
+    return variants
+
+
+def preferred_coding(request):
+    """
+    Pick the content-coding to send from the Accept-Encoding header
+    """
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.lower()] = quality
+
+    best, best_quality = 'identity', 0.0
+    for coding in CODINGS:
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def is_materializable(request, params):
+    """
+    Only default renderings of known query-parameter variants are stored
+    """
+    if not getattr(settings, 'API_MATERIALIZED_RESPONSES', True):
+        return False
+    if any(name not in params for name in request.GET):
+        return False
+    # DRF's JSONRenderer honours ``Accept: application/json; indent=4``.
+    return 'indent' not in request.META.get('HTTP_ACCEPT', '')
+
+
+def build_response(stored, coding):
+    variants, headers = stored
+    if coding not in variants:
+        coding = 'identity'
+    response = HttpResponse(variants[coding], headers=headers)
+    if coding != 'identity':
+        response.headers['Content-Encoding'] = coding
+    response.headers['Content-Length'] = str(len(variants[coding]))
+    return response
+
+
+def materialized(scope, params=()):
+    """
+    Decorator serving a read view from stored response bytes.
+
+    ``params`` lists the query parameters that select a variant of the
+    response; requests with any other parameter are rendered normally.
+    Conditional GET is handled first, so a 304 never reaches the store.
+    """
+    def decorator(view):
+        def render(request, version, coding, *args, **kwargs):
+            key = request.build_absolute_uri()
+            stored = get_response(scope, version, key)
+            record_cache('response', stored is not None)
+            if stored is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                if hasattr(response, 'render'):
+                    response.render()
+                stored = (compress(response.content), dict(response.headers))
+                store_response(scope, version, key, *stored)
+            return build_response(stored, coding)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            version = get_version(scope)
+            if not is_materializable(request, params):
+                validators = get_validators(request, [version], negotiated=True)
+                response = conditional_response(request, validators, view, *args, **kwargs)
+                patch_vary_headers(response, ['Accept'])
+                return response
+
+            coding = preferred_coding(request)
+            validators = get_validators(request, [version], coding)
+            response = conditional_response(
+                request, validators, render, version, coding, *args, **kwargs
+            )
+            patch_vary_headers(response, ['Accept-Encoding'])
+            return response
+        return wrapper
+    return decorator
+
+
+def amaterialized(scope, params=()):
+    """
+    ``materialized`` for async views
+    """
+    def decorator(view):
+        async def render(request, version, coding, *args, **kwargs):
+            key = request.build_absolute_uri()
+            stored = get_response(scope, version, key)
+            record_cache('response', stored is not None)
+            if stored is None:
+                response = await view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                # Brotli takes milliseconds on a large body; not on the event loop
+                variants = await sync_to_async(compress, thread_sensitive=False)(response.content)
+                stored = (variants, dict(response.headers))
+                store_response(scope, version, key, *stored)
+            return build_response(stored, coding)
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+            version = await aget_version(scope)
+            if not is_materializable(request, params):
+                validators = get_validators(request, [version], negotiated=True)
+                response = await aconditional_response(request, validators, view, *args, **kwargs)
+                patch_vary_headers(response, ['Accept'])
+                return response
+
+            coding = preferred_coding(request)
+            validators = get_validators(request, [version], coding)
+            response = await aconditional_response(
+                request, validators, render, version, coding, *args, **kwargs
+            )
+            patch_vary_headers(response, ['Accept-Encoding'])
+            return response
+        return wrapper
+    return decorator
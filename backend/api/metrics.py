@@ -0,0 +1,307 @@
+"""
+In-process metrics shared across gunicorn workers.
+
+Every worker counts into its own ``Registry`` and writes it to
+``API_METRICS_DIR/<pid>-<token>.json`` at most once per ``FLUSH_INTERVAL``;
+the random token keeps a reused pid from overwriting an earlier file. The
+``/api/metrics/`` endpoint sums the files of all workers with the totals of
+dead ones, so counters keep growing across restarts like Prometheus expects,
+and renders them in the Prometheus text exposition format. A worker adds its
+own file to ``dead.json`` when it exits, and a scrape does the same for the
+files of workers that were killed, so the directory holds one file per live
+worker.
+"""
+import atexit
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+FLUSH_INTERVAL = 1.0
+
+# Request latency buckets, in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRICS = {
+    'api_requests_total': ('counter', 'API requests by route, method and status code.'),
+    'api_request_duration_seconds': ('histogram', 'API request latency by route and method.'),
+    'api_db_queries_total': ('counter', 'Database queries issued by API requests.'),
+    'api_cache_requests_total': ('counter', 'Snapshot cache lookups by cache and result.'),
+    'api_throttled_total': ('counter', 'Requests rejected by a throttle, by scope and key kind.'),
+}
+
+
+def is_enabled():
+    return getattr(settings, 'API_METRICS', False)
+
+
+def metrics_dir():
+    return Path(getattr(settings, 'API_METRICS_DIR', settings.BASE_DIR / '.metrics'))
+
+
+class Registry:
+    """
+    Counters and histograms of one process.
+
+    Samples are keyed by ``(name, labels)`` where ``labels`` is a tuple of
+    ``(label, value)`` pairs. Histograms hold per-bucket counts followed by
+    the +Inf bucket, the sum and the count.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.name = f'{self.pid}-{uuid.uuid4().hex[:12]}.json'
+        self.retired = False
+        self.counters = {}
+        self.histograms = {}
+        self.timer = None
+
+    def check_fork(self):
+        # Workers forked from a preloaded master start with its counts.
+        if self.pid != os.getpid():
+            self.reset()
+
+    def inc(self, name, labels, amount=1):
+        with self.lock:
+            self.check_fork()
+            key = (name, labels)
+            self.counters[key] = self.counters.get(key, 0) + amount
+            self.schedule_flush()
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            self.check_fork()
+            key = (name, labels)
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(BUCKETS) + 3)
+            for index, bound in enumerate(BUCKETS):
+                if value <= bound:
+                    break
+            else:
+                index = len(BUCKETS)
+            histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+            self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.timer is None:
+            self.timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def dump(self):
+        with self.lock:
+            self.check_fork()
+            self.timer = None
+            return {
+                'counters': [[name, labels, value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, labels, list(h)] for (name, labels), h in self.histograms.items()],
+            }
+
+    def flush(self):
+        """
+        Write this process's samples to its file, atomically
+        """
+        if self.retired:
+            return
+        directory = metrics_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        data = json.dumps(self.dump())
+        # The timer and a scrape may flush at once; each writes its own file.
+        fd, temporary = tempfile.mkstemp(dir=directory, prefix=self.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(data)
+            os.replace(temporary, directory / self.name)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def retire(self):
+        """
+        Write this process's samples one last time and add them to the dead
+        """
+        if self.retired:
+            return
+        self.flush()
+        # A pending timer must not write the file again once it is folded
+        self.retired = True
+        with locked() as directory:
+            fold(directory, [directory / self.name])
+
+
+registry = Registry()
+atexit.register(lambda: is_enabled() and registry.retire())
+
+
+@contextmanager
+def locked():
+    directory = metrics_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'metrics.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield directory
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Someone else's process
+    return True
+
+
+def worker_pid(path):
+    """
+    Return the pid in the name of a worker file, or None
+    """
+    pid = path.stem.split('-', 1)[0]
+    return int(pid) if pid.isdigit() else None
+
+
+def read_samples(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None  # Gone, or being replaced by its worker
+
+
+def add_samples(counters, histograms, data):
+    for name, labels, value in data['counters']:
+        key = (name, tuple(map(tuple, labels)))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, values in data['histograms']:
+        key = (name, tuple(map(tuple, labels)))
+        total = histograms.setdefault(key, [0] * len(values))
+        for index, value in enumerate(values):
+            total[index] += value
+
+
+def read_dead(directory):
+    return read_samples(directory / 'dead.json') or {'counters': [], 'histograms': [], 'folded': []}
+
+
+def fold(directory, paths):
+    """
+    Add the samples of dead workers' files to ``dead.json`` and remove them.
+
+    Call with ``locked()`` held. ``dead.json`` lists the files it already
+    holds, so a crash between rewriting it and removing them never counts a
+    file twice.
+    """
+    dead = read_dead(directory)
+    folded = [name for name in dead['folded'] if (directory / name).exists()]
+    counters, histograms = {}, {}
+    add_samples(counters, histograms, dead)
+    for path in paths:
+        if path.name in folded:
+            continue
+        data = read_samples(path)
+        if data is not None:
+            add_samples(counters, histograms, data)
+            folded.append(path.name)
+    temporary = directory / 'dead.tmp'
+    temporary.write_text(json.dumps({
+        'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+        'histograms': [[name, labels, values] for (name, labels), values in histograms.items()],
+        'folded': folded,
+    }))
+    os.replace(temporary, directory / 'dead.json')
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+def record_request(route, method, status, duration, queries):
+    labels = (('route', route), ('method', method))
+    registry.inc('api_requests_total', labels + (('status', str(status)),))
+    registry.observe('api_request_duration_seconds', labels, duration)
+    registry.inc('api_db_queries_total', labels, queries)
+
+
+def record_cache(cache, hit):
+    """
+    Count a hit or miss of one of the snapshot caches
+    """
+    if is_enabled():
+        registry.inc('api_cache_requests_total', (('cache', cache), ('result', 'hit' if hit else 'miss')))
+
+
+def record_throttle(scope, kind):
+    """
+    Count a request rejected by the ``kind`` bucket of throttle ``scope``
+    """
+    if is_enabled():
+        registry.inc('api_throttled_total', (('scope', scope), ('kind', kind)))
+
+
+def collect():
+    """
+    Sum the samples of every worker file and of the dead workers
+    """
+    registry.flush()
+    with locked() as directory:
+        workers = [path for path in directory.glob('*.json') if worker_pid(path) is not None]
+        stale = [path for path in workers if not is_alive(worker_pid(path))]
+        if stale:
+            fold(directory, stale)
+        counters, histograms = {}, {}
+        dead = read_dead(directory)
+        add_samples(counters, histograms, dead)
+        for path in workers:
+            if path not in stale and path.name not in dead['folded']:
+                data = read_samples(path)
+                if data is not None:
+                    add_samples(counters, histograms, data)
+    return counters, histograms
+
+
+def format_labels(labels):
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}' if labels else ''
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """
+    Return all metrics in the Prometheus text exposition format
+    """
+    counters, histograms = collect()
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+        if kind == 'counter':
+            for (sample, labels), value in sorted(counters.items()):
+                if sample == name:
+                    lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+            continue
+        for (sample, labels), values in sorted(histograms.items()):
+            if sample != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), values):
+                cumulative += count
+                le = (('le', bound if bound == '+Inf' else repr(bound)),)
+                lines.append(f'{name}_bucket{format_labels(labels + le)} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} {format_value(values[-2])}')
+            lines.append(f'{name}_count{format_labels(labels)} {values[-1]}')
+    return '\n'.join(lines) + '\n'
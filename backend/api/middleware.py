@@ -0,0 +1,289 @@
+"""
+Request instrumentation for the API.
+
+``ServerTimingMiddleware`` splits the time of every ``/api/`` request into
+database, serialization and rendering phases, returns them in a
+``Server-Timing`` header and logs one structured line per request on the
+``api.timing`` logger. With ``API_SERVER_TIMING`` off the middleware removes
+itself from the stack at startup and no hook is installed.
+
+``MetricsMiddleware`` feeds the per-route counters and latency histograms
+served by ``/api/metrics/`` (see api/metrics.py), under ``API_METRICS``.
+
+Both run in sync and async mode, like ``WhiteNoiseMiddleware`` here, so
+under ASGI the async views of api/async_views.py are reached without a
+thread switch. Async ORM calls run on another thread's connection than the
+one the middleware sees, so in async mode the query hooks are handed over
+through ``query_hooks`` to ``instrument``, which api/receivers.py installs on
+every connection.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial, wraps
+
+import whitenoise.middleware
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+
+from . import metrics
+from .compiled import CompiledSerializer
+
+logger = logging.getLogger('api.timing')
+
+# Timing of the request being handled in this thread or task, if any
+current_timing = ContextVar('current_timing', default=None)
+
+# Execute wrappers of the async request being handled in this task
+query_hooks = ContextVar('query_hooks', default=())
+
+PHASES = ('db', 'serialize', 'render')
+
+
+def instrument(execute, sql, params, many, context):
+    # Execute wrapper of every connection; a no-op outside async requests
+    for hook in query_hooks.get():
+        execute = partial(hook, execute)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def hooked_queries(hook):
+    """
+    ``connection.execute_wrapper`` for async code: ``hook`` sees the queries
+    of this task on any thread and connection
+    """
+    token = query_hooks.set(query_hooks.get() + (hook,))
+    try:
+        yield
+    finally:
+        query_hooks.reset(token)
+
+
+class Timing:
+    """
+    Per-request phase durations, in seconds.
+
+    Queries run inside another phase (a lazy queryset iterated by a
+    serializer) count as ``db`` only, so the phases never overlap.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = dict.fromkeys(PHASES, 0.0)
+        self.queries = 0
+        self.active = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.durations['db'] += time.perf_counter() - started
+            self.queries += 1
+
+    @contextmanager
+    def phase(self, name):
+        # Nested calls (ListSerializer.data -> Serializer.data) are counted once.
+        if self.active is not None:
+            yield
+            return
+        self.active = name
+        db = self.durations['db']
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started - (self.durations['db'] - db)
+            self.durations[name] += elapsed
+            self.active = None
+
+    @property
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def header(self, total):
+        entries = [f'db;dur={self.durations["db"] * 1000:.2f};desc="{self.queries} queries"']
+        entries += [f'{name};dur={self.durations[name] * 1000:.2f}' for name in PHASES[1:]]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+
+def timed(name, function):
+    """
+    Wrap ``function`` so its time is booked to phase ``name`` when timing
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        timing = current_timing.get()
+        if timing is None:
+            return function(*args, **kwargs)
+        with timing.phase(name):
+            return function(*args, **kwargs)
+    wrapper.timed = True
+    return wrapper
+
+
+def install_hooks():
+    """
+    Patch the serialization and rendering entry points, once
+    """
+    if getattr(Response.render, 'timed', False):
+        return
+    Response.render = timed('render', Response.render)
+    CompiledSerializer.serialize_rows = timed('serialize', CompiledSerializer.serialize_rows)
+    BaseSerializer.data = property(timed('serialize', BaseSerializer.data.fget))
+
+
+class ServerTimingMiddleware:
+    """
+    Add a Server-Timing header and a timing log line to API responses
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'API_SERVER_TIMING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        timing = Timing()
+        token = current_timing.set(timing)
+        try:
+            with connection.execute_wrapper(timing):
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    async def __acall__(self, request):
+        if not request.path.startswith('/api/'):
+            return await self.get_response(request)
+
+        timing = Timing()
+        token = current_timing.set(timing)
+        try:
+            with hooked_queries(timing):
+                response = await self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        return self.finish(request, response, timing)
+
+    def finish(self, request, response, timing):
+        total = timing.total
+        response.headers['Server-Timing'] = timing.header(total)
+        logger.info(
+            'method=%s path=%s status=%s total_ms=%.2f db_ms=%.2f queries=%d serialize_ms=%.2f render_ms=%.2f',
+            request.method, request.path, response.status_code, total * 1000,
+            timing.durations['db'] * 1000, timing.queries,
+            timing.durations['serialize'] * 1000, timing.durations['render'] * 1000,
+            extra={'timing': {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'queries': timing.queries,
+                **{f'{name}_ms': round(timing.durations[name] * 1000, 2) for name in PHASES},
+            }},
+        )
+        return response
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Record rate, status, latency and query count of every API request
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.is_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        return self.record(request, response, started, counter)
+
+    async def __acall__(self, request):
+        if not request.path.startswith('/api/'):
+            return await self.get_response(request)
+
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with hooked_queries(counter):
+            response = await self.get_response(request)
+        return self.record(request, response, started, counter)
+
+    def record(self, request, response, started, counter):
+        duration = time.perf_counter() - started
+        # Route names keep the label set bounded, unlike raw paths.
+        match = request.resolver_match
+        route = match.url_name if match is not None and match.url_name else 'unmatched'
+        metrics.record_request(route, request.method, response.status_code, duration, counter.queries)
+        return response
+
+
+class WhiteNoiseMiddleware(whitenoise.middleware.WhiteNoiseMiddleware):
+    """
+    WhiteNoise that also runs in async mode, so ASGI requests for the API
+    are not passed through a worker thread on their way to the view
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            # Django reads the file in a thread while streaming it
+            return self.serve(static_file, request)
+        return await self.get_response(request)
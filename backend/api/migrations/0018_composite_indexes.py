@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='project',
+            name='project_featured_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='about',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='about_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['is_read', '-created_at'], name='contact_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['-start_date', '-id'], name='education_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalinfo',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id'], name='personalinfo_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['-created_at', '-id'], name='project_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category', '-level'], name='skill_category_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sociallink',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order'], name='sociallink_active_order_idx'),
+        ),
+    ]
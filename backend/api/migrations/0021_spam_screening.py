@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_contact_submission_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockedSender',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.CharField(help_text='user@example.com or @example.com', max_length=254, unique=True)),
+                ('reason', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['value'],
+            },
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='is_spam',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ContactFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('contact', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='api.contact')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'created_at'], name='fingerprint_band_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+# Frozen copy of api.search as of this migration: later changes to the
+# live module must not change what this migration creates.
+DOCUMENTS = {
+    'project': ('Project', ('title',), ('description', 'long_description', 'technologies', 'features')),
+    'skill': ('Skill', ('name',), ('category',)),
+    'experience': ('Experience', ('title', 'company'), ('location', 'description', 'technologies')),
+    'contact': ('Contact', ('name', 'email', 'subject'), ('message',)),
+}
+BATCH_SIZE = 2000
+
+CREATE = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE {name} USING fts5(title, body, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')",
+        "INSERT INTO {name} ({name}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+    ],
+    'postgresql': [
+        'CREATE TABLE {name} (id bigint PRIMARY KEY, document tsvector NOT NULL)',
+        'CREATE INDEX {name}_idx ON {name} USING GIN (document)',
+    ],
+}
+INSERT = {
+    'sqlite': 'INSERT INTO {name} (rowid, title, body) VALUES (%s, %s, %s)',
+    'postgresql': (
+        'INSERT INTO {name} (id, document) VALUES (%s, '
+        "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B'))"
+    ),
+}
+
+
+def table(kind):
+    return f'api_{kind}_search'
+
+
+def text(values):
+    return ' '.join(
+        ' '.join(map(str, value)) if isinstance(value, list) else str(value or '')
+        for value in values
+    )
+
+
+def create_tables(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in CREATE:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for kind, (model_name, title, body) in DOCUMENTS.items():
+            name = table(kind)
+            for statement in CREATE[vendor]:
+                cursor.execute(statement.format(name=name))
+            # Index the rows that already exist
+            model = apps.get_model('api', model_name)
+            rows = model._default_manager.order_by().values_list('pk', *title, *body)
+            batch = []
+            for pk, *values in rows.iterator(chunk_size=BATCH_SIZE):
+                batch.append((pk, text(values[:len(title)]), text(values[len(title):])))
+                if len(batch) == BATCH_SIZE:
+                    cursor.executemany(INSERT[vendor].format(name=name), batch)
+                    batch = []
+            if batch:
+                cursor.executemany(INSERT[vendor].format(name=name), batch)
+
+
+def drop_tables(apps, schema_editor):
+    if schema_editor.connection.vendor not in CREATE:
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for kind in DOCUMENTS:
+            cursor.execute(f'DROP TABLE IF EXISTS {table(kind)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_spam_screening'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tables, drop_tables),
+    ]
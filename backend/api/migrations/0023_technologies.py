@@ -0,0 +1,111 @@
+# Generated by Django 4.2.7 on 2026-10-18 14:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# Frozen copy of api.technologies as of this migration: model, link table,
+# link column and Technology counter of each owner.
+OWNERS = [
+    ('Project', 'ProjectTechnology', 'project_id', 'project_count'),
+    ('Experience', 'ExperienceTechnology', 'experience_id', 'experience_count'),
+]
+BATCH_SIZE = 2000
+MAX_LENGTH = 100
+
+
+def normalize(values):
+    names = {}
+    if isinstance(values, list):
+        for value in values:
+            if isinstance(value, str):
+                name = ' '.join(value.split())[:MAX_LENGTH]
+                if name:
+                    names.setdefault(name.lower(), name)
+    return names
+
+
+def link_technologies(apps, schema_editor):
+    # The tables are new, so every link and count is created here
+    Technology = apps.get_model('api', 'Technology')
+    names = {}
+    pairs = {}
+    for model_name, _, field, count in OWNERS:
+        model = apps.get_model('api', model_name)
+        rows = model._default_manager.order_by().values_list('pk', 'technologies')
+        pairs[field] = []
+        for pk, values in rows.iterator(chunk_size=BATCH_SIZE):
+            for key, name in normalize(values).items():
+                names.setdefault(key, name)
+                pairs[field].append((pk, key))
+
+    technologies = {key: Technology(key=key, name=name) for key, name in names.items()}
+    for _, _, field, count in OWNERS:
+        for _, key in pairs[field]:
+            setattr(technologies[key], count, getattr(technologies[key], count) + 1)
+    Technology.objects.bulk_create(technologies.values(), batch_size=BATCH_SIZE)
+    ids = dict(Technology.objects.values_list('key', 'pk'))
+
+    for _, through_name, field, _ in OWNERS:
+        through = apps.get_model('api', through_name)
+        through.objects.bulk_create([
+            through(**{field: pk, 'technology_id': ids[key]}) for pk, key in pairs[field]
+        ], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(help_text='Lowercased name', max_length=100, unique=True)),
+                ('project_count', models.PositiveIntegerField(default=0)),
+                ('experience_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name_plural': 'Technologies',
+                'ordering': ['-project_count', '-experience_count', 'name'],
+                'indexes': [models.Index(fields=['-project_count', '-experience_count', 'name'], name='technology_facet_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExperienceTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('experience', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='api.experience')),
+                ('technology', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='experience_links', to='api.technology')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('project', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='technology_links', to='api.project')),
+                ('technology', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='api.technology')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['technology', 'project'], name='technology_project_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='projecttechnology',
+            constraint=models.UniqueConstraint(fields=('project', 'technology'), name='project_technology_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='experiencetechnology',
+            index=models.Index(fields=['technology', 'experience'], name='technology_experience_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='experiencetechnology',
+            constraint=models.UniqueConstraint(fields=('experience', 'technology'), name='experience_technology_unique'),
+        ),
+        migrations.RunPython(link_technologies, migrations.RunPython.noop),
+    ]
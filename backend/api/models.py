@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 
+from .managers import ContentManager
+
 
 class PersonalInfo(models.Model):
     name = models.CharField(max_length=100)
@@ -14,10 +17,18 @@ class PersonalInfo(models.Model):
     resume = models.URLField(blank=True)
     profile_image = models.URLField(blank=True, default="/images/profile.jpg")
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         verbose_name = "Personal Information"
         verbose_name_plural = "Personal Information"
+        indexes = [
+            # Django filters booleans as a bare "WHERE is_active", which
+            # SQLite can only match against a partial index's condition.
+            models.Index(fields=['id'], condition=Q(is_active=True), name='personalinfo_active_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - Personal Info"
@@ -28,10 +39,16 @@ class About(models.Model):
     vision = models.TextField()
     highlights = models.JSONField(default=list)  # Store highlights as JSON array
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         verbose_name = "About Section"
         verbose_name_plural = "About Section"
+        indexes = [
+            models.Index(fields=['id'], condition=Q(is_active=True), name='about_active_idx'),
+        ]
     
     def __str__(self):
         return "About Section"
@@ -44,9 +61,15 @@ class SocialLink(models.Model):
     color = models.CharField(max_length=20, default="#ffffff")
     order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['order'], condition=Q(is_active=True), name='sociallink_active_order_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -59,9 +82,25 @@ class Contact(models.Model):
     message = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Set by write-behind ingestion so a replayed buffer inserts nothing twice
+    submission_id = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+    # Near duplicate of a recent message or from a blocked sender; not emailed
+    is_spam = models.BooleanField(default=False)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of the inbox
+            models.Index(fields=['-created_at', '-id'], name='contact_created_id_idx'),
+            # Admin inbox pages of the few unread and spam messages. Django
+            # filters booleans as ``NOT is_read``, which only a partial index
+            # with the same condition can seek.
+            models.Index(fields=['-created_at', '-id'], condition=Q(is_read=False), name='contact_unread_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(is_spam=True), name='contact_spam_idx'),
+        ]
         
     def __str__(self):
         return f"{self.name} - {self.subject}"
@@ -87,8 +126,17 @@ class Project(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_featured = models.BooleanField(default=False)
     
+    objects = ContentManager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of all and of featured projects
+            models.Index(fields=['-created_at', '-id'], name='project_created_id_idx'),
+            models.Index(
+                fields=['-created_at', '-id'], condition=Q(is_featured=True), name='project_featured_idx'
+            ),
+        ]
         
     def __str__(self):
         return self.title
@@ -107,9 +155,15 @@ class Skill(models.Model):
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     level = models.IntegerField(default=0, help_text="Skill level from 0-100")
     icon = models.CharField(max_length=50, default="💻")
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['category', '-level']
+        indexes = [
+            models.Index(fields=['category', '-level'], name='skill_category_level_idx'),
+        ]
         
     def __str__(self):
         return f"{self.name} ({self.level}%)"
@@ -124,9 +178,15 @@ class Experience(models.Model):
     is_current = models.BooleanField(default=False)
     description = models.JSONField(default=list)  # Store bullet points as JSON array
     technologies = models.JSONField(default=list)  # Store technologies as JSON array
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['-start_date', '-id'], name='experience_start_id_idx'),
+        ]
         
     def __str__(self):
         return f"{self.title} at {self.company}"
@@ -149,9 +209,15 @@ class Certification(models.Model):
     description = models.TextField()
     verification_url = models.URLField(blank=True)
     logo = models.ImageField(upload_to='certifications/', blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['-date_issued']
+        indexes = [
+            models.Index(fields=['-date_issued', '-id'], name='certification_issued_id_idx'),
+        ]
         
     def __str__(self):
         return f"{self.title} - {self.issuer}"
@@ -167,9 +233,15 @@ class Education(models.Model):
     gpa = models.CharField(max_length=20, blank=True)
     description = models.TextField()
     coursework = models.JSONField(default=list)  # Store coursework as JSON array
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
     
     class Meta:
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['-start_date', '-id'], name='education_start_id_idx'),
+        ]
         
     def __str__(self):
         return f"{self.degree} - {self.institution}"
@@ -182,3 +254,134 @@ class Education(models.Model):
             return f"{self.start_date.year} - {self.end_date.year}"
         else:
             return f"{self.start_date.year}"
+
+
+class OutboxEmail(models.Model):
+    """
+    Email queued in the request transaction and sent from api/outbox.py
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    created_at = models.DateTimeField(default=timezone.now)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    claim = models.UUIDField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            # The queue: undelivered messages by due time
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                condition=Q(sent_at__isnull=True, failed_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+            models.Index(fields=['claim'], name='outbox_claim_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class ContactFingerprint(models.Model):
+    """
+    Hash of one LSH band of a contact message's MinHash (see api/spam.py)
+    """
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name='fingerprints')
+    band = models.BigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            # Candidates sharing a band with a new message, in the recent window
+            models.Index(fields=['band', 'created_at'], name='fingerprint_band_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.contact_id}: {self.band}"
+
+
+class BlockedSender(models.Model):
+    """
+    Email address, or ``@domain``, whose submissions are marked as spam
+    """
+    value = models.CharField(max_length=254, unique=True, help_text="user@example.com or @example.com")
+    reason = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    objects = ContentManager()
+    
+    class Meta:
+        ordering = ['value']
+    
+    def save(self, *args, **kwargs):
+        self.value = self.value.strip().lower()
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.value
+
+
+class Technology(models.Model):
+    """
+    Technology named in the ``technologies`` lists of projects and experience.
+
+    Rows, links and counts are maintained by api/technologies.py.
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True, help_text="Lowercased name")
+    project_count = models.PositiveIntegerField(default=0)
+    experience_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-project_count', '-experience_count', 'name']
+        verbose_name_plural = "Technologies"
+        indexes = [
+            # The facet list, most used first
+            models.Index(fields=['-project_count', '-experience_count', 'name'], name='technology_facet_idx'),
+        ]
+    
+    def __str__(self):
+        return self.name
+
+
+class ProjectTechnology(models.Model):
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='technology_links', db_index=False
+    )
+    technology = models.ForeignKey(
+        Technology, on_delete=models.CASCADE, related_name='project_links', db_index=False
+    )
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'technology'], name='project_technology_unique'),
+        ]
+        indexes = [
+            # Projects using a technology, without reading the table
+            models.Index(fields=['technology', 'project'], name='technology_project_idx'),
+        ]
+
+
+class ExperienceTechnology(models.Model):
+    experience = models.ForeignKey(
+        Experience, on_delete=models.CASCADE, related_name='technology_links', db_index=False
+    )
+    technology = models.ForeignKey(
+        Technology, on_delete=models.CASCADE, related_name='experience_links', db_index=False
+    )
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['experience', 'technology'], name='experience_technology_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['technology', 'experience'], name='technology_experience_idx'),
+        ]
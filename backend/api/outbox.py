@@ -0,0 +1,223 @@
+"""
+Transactional email outbox.
+
+``ContactViewSet`` saves the ``contact_notification`` of a submission in
+the transaction that inserts the contact, and the write-behind flush of
+api/ingest.py bulk-creates them with its batch, so a message is queued
+exactly when its contact commits and the request never waits on SMTP.
+``enqueue`` queues any other email. ``manage.py run_outbox`` drains the queue in
+batches over one SMTP connection per batch.
+
+Deploys without a ``run_outbox`` worker (railway.json runs gunicorn alone)
+keep ``API_OUTBOX_IN_PROCESS`` on: every commit that queues email then
+wakes a ``Drainer`` thread of the web process, which delivers the due
+messages and sleeps until the next retry is due. A worker and drainers may
+run together; leases keep them from sending a message twice.
+
+Delivery is at-least-once: a batch is leased by moving its rows'
+``next_attempt_at`` into the future under a claim token, so a worker that
+dies mid-batch only delays those messages until the lease expires.
+"""
+import logging
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger('api.outbox')
+
+# Time a worker has to deliver a claimed batch before others may retry it
+LEASE = timedelta(minutes=5)
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+MAX_ATTEMPTS = 8
+
+
+def enqueue(subject, body, from_email, recipients):
+    message = OutboxEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, recipients=list(recipients)
+    )
+    queued()
+    return message
+
+
+def queued():
+    """
+    Wake the in-process drainer once the current transaction commits
+    """
+    if settings.API_OUTBOX_IN_PROCESS:
+        transaction.on_commit(lambda: drainer.schedule(0))
+
+
+def contact_notification(contact):
+    """
+    Unsaved email telling the site owner about a contact form submission
+    """
+    subject = f"New Contact Form Submission: {contact.subject}"
+    message = f"""
+    New contact form submission from your portfolio website:
+    
+    Name: {contact.name}
+    Email: {contact.email}
+    Subject: {contact.subject}
+    
+    Message:
+    {contact.message}
+    
+    Submitted at: {contact.created_at}
+    """
+    return OutboxEmail(
+        subject=subject, body=message, from_email=settings.DEFAULT_FROM_EMAIL,
+        recipients=[settings.DEFAULT_FROM_EMAIL],
+    )
+
+
+def backoff(attempts):
+    """
+    Delay before retrying a message that has failed ``attempts`` times
+    """
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim_batch(size):
+    """
+    Lease up to ``size`` due messages to this worker and return them
+    """
+    now = timezone.now()
+    due = OutboxEmail.objects.filter(
+        sent_at__isnull=True, failed_at__isnull=True, next_attempt_at__lte=now
+    )
+    ids = list(due.order_by('next_attempt_at', 'id').values_list('id', flat=True)[:size])
+    if not ids:
+        return []
+    token = uuid.uuid4()
+    # Re-checking the due condition in the UPDATE makes the claim atomic:
+    # rows another worker leased meanwhile no longer match.
+    due.filter(id__in=ids).update(claim=token, next_attempt_at=now + LEASE)
+    return list(OutboxEmail.objects.filter(claim=token).order_by('next_attempt_at', 'id'))
+
+
+def deliver_batch(size=100, connection=None):
+    """
+    Send one batch over a single SMTP connection; return (sent, failed)
+    """
+    messages = claim_batch(size)
+    if not messages:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    sent = failed = 0
+    pending = list(messages)
+    try:
+        connection.open()
+        while pending:
+            message = pending.pop(0)
+            try:
+                EmailMessage(
+                    message.subject, message.body, message.from_email,
+                    message.recipients, connection=connection,
+                ).send()
+            except Exception as e:
+                failed += 1
+                record_failure(message, e)
+                # The connection may be unusable; start a fresh one.
+                connection.close()
+                connection.open()
+            else:
+                sent += 1
+                OutboxEmail.objects.filter(pk=message.pk).update(
+                    sent_at=timezone.now(), claim=None, attempts=message.attempts + 1, last_error=''
+                )
+    except Exception as e:
+        # SMTP unreachable: the messages not yet attempted fail too, so an
+        # outage backs off and eventually gives up like a rejection does.
+        logger.warning('Outbox delivery interrupted: %s', e)
+        for message in pending:
+            failed += 1
+            record_failure(message, e)
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def record_failure(message, error):
+    attempts = message.attempts + 1
+    now = timezone.now()
+    update = {'attempts': attempts, 'claim': None, 'last_error': repr(error)[:1000]}
+    if attempts >= MAX_ATTEMPTS:
+        update['failed_at'] = now
+        logger.error('Giving up on outbox email %s after %s attempts: %r', message.pk, attempts, error)
+    else:
+        update['next_attempt_at'] = now + backoff(attempts)
+        logger.warning('Outbox email %s failed (attempt %s): %r', message.pk, attempts, error)
+    OutboxEmail.objects.filter(pk=message.pk).update(**update)
+
+
+def next_attempt():
+    """
+    Seconds until the earliest pending message is due, or None
+    """
+    due = OutboxEmail.objects.filter(sent_at__isnull=True, failed_at__isnull=True).order_by('next_attempt_at')
+    at = due.values_list('next_attempt_at', flat=True).first()
+    return None if at is None else max((at - timezone.now()).total_seconds(), 0)
+
+
+class Drainer:
+    """
+    Outbox delivery on a timer thread of the web process
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.timer = None
+        self.at = None
+
+    def schedule(self, delay):
+        """
+        Drain in ``delay`` seconds, unless a drain is due sooner
+        """
+        with self.lock:
+            if self.pid != os.getpid():
+                # A forked worker does not own its parent's timer
+                self.reset()
+            at = timezone.now() + timedelta(seconds=delay)
+            if self.timer is not None:
+                if self.at <= at:
+                    return
+                self.timer.cancel()
+            self.at = at
+            self.timer = threading.Timer(delay, self.drain)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def drain(self):
+        with self.lock:
+            self.timer = None
+        retry = None
+        try:
+            while any(deliver_batch()):
+                pass
+            retry = next_attempt()
+        except Exception:
+            logger.exception('Outbox drain failed')
+            retry = BACKOFF_BASE.total_seconds()
+        finally:
+            # Timer threads are not request threads, so nothing else closes
+            # their connection.
+            connections.close_all()
+        if retry is not None:
+            self.schedule(retry)
+
+
+drainer = Drainer()
@@ -0,0 +1,51 @@
+"""
+Query budgets for every route in api/urls.py.
+
+Each entry caps the number of SQL queries and the total database time of
+one request, measured cold: no snapshot, no cached content version. The
+budgets must hold at every size in DATASET_SIZES, so a query count that
+grows with the data (an N+1) fails the build. QueryBudgetTestCase checks
+that every route has an entry.
+"""
+from collections import namedtuple
+
+Budget = namedtuple('Budget', ['queries', 'db_ms'])
+
+# Rows seeded per model for each measurement round
+DATASET_SIZES = (10, 100, 1000)
+
+QUERY_BUDGETS = {
+    ('api-root', 'GET'): Budget(0, 0),
+    ('health-check', 'GET'): Budget(0, 0),
+    ('metrics', 'GET'): Budget(0, 0),
+    # version fingerprint + one section query
+    ('personal-info', 'GET'): Budget(2, 50),
+    ('about-info', 'GET'): Budget(2, 50),
+    ('social-links', 'GET'): Budget(2, 50),
+    ('project-list', 'GET'): Budget(2, 100),
+    ('skill-list', 'GET'): Budget(2, 100),
+    ('experience-list', 'GET'): Budget(2, 100),
+    ('certification-list', 'GET'): Budget(2, 100),
+    ('education-list', 'GET'): Budget(2, 100),
+    # fingerprint + counts and latest rows in one query
+    ('portfolio-summary', 'GET'): Budget(2, 100),
+    # fingerprint + ten sections, one query each
+    ('bootstrap', 'GET'): Budget(11, 200),
+    ('technologies', 'GET'): Budget(2, 50),
+    # fingerprint + one ranked index query and one row query per kind
+    ('search', 'GET'): Budget(7, 100),
+    # spam screening (band lookup, candidate messages, blocklist version and
+    # filter when cold) + contact, search index, fingerprint and outbox
+    # inserts in one savepoint (BEGIN/COMMIT outside tests)
+    ('contact-list', 'POST'): Budget(10, 50),
+    # one keyset page of the inbox
+    ('contact-list', 'GET'): Budget(1, 20),
+    ('project-detail', 'GET'): Budget(1, 20),
+    ('skill-detail', 'GET'): Budget(1, 20),
+    ('experience-detail', 'GET'): Budget(1, 20),
+    ('certification-detail', 'GET'): Budget(1, 20),
+    ('education-detail', 'GET'): Budget(1, 20),
+    ('contact-detail', 'GET'): Budget(1, 20),
+    # one cursor over the whole table, read while streaming
+    ('export', 'GET'): Budget(1, 100),
+}
@@ -0,0 +1,95 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import middleware, search, technologies
+from .cache import SCOPES, bump_version, scope_for_model
+from .signals import bulk_changed
+
+
+def connect(signal, handler, models):
+    # Per model: a delete receiver without a sender would keep the deletion
+    # collector from fast-deleting any model at all.
+    for model in models:
+        signal.connect(handler, sender=model)
+
+
+@receiver(bulk_changed)
+def invalidate_snapshot(sender, **kwargs):
+    scope = scope_for_model(sender)
+    if scope is not None:
+        bump_version(scope)
+
+
+def index_saved(sender, instance, raw=False, **kwargs):
+    # Fixtures are indexed by rebuild_search_index
+    if not raw:
+        search.update(sender, objs=[instance])
+
+
+def unindex_deleted(sender, instance, **kwargs):
+    search.remove(sender, [instance.pk])
+
+
+scoped = [model for models in SCOPES.values() for model in models]
+connect(post_save, invalidate_snapshot, scoped)
+connect(post_delete, invalidate_snapshot, scoped)
+connect(post_save, index_saved, search.KINDS)
+connect(post_delete, unindex_deleted, search.KINDS)
+
+
+@receiver(bulk_changed)
+def index_bulk_changed(sender, queryset=None, objs=None, fields=None, **kwargs):
+    if search.KINDS.get(sender) is None:
+        return
+    if fields is not None and not search.indexed(sender, fields):
+        return
+    # An update() is reindexed by its filter, so one that moves rows out of
+    # its own filter leaves them for rebuild_search_index
+    search.update(sender, queryset=queryset, objs=objs)
+
+
+def link_technologies(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or 'technologies' in update_fields:
+        technologies.link(sender, [instance])
+
+
+def unlink_technologies(sender, instance, **kwargs):
+    # Before the delete cascades to the links, so their counts are released
+    technologies.unlink(sender, [instance.pk])
+
+
+# Lazy 'app_label.Model' senders, the live models only
+connect(post_save, link_technologies, technologies.OWNERS)
+connect(pre_delete, unlink_technologies, technologies.OWNERS)
+
+
+@receiver(bulk_changed)
+def link_bulk_changed(sender, queryset=None, objs=None, fields=None, **kwargs):
+    if not technologies.tracked(sender):
+        return
+    if fields is not None and 'technologies' not in fields:
+        return
+    if objs is not None:
+        technologies.link(sender, objs)
+    elif queryset is not None:
+        technologies.link_queryset(sender, queryset)
+
+
+@receiver(post_migrate)
+def invalidate_after_migrate(sender, **kwargs):
+    # Data migrations use historical models, which send no signals we see.
+    if sender.name == 'api':
+        for scope in SCOPES:
+            bump_version(scope)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Reconnects reuse the wrapper object and its execute_wrappers. First in
+    # the list, as execute_wrapper() pops the last one when the connection
+    # was opened inside it.
+    if middleware.instrument not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, middleware.instrument)
@@ -0,0 +1,241 @@
+"""
+Full-text search over projects, skills, experience and contacts.
+
+Every searchable model has an index table ``api_<kind>_search`` keyed by the
+row's primary key, holding a weighted title and a body: an FTS5 virtual
+table on SQLite, or a ``tsvector`` column with a GIN index on PostgreSQL.
+api/receivers.py keeps the tables in sync on save, delete and the bulk
+writes of ContentQuerySet. ``manage.py rebuild_search_index`` repopulates
+them after raw SQL writes, and after an ``update()`` of indexed fields that
+moves rows out of its own filter.
+
+Queries are split into words, each matched as a prefix and all required,
+and ranked by BM25 (SQLite) or ``ts_rank_cd`` (PostgreSQL) with title
+matches weighted above body matches. Other databases have no index, so
+``search`` finds nothing and the admin falls back to ``LIKE``.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connection
+
+from .models import Contact, Experience, Project, Skill
+
+Document = namedtuple('Document', ['model', 'title', 'body'])
+
+DOCUMENTS = {
+    'project': Document(Project, ('title',), ('description', 'long_description', 'technologies', 'features')),
+    'skill': Document(Skill, ('name',), ('category',)),
+    'experience': Document(Experience, ('title', 'company'), ('location', 'description', 'technologies')),
+    'contact': Document(Contact, ('name', 'email', 'subject'), ('message',)),
+}
+KINDS = {document.model: kind for kind, document in DOCUMENTS.items()}
+# Kinds served by /api/search/; contacts are only searched in the admin
+PUBLIC_KINDS = ('project', 'skill', 'experience')
+
+WORD = re.compile(r'\w+')
+MAX_TERMS = 8
+BATCH_SIZE = 2000
+
+
+def table(kind):
+    return f'api_{kind}_search'
+
+
+def terms(query):
+    return WORD.findall(query.lower())[:MAX_TERMS]
+
+
+def text(values):
+    # JSON lists are indexed as their joined items
+    return ' '.join(
+        ' '.join(map(str, value)) if isinstance(value, list) else str(value or '')
+        for value in values
+    )
+
+
+def documents(kind, queryset):
+    """
+    Yield ``(pk, title, body)`` for each row of ``queryset``
+    """
+    document = DOCUMENTS[kind]
+    columns = document.title + document.body
+    split = len(document.title)
+    for pk, *values in queryset.order_by().values_list('pk', *columns).iterator(chunk_size=BATCH_SIZE):
+        yield pk, text(values[:split]), text(values[split:])
+
+
+class SQLiteIndex:
+    def create(self, cursor, kind):
+        name = table(kind)
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {name} USING fts5(title, body, "
+            f"tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        # ORDER BY rank then uses these weights, and needs no sort
+        cursor.execute(f"INSERT INTO {name} ({name}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+
+    def drop(self, cursor, kind):
+        cursor.execute(f'DROP TABLE IF EXISTS {table(kind)}')
+
+    def upsert(self, cursor, kind, rows):
+        cursor.executemany(f'INSERT OR REPLACE INTO {table(kind)} (rowid, title, body) VALUES (%s, %s, %s)', rows)
+
+    def delete(self, cursor, kind, ids):
+        cursor.executemany(f'DELETE FROM {table(kind)} WHERE rowid = %s', [(pk,) for pk in ids])
+
+    def clear(self, cursor, kind):
+        cursor.execute(f'DELETE FROM {table(kind)}')
+
+    def expression(self, words):
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def matching(self, kind):
+        name = table(kind)
+        return f'SELECT rowid FROM {name} WHERE {name} MATCH %s'
+
+    def ranked(self, kind):
+        name = table(kind)
+        return f'SELECT rowid, -rank FROM {name} WHERE {name} MATCH %s ORDER BY rank LIMIT %s'
+
+
+class PostgresIndex:
+    DOCUMENT = "setweight(to_tsvector('english', %s), 'A') || setweight(to_tsvector('english', %s), 'B')"
+
+    def create(self, cursor, kind):
+        name = table(kind)
+        cursor.execute(f'CREATE TABLE {name} (id bigint PRIMARY KEY, document tsvector NOT NULL)')
+        cursor.execute(f'CREATE INDEX {name}_idx ON {name} USING GIN (document)')
+
+    def drop(self, cursor, kind):
+        cursor.execute(f'DROP TABLE IF EXISTS {table(kind)}')
+
+    def upsert(self, cursor, kind, rows):
+        cursor.executemany(
+            f'INSERT INTO {table(kind)} (id, document) VALUES (%s, {self.DOCUMENT}) '
+            f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document',
+            rows,
+        )
+
+    def delete(self, cursor, kind, ids):
+        cursor.execute(f'DELETE FROM {table(kind)} WHERE id = ANY(%s)', [list(ids)])
+
+    def clear(self, cursor, kind):
+        cursor.execute(f'TRUNCATE {table(kind)}')
+
+    def expression(self, words):
+        return ' & '.join(f"'{word}':*" for word in words)
+
+    def matching(self, kind):
+        return f"SELECT id FROM {table(kind)} WHERE document @@ to_tsquery('english', %s)"
+
+    def ranked(self, kind):
+        return (
+            f"SELECT id, ts_rank_cd(document, query) AS score "
+            f"FROM {table(kind)}, to_tsquery('english', %s) query "
+            f"WHERE document @@ query ORDER BY score DESC LIMIT %s"
+        )
+
+
+BACKENDS = {'sqlite': SQLiteIndex(), 'postgresql': PostgresIndex()}
+
+
+def backend(using=connection):
+    return BACKENDS.get(using.vendor)
+
+
+def indexed(model, fields):
+    """
+    Whether writing ``fields`` of ``model`` changes its documents
+    """
+    document = DOCUMENTS[KINDS[model]]
+    return not set(fields).isdisjoint(document.title + document.body)
+
+
+def object_document(kind, obj):
+    document = DOCUMENTS[kind]
+    title = text(getattr(obj, name) for name in document.title)
+    return obj.pk, title, text(getattr(obj, name) for name in document.body)
+
+
+def upsert(index, kind, rows):
+    """
+    Write ``rows`` in batches; return how many
+    """
+    total = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                index.upsert(cursor, kind, batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            index.upsert(cursor, kind, batch)
+            total += len(batch)
+    return total
+
+
+def update(model, queryset=None, objs=None):
+    """
+    Add or refresh the rows of ``queryset``, or the saved ``objs``
+    """
+    kind, index = KINDS.get(model), backend()
+    if kind is None or index is None:
+        return
+    if objs is not None:
+        rows = (object_document(kind, obj) for obj in objs if obj.pk is not None)
+    elif queryset is not None:
+        rows = documents(kind, queryset)
+    else:
+        return
+    upsert(index, kind, rows)
+
+
+def remove(model, ids):
+    kind, index = KINDS.get(model), backend()
+    if kind is not None and index is not None and ids:
+        with connection.cursor() as cursor:
+            index.delete(cursor, kind, ids)
+
+
+def rebuild(kinds=DOCUMENTS):
+    """
+    Repopulate the index tables of ``kinds``; return the rows indexed
+    """
+    index = backend()
+    if index is None:
+        return 0
+    total = 0
+    for kind in kinds:
+        with connection.cursor() as cursor:
+            index.clear(cursor, kind)
+        total += upsert(index, kind, documents(kind, DOCUMENTS[kind].model._default_manager.all()))
+    return total
+
+
+def matching_ids(kind, query):
+    """
+    Return SQL and params selecting the ids of every row matching ``query``
+    """
+    index = backend()
+    return index.matching(kind), [index.expression(terms(query))]
+
+
+def search(query, kinds=PUBLIC_KINDS, limit=20):
+    """
+    Return ``(kind, pk, score)`` of the best matches, best first
+    """
+    index = backend()
+    words = terms(query)
+    if index is None or not words:
+        return []
+    expression = index.expression(words)
+    results = []
+    with connection.cursor() as cursor:
+        for kind in kinds:
+            cursor.execute(index.ranked(kind), [expression, limit])
+            results += [(kind, pk, score) for pk, score in cursor.fetchall()]
+    results.sort(key=lambda result: -result[2])
+    return results[:limit]
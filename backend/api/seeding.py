@@ -0,0 +1,215 @@
+"""
+Deterministic synthetic datasets for performance work.
+
+Every model in api/models.py has a generator yielding unsaved instances from
+a ``random.Random`` seeded per model, so the same sizes and seed always give
+the same rows. ``seed_models`` inserts them with batched ``bulk_create``;
+``manage.py seed_scale`` and the test/benchmark seeders are built on it.
+"""
+import random
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+
+from .models import (
+    PersonalInfo, About, SocialLink, Contact, Project,
+    Skill, Experience, Certification, Education
+)
+
+# Fixed "now" keeps timestamps reproducible between runs
+END = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+WORDS = (
+    'adaptive', 'async', 'batch', 'cloud', 'compact', 'data', 'deep', 'distributed',
+    'edge', 'event', 'fast', 'graph', 'hybrid', 'insight', 'lean', 'live', 'local',
+    'model', 'neural', 'open', 'pipeline', 'portable', 'realtime', 'robust', 'scalable',
+    'search', 'secure', 'smart', 'stream', 'sync', 'vision', 'visual',
+)
+NOUNS = (
+    'analyzer', 'assistant', 'dashboard', 'detector', 'engine', 'explorer', 'forecaster',
+    'gateway', 'indexer', 'monitor', 'planner', 'platform', 'portal', 'recommender',
+    'scheduler', 'service', 'toolkit', 'tracker', 'tutor', 'workbench',
+)
+# Ordered by popularity; picks are skewed towards the front
+TECHNOLOGIES = (
+    'Python', 'JavaScript', 'React', 'Django', 'TensorFlow', 'PostgreSQL', 'Docker',
+    'TypeScript', 'PyTorch', 'Node.js', 'scikit-learn', 'Pandas', 'NumPy', 'AWS',
+    'FastAPI', 'Redis', 'Kubernetes', 'Flask', 'MongoDB', 'OpenCV', 'Tailwind CSS',
+    'GraphQL', 'Keras', 'Next.js', 'SQLite', 'Celery', 'Go', 'Rust', 'Java', 'Kotlin',
+    'Spark', 'Kafka', 'Elasticsearch', 'Hugging Face', 'LangChain', 'Vue.js', 'Svelte',
+    'Terraform', 'GCP', 'Azure', 'Firebase', 'MySQL', 'Nginx', 'Linux', 'Bash', 'C++',
+    'Matplotlib', 'Plotly', 'Streamlit', 'Jupyter', 'Airflow', 'dbt', 'Snowflake',
+    'BigQuery', 'Three.js', 'D3.js', 'WebSockets', 'gRPC', 'RabbitMQ', 'ONNX',
+)
+TECHNOLOGY_WEIGHTS = [1 / (rank + 1) for rank in range(len(TECHNOLOGIES))]
+SUBJECTS = (
+    'Job opportunity', 'Collaboration', 'Freelance project', 'Question about your project',
+    'Internship', 'Hello', 'Speaking invitation', 'Feedback', 'Partnership', 'Consulting',
+)
+FIRST_NAMES = (
+    'Aarav', 'Ana', 'Chen', 'Diego', 'Emma', 'Fatima', 'Hiro', 'Isla', 'Jonas', 'Kavya',
+    'Liam', 'Maya', 'Noah', 'Olga', 'Priya', 'Quinn', 'Ravi', 'Sofia', 'Tariq', 'Yara',
+)
+LAST_NAMES = (
+    'Patel', 'Smith', 'Garcia', 'Kim', 'Müller', 'Rossi', 'Okafor', 'Nguyen', 'Silva',
+    'Kowalski', 'Haddad', 'Sato', 'Ivanova', 'Shah', 'Brown', 'Cohen',
+)
+ISSUERS = ('Coursera', 'Google', 'AWS', 'Microsoft', 'IBM', 'DeepLearning.AI', 'Udemy', 'NVIDIA')
+
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choice(WORDS + NOUNS) for _ in range(words))
+    return text.capitalize() + '.'
+
+
+def paragraph(rng, sentences=4):
+    return ' '.join(sentence(rng, rng.randint(8, 16)) for _ in range(sentences))
+
+
+def technologies(rng, low=2, high=8):
+    picked = rng.choices(TECHNOLOGIES, TECHNOLOGY_WEIGHTS, k=rng.randint(low, high))
+    return list(dict.fromkeys(picked))
+
+
+def spread(rng, count, days, index):
+    """
+    Timestamp of row ``index`` of ``count`` over the last ``days`` days.
+
+    Rows get denser towards END, like a site whose traffic grows.
+    """
+    position = ((index + rng.random()) / max(count, 1)) ** 0.5
+    return END - timedelta(days=days * (1 - position))
+
+
+def generate_personal_info(rng, count):
+    for i in range(count):
+        yield PersonalInfo(
+            name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            title='Machine Learning Engineer', subtitle=sentence(rng, 6),
+            location='Remote', email=f'person{i}@example.com', phone=f'+1 555 {i:07d}',
+            linkedin='https://linkedin.com/in/example', github='https://github.com/example',
+            is_active=i == 0,
+        )
+
+
+def generate_about(rng, count):
+    for i in range(count):
+        yield About(
+            summary=paragraph(rng), vision=paragraph(rng, 2),
+            highlights=[sentence(rng, 6) for _ in range(4)], is_active=i == 0,
+        )
+
+
+def generate_social_links(rng, count):
+    for i in range(count):
+        yield SocialLink(
+            name=f'Link {i}', url=f'https://example.com/{i}', icon='link',
+            order=i, is_active=rng.random() < 0.9,
+        )
+
+
+def generate_projects(rng, count):
+    statuses = [choice for choice, _ in Project.STATUS_CHOICES]
+    for i in range(count):
+        title = f'{rng.choice(WORDS).capitalize()} {rng.choice(NOUNS)} {i}'
+        yield Project(
+            title=title, description=paragraph(rng, 2), long_description=paragraph(rng, 6),
+            technologies=technologies(rng),
+            features=[sentence(rng, 5) for _ in range(rng.randint(2, 6))],
+            github_url=f'https://github.com/example/project-{i}',
+            live_url=f'https://project-{i}.example.com' if rng.random() < 0.3 else '',
+            status=rng.choices(statuses, (8, 3, 1))[0],
+            created_at=spread(rng, count, 365 * 5, i), is_featured=rng.random() < 0.05,
+        )
+
+
+def generate_skills(rng, count):
+    categories = [choice for choice, _ in Skill.CATEGORY_CHOICES]
+    for i in range(count):
+        yield Skill(
+            name=f'{rng.choice(TECHNOLOGIES)} {i}',
+            category=categories[i % len(categories)],
+            level=rng.randint(30, 100),
+        )
+
+
+def generate_experience(rng, count):
+    for i in range(count):
+        start = (END - timedelta(days=rng.randint(30, 365 * 15))).date()
+        current = rng.random() < 0.1
+        yield Experience(
+            title=f'{rng.choice(WORDS).capitalize()} Engineer',
+            company=f'{rng.choice(NOUNS).capitalize()} Labs {i}', location='Remote',
+            start_date=start, is_current=current,
+            end_date=None if current else start + timedelta(days=rng.randint(90, 1500)),
+            description=[sentence(rng) for _ in range(rng.randint(2, 5))],
+            technologies=technologies(rng, 2, 6),
+        )
+
+
+def generate_certifications(rng, count):
+    for i in range(count):
+        yield Certification(
+            title=f'{rng.choice(TECHNOLOGIES)} {rng.choice(NOUNS).capitalize()} Certificate',
+            issuer=rng.choice(ISSUERS),
+            date_issued=(END - timedelta(days=rng.randint(0, 365 * 8))).date(),
+            credential_id=f'CERT-{i:08d}', description=sentence(rng, 16),
+            verification_url=f'https://verify.example.com/{i}',
+        )
+
+
+def generate_education(rng, count):
+    for i in range(count):
+        start = date(2000 + rng.randint(0, 22), 8, 1)
+        yield Education(
+            degree=f'B.Sc. {rng.choice(WORDS).capitalize()} Computing',
+            institution=f'University {i}', location='Campus',
+            start_date=start, end_date=start.replace(year=start.year + 4),
+            gpa=f'{rng.uniform(6, 10):.2f}/10', description=sentence(rng, 14),
+            coursework=[rng.choice(NOUNS).capitalize() for _ in range(5)],
+        )
+
+
+def generate_contacts(rng, count):
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = spread(rng, count, 365 * 3, i)
+        yield Contact(
+            name=f'{first} {last}', email=f'{first.lower()}.{i}@example.com',
+            subject=rng.choice(SUBJECTS), message=paragraph(rng, rng.randint(1, 4)),
+            created_at=created_at,
+            # Older messages have mostly been read
+            is_read=rng.random() < (END - created_at).days / 365,
+        )
+
+
+GENERATORS = {
+    'personal_info': (PersonalInfo, generate_personal_info),
+    'about': (About, generate_about),
+    'social_links': (SocialLink, generate_social_links),
+    'projects': (Project, generate_projects),
+    'skills': (Skill, generate_skills),
+    'experience': (Experience, generate_experience),
+    'certifications': (Certification, generate_certifications),
+    'education': (Education, generate_education),
+    'contacts': (Contact, generate_contacts),
+}
+
+
+def seed_models(sizes, seed=0, batch_size=5000, progress=None):
+    """
+    Insert ``sizes[name]`` generated rows for each name in GENERATORS.
+
+    ``progress(name, inserted, total)`` is called after every batch.
+    """
+    for name, count in sizes.items():
+        model, generator = GENERATORS[name]
+        rows = generator(random.Random(f'{seed}:{name}'), count)
+        inserted = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+            inserted += len(batch)
+            if progress is not None:
+                progress(name, inserted, count)
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import (
     PersonalInfo, About, SocialLink, Contact, Project, 
-    Skill, Experience, Certification, Education
+    Skill, Experience, Certification, Education, Technology
 )
 
 
@@ -78,3 +78,9 @@ class EducationSerializer(serializers.ModelSerializer):
             'id', 'degree', 'institution', 'location', 'start_date', 'end_date',
             'is_current', 'gpa', 'description', 'coursework', 'duration'
         ]
+
+
+class TechnologySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Technology
+        fields = ['id', 'name', 'project_count', 'experience_count']
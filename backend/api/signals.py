@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by ContentQuerySet after update()/bulk_create()/bulk_update(), which
+# do not fire post_save. Receivers get either ``queryset`` or ``objs``, and
+# ``fields``, the columns written, from update() and bulk_update().
+bulk_changed = Signal()
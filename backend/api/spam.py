@@ -0,0 +1,253 @@
+"""
+Near-duplicate and blocked-sender screening of contact submissions.
+
+A message is the set of its word pairs (shingles); two messages are near
+duplicates when the Jaccard similarity of their sets is at least
+``SIMILARITY``. Each message gets a MinHash signature of ``BANDS * ROWS``
+values, stored as one ContactFingerprint row per band of ``ROWS`` values.
+Messages that similar share a whole band with high probability (about 0.86
+at 0.6, 0.997 at 0.8, 0.06 at 0.2), so the candidates for a new message are
+found with ``BANDS`` seeks on the ``(band, created_at)`` index over the
+recent ``WINDOW``, and only those are compared exactly, instead of every
+stored message. A flood of copies would make every band a long list, so
+each seek reads only the ``MAX_CANDIDATES`` latest messages of its band
+(a LIMIT, so the rest of the band is never scanned), and a message stops
+being compared at its first near duplicate. The seeks of a batch go to the
+database as one UNION ALL per ``SEEKS_PER_QUERY`` bands.
+
+Blocked senders are the BlockedSender addresses and ``@domains``, loaded
+into a Bloom filter per blocklist version, which is read once per batch.
+Nearly every sender is not blocked, and the filter says so in microseconds
+without a query; the positive answers of a batch are confirmed with one
+indexed lookup.
+
+Screened contacts are stored with ``is_spam`` set and no notification email.
+"""
+import math
+import random
+import re
+from datetime import timedelta
+from hashlib import blake2b
+
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from .cache import get_version
+from .models import BlockedSender, Contact, ContactFingerprint
+
+BANDS = 8
+ROWS = 3
+SIMILARITY = 0.6
+# Shorter messages are too alike to call them duplicates
+MIN_SHINGLES = 6
+WINDOW = timedelta(days=7)
+# Latest messages per band compared with a new one
+MAX_CANDIDATES = 20
+# Band seeks per query; SQLite allows 500 SELECTs in one compound statement
+SEEKS_PER_QUERY = 200
+BLOOM_ERROR_RATE = 0.001
+BLOOM_KEY = 'api:blocklist:{token}'
+# Filters of replaced versions must not linger in the cache
+BLOOM_TIMEOUT = 60 * 60 * 24
+
+WORD = re.compile(r'\w+')
+PRIME = (1 << 61) - 1
+# One (a, b) pair per hash function h(x) = (a * x + b) mod PRIME, fixed so
+# stored fingerprints stay comparable across processes and releases
+_rng = random.Random('contact-minhash')
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(BANDS * ROWS)]
+
+
+def shingles(text):
+    words = WORD.findall(text.lower())
+    return {f'{a} {b}' for a, b in zip(words, words[1:])}
+
+
+def minhash(shingle_set):
+    values = [int.from_bytes(blake2b(shingle.encode(), digest_size=8).digest(), 'big') for shingle in shingle_set]
+    return [min((a * value + b) % PRIME for value in values) for a, b in PERMUTATIONS]
+
+
+def band_keys(shingle_set):
+    """
+    One signed 64-bit key per band of the MinHash, or None for short messages
+    """
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+    signature = minhash(shingle_set)
+    return [
+        int.from_bytes(
+            blake2b(repr((band, signature[band * ROWS:(band + 1) * ROWS])).encode(), digest_size=8).digest(),
+            'big', signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def contact_text(contact):
+    return f'{contact.subject}\n{contact.message}'
+
+
+class BloomFilter:
+    """
+    Set membership with no false negatives and ``error_rate`` false positives
+    """
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, value):
+        # Double hashing: k positions from one 128-bit digest
+        digest = blake2b(value.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'big'), int.from_bytes(digest[8:], 'big') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] >> (position & 7) & 1 for position in self.positions(value))
+
+
+def sender_keys(email):
+    email = email.strip().lower()
+    return [email, '@' + email.rpartition('@')[2]]
+
+
+class Blocklist:
+    """
+    Bloom filter of one version of the BlockedSender table
+    """
+    token = None
+    bloom = None
+
+    def load(self):
+        token = get_version('blocklist').token
+        if token != self.token:
+            key = BLOOM_KEY.format(token=token)
+            bloom = cache.get(key)
+            if bloom is None:
+                # Built by the first worker to see this version, shared via the cache
+                values = list(BlockedSender.objects.order_by().values_list('value', flat=True))
+                bloom = BloomFilter(len(values)) if values else None
+                for value in values:
+                    bloom.add(value)
+                cache.set(key, bloom, BLOOM_TIMEOUT)
+            self.token, self.bloom = token, bloom
+        return self.bloom
+
+    def blocked(self, emails):
+        """
+        The blocked ones of ``emails``, with one version read and at most one query
+        """
+        bloom = self.load()
+        if bloom is None:
+            return set()
+        candidates = {email: [key for key in sender_keys(email) if key in bloom] for email in emails}
+        wanted = {key for keys in candidates.values() for key in keys}
+        if not wanted:
+            return set()
+        found = set(BlockedSender.objects.filter(value__in=wanted).values_list('value', flat=True))
+        return {email for email, keys in candidates.items() if found.intersection(keys)}
+
+    def is_blocked(self, email):
+        return email in self.blocked([email])
+
+
+blocklist = Blocklist()
+
+
+def latest_fingerprints(bands, since):
+    """
+    Yield ``(contact_id, band)`` of the MAX_CANDIDATES latest messages since
+    ``since`` in each of ``bands``, newest first within a band
+    """
+    quote_name = connection.ops.quote_name
+    recent = ContactFingerprint.objects.filter(created_at__gte=since).order_by('-created_at')
+    for start in range(0, len(bands), SEEKS_PER_QUERY):
+        seeks = []
+        params = []
+        for index, band in enumerate(bands[start:start + SEEKS_PER_QUERY]):
+            seek = recent.filter(band=band).values_list('contact_id', 'band')[:MAX_CANDIDATES]
+            sql, seek_params = seek.query.get_compiler(connection=connection).as_sql()
+            # Wrapped, as a compound statement may not hold a LIMIT itself
+            seeks.append(f'SELECT * FROM ({sql}) AS {quote_name(f"seek{index}")}')
+            params.extend(seek_params)
+        with connection.cursor() as cursor:
+            cursor.execute(' UNION ALL '.join(seeks), params)
+            yield from cursor.fetchall()
+
+
+def screen(contacts):
+    """
+    Set ``is_spam`` on unsaved contacts and return their band keys.
+
+    A contact is spam if its sender is blocked or its message nearly
+    duplicates one from the last WINDOW, including earlier ones in
+    ``contacts``.
+    """
+    sets = [shingles(contact_text(contact)) for contact in contacts]
+    keys = [band_keys(shingle_set) for shingle_set in sets]
+    wanted = {key for own in keys if own for key in own}
+
+    # Recent messages by the band keys they share with ours. Stored ones are
+    # shingled only when compared; earlier contacts of the batch are keyed
+    # by their index.
+    candidates = {}
+    texts = {}
+    if wanted:
+        for contact_id, band in latest_fingerprints(sorted(wanted), timezone.now() - WINDOW):
+            candidates.setdefault(band, []).append(contact_id)
+        if candidates:
+            rows = Contact.objects.filter(pk__in={pk for pks in candidates.values() for pk in pks})
+            for pk, subject, message in rows.order_by().values_list('pk', 'subject', 'message'):
+                texts[pk] = f'{subject}\n{message}'
+    known = {}
+
+    def shingles_of(candidate):
+        if candidate not in known:
+            known[candidate] = shingles(texts.pop(candidate, ''))
+        return known[candidate]
+
+    blocked = blocklist.blocked({contact.email for contact in contacts})
+    for position, (contact, shingle_set, own) in enumerate(zip(contacts, sets, keys)):
+        if contact.email in blocked:
+            contact.is_spam = True
+        if own is None:
+            continue
+        if not contact.is_spam:
+            compared = set()
+            for key in own:
+                for candidate in candidates.get(key, ()):
+                    if candidate in compared:
+                        continue
+                    compared.add(candidate)
+                    if jaccard(shingle_set, shingles_of(candidate)) >= SIMILARITY:
+                        contact.is_spam = True
+                        break
+                if contact.is_spam:
+                    break
+        known[('batch', position)] = shingle_set
+        for key in own:
+            candidates.setdefault(key, []).append(('batch', position))
+    return keys
+
+
+def index(contacts, keys):
+    """
+    Store the fingerprints of saved contacts
+    """
+    ContactFingerprint.objects.bulk_create([
+        ContactFingerprint(contact=contact, band=key, created_at=contact.created_at)
+        for contact, own in zip(contacts, keys) if own is not None
+        for key in own
+    ], batch_size=2000)
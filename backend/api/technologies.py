@@ -0,0 +1,196 @@
+"""
+Normalized technology tags for projects and experience.
+
+``Project.technologies`` and ``Experience.technologies`` remain the JSON
+lists the API serves. This module mirrors them into Technology rows, matched
+by lowercased name, and the ProjectTechnology and ExperienceTechnology link
+tables. Their ``(technology, owner)`` indexes are an inverted index: the
+projects using a technology are one index range, so ``?tech=`` filters never
+read the JSON. Each Technology also counts the projects and experience
+entries using it, adjusted by the links every write adds and removes, so the
+facet list is one ordered read.
+
+api/receivers.py calls ``link`` when the JSON lists are saved or bulk
+written and ``unlink`` before a delete. ``manage.py rebuild_technologies``
+recomputes everything after raw SQL writes.
+"""
+from collections import Counter, namedtuple
+from itertools import islice
+
+from django.apps import apps as global_apps
+from django.db import connection, transaction
+from django.db.models import F
+
+Owner = namedtuple('Owner', ['through', 'field', 'count'])
+
+# Model label -> its link table, link column and Technology counter
+OWNERS = {
+    'api.Project': Owner('api.ProjectTechnology', 'project_id', 'project_count'),
+    'api.Experience': Owner('api.ExperienceTechnology', 'experience_id', 'experience_count'),
+}
+MATCH_MODES = ('all', 'any')
+BATCH_SIZE = 2000
+MAX_LENGTH = 100
+
+
+def tracked(model):
+    """
+    Whether ``model`` has technologies and is not a migration's historical model
+    """
+    label = model._meta.label
+    return label in OWNERS and global_apps.get_model(label) is model
+
+
+def normalize(values):
+    """
+    Map lowercased key -> display name for the names in a JSON list
+    """
+    names = {}
+    if isinstance(values, list):
+        for value in values:
+            # Anything but a string is not a technology name
+            if isinstance(value, str):
+                name = ' '.join(value.split())[:MAX_LENGTH]
+                if name:
+                    names.setdefault(name.lower(), name)
+    return names
+
+
+def technology_ids(names):
+    """
+    Return key -> Technology id for ``names``, creating the missing rows
+    """
+    Technology = global_apps.get_model('api', 'Technology')
+    ids = dict(Technology.objects.filter(key__in=list(names)).values_list('key', 'pk'))
+    missing = [Technology(key=key, name=name) for key, name in names.items() if key not in ids]
+    if missing:
+        # Another worker may create the same names meanwhile
+        Technology.objects.bulk_create(missing, ignore_conflicts=True)
+        created = Technology.objects.filter(key__in=[technology.key for technology in missing])
+        ids.update(created.values_list('key', 'pk'))
+    return ids
+
+
+def adjust(owner, added, removed):
+    """
+    Change the counters of the technologies in the ``added`` and ``removed`` ids
+    """
+    Technology = global_apps.get_model('api', 'Technology')
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    by_delta = {}
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta.setdefault(delta, []).append(pk)
+    # F() keeps concurrent adjustments from overwriting each other
+    for delta, ids in by_delta.items():
+        Technology.objects.filter(pk__in=ids).update(**{owner.count: F(owner.count) + delta})
+
+
+def link_batch(owner, objs):
+    through = global_apps.get_model(owner.through)
+    wanted = {obj.pk: normalize(obj.technologies) for obj in objs if obj.pk is not None}
+    if not wanted:
+        return
+    names = {}
+    for own in wanted.values():
+        for key, name in own.items():
+            names.setdefault(key, name)
+
+    with transaction.atomic():
+        ids = technology_ids(names)
+        desired = {(pk, ids[key]) for pk, own in wanted.items() for key in own}
+        existing = {
+            (owner_id, technology_id): pk
+            for pk, owner_id, technology_id in through.objects.filter(
+                **{f'{owner.field}__in': list(wanted)}
+            ).values_list('pk', owner.field, 'technology_id')
+        }
+        added = desired - existing.keys()
+        removed = existing.keys() - desired
+        through.objects.bulk_create([
+            through(**{owner.field: owner_id, 'technology_id': technology_id})
+            for owner_id, technology_id in added
+        ], batch_size=BATCH_SIZE)
+        if removed:
+            through.objects.filter(pk__in=[existing[pair] for pair in removed]).delete()
+        adjust(owner, [pair[1] for pair in added], [pair[1] for pair in removed])
+
+
+def link(model, objs):
+    """
+    Mirror the ``technologies`` lists of saved ``objs`` into links and counts
+    """
+    owner = OWNERS.get(model._meta.label)
+    if owner is None:
+        return
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, BATCH_SIZE))
+        if not batch:
+            break
+        link_batch(owner, batch)
+
+
+def rows(queryset):
+    return queryset.order_by().only('pk', 'technologies').iterator(chunk_size=BATCH_SIZE)
+
+
+def link_queryset(model, queryset):
+    link(model, rows(queryset))
+
+
+def unlink(model, ids):
+    """
+    Remove the links of the rows with ``ids``, before they are deleted
+    """
+    owner = OWNERS.get(model._meta.label)
+    if owner is None or not ids:
+        return
+    through = global_apps.get_model(owner.through)
+    links = through.objects.filter(**{f'{owner.field}__in': list(ids)})
+    removed = list(links.values_list('technology_id', flat=True))
+    if removed:
+        links.delete()
+        adjust(owner, [], removed)
+
+
+def rebuild():
+    """
+    Recompute every link and count from the JSON lists; return the technologies
+    """
+    Technology = global_apps.get_model('api', 'Technology')
+    quote_name = connection.ops.quote_name
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Raw deletes: QuerySet.delete() would load every link to send signals.
+            for owner in OWNERS.values():
+                table = global_apps.get_model(owner.through)._meta.db_table
+                cursor.execute(f'DELETE FROM {quote_name(table)}')
+        Technology.objects.update(project_count=0, experience_count=0)
+        for label in OWNERS:
+            model = global_apps.get_model(label)
+            link(model, rows(model._default_manager.all()))
+        Technology.objects.filter(project_count=0, experience_count=0).delete()
+        return Technology.objects.count()
+
+
+def filter_owners(queryset, names, match='all'):
+    """
+    Narrow projects or experience to those using all, or any, of ``names``
+    """
+    Technology = global_apps.get_model('api', 'Technology')
+    owner = OWNERS[queryset.model._meta.label]
+    through = global_apps.get_model(owner.through)
+    keys = list(normalize(names))
+    # Least used first, so the most selective lookup runs first
+    ids = list(
+        Technology.objects.filter(key__in=keys).order_by(owner.count).values_list('pk', flat=True)
+    )
+    if match == 'any':
+        return queryset.filter(pk__in=through.objects.filter(technology_id__in=ids).values(owner.field))
+    if len(ids) < len(keys):
+        return queryset.none()
+    for pk in ids:
+        queryset = queryset.filter(pk__in=through.objects.filter(technology_id=pk).values(owner.field))
+    return queryset
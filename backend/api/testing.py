@@ -0,0 +1,366 @@
+"""
+Test helpers: the test runner, query recording, query budgets, plan checks,
+dataset seeding and a local SMTP stand-in.
+"""
+import re
+import socketserver
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+from django.urls import reverse
+
+from .cache import clear_snapshots
+from .models import Certification, Contact, Education, Experience, Project, Skill
+from .query_budgets import QUERY_BUDGETS
+from .seeding import seed_models
+
+PROJECT_DIR = str(settings.BASE_DIR)
+
+
+class TestRunner(DiscoverRunner):
+    """
+    DiscoverRunner with a temporary file cache, in place before the test
+    database is migrated: the post_migrate version bump and the tests, which
+    clear the cache freely, never touch the development cache
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_directory = tempfile.TemporaryDirectory()
+        # File based like the deployed cache, so forked children share it
+        self.cache_settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(Path(self.cache_directory.name) / 'cache'),
+        }})
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        self.cache_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
+
+
+class QueryRecorder:
+    """
+    Context manager recording every query with its duration and call site
+    """
+
+    def __init__(self, using=connection):
+        self.connection = using
+        self.queries = []
+
+    def __enter__(self):
+        self.wrapper = self.connection.execute_wrapper(self)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wrapper.__exit__(*exc_info)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': params,
+                'duration': time.perf_counter() - started,
+                'stack': call_site(),
+            })
+
+    @property
+    def db_ms(self):
+        return sum(query['duration'] for query in self.queries) * 1000
+
+    def report(self):
+        lines = []
+        for number, query in enumerate(self.queries, 1):
+            lines.append(f"{number}. [{query['duration'] * 1000:.2f} ms] {query['sql']}")
+            lines.extend(f'     {frame}' for frame in query['stack'])
+        return '\n'.join(lines)
+
+
+def call_site():
+    """
+    Return the project frames of the current stack, innermost last
+    """
+    return [
+        f'{frame.filename}:{frame.lineno} in {frame.name}'
+        for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(PROJECT_DIR)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('testing.py')
+    ]
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting the budgets declared in api/query_budgets.py
+
+    Requests are measured cold, after clearing the cache: run it with a
+    test cache configured, as api/tests.py does.
+    """
+    detail_models = {
+        'project-detail': Project,
+        'skill-detail': Skill,
+        'experience-detail': Experience,
+        'certification-detail': Certification,
+        'education-detail': Education,
+        'contact-detail': Contact,
+    }
+    contact_data = {
+        'name': 'Budget', 'email': 'budget@example.com', 'subject': 'Budget',
+        'message': 'Long enough to be fingerprinted and compared with recent messages',
+    }
+
+    def route_request(self, route, method):
+        """
+        Return the URL and body of a representative request to ``route``
+        """
+        if route in self.detail_models:
+            url = reverse(route, args=[self.detail_models[route].objects.first().pk])
+        elif route == 'export':
+            url = reverse(route, args=['contacts'])
+        else:
+            url = reverse(route)
+        if route == 'search':
+            url += '?q=python'
+        return url, self.contact_data if method == 'POST' else None
+
+    def request_cold(self, method, url, data=None):
+        clear_snapshots()
+        cache.clear()
+        with QueryRecorder() as recorder:
+            response = getattr(self.client, method.lower())(url, data, format='json')
+            if response.streaming:
+                # Streamed bodies run their queries as they are read
+                response.streaming_content = [b''.join(response.streaming_content)]
+        return response, recorder
+
+    def assertWithinBudget(self, route, method, url, data=None):
+        budget = QUERY_BUDGETS[(route, method)]
+        response, recorder = self.request_cold(method, url, data)
+        self.assertLess(response.status_code, 400, f'{method} {url}')
+        if len(recorder.queries) > budget.queries or recorder.db_ms > budget.db_ms:
+            self.fail(
+                f'{method} {url} ({route}) exceeded its query budget: '
+                f'{len(recorder.queries)} queries / {recorder.db_ms:.1f} ms, '
+                f'budget {budget.queries} queries / {budget.db_ms} ms\n{recorder.report()}'
+            )
+        return response
+
+
+def explain(sql, params, using=connection):
+    """
+    Return the plan of a query as lines, on SQLite or PostgreSQL
+    """
+    with using.cursor() as cursor:
+        if using.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            return list(postgres_plan_lines(cursor.fetchone()[0][0]['Plan']))
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def postgres_plan_lines(node, depth=0):
+    relation = f" on {node['Relation Name']}" if 'Relation Name' in node else ''
+    index = f" using {node['Index Name']}" if 'Index Name' in node else ''
+    yield '  ' * depth + node['Node Type'] + index + relation
+    for child in node.get('Plans', []):
+        yield from postgres_plan_lines(child, depth + 1)
+
+
+SQLITE_TABLE_SCAN = re.compile(r'^SCAN (\w+)$')
+SQLITE_INDEX_SCAN = re.compile(r'^SCAN (\w+) USING (?:COVERING )?INDEX (\w+)')
+POSTGRES_TABLE_SCAN = re.compile(r'Seq Scan on (\w+)')
+SQLITE_SUBQUERY = re.compile(r'^\s*(?:CO-ROUTINE|MATERIALIZE) (\w+)$')
+
+
+def partial_indexes():
+    return {
+        index.name
+        for model in apps.get_app_config('api').get_models()
+        for index in model._meta.indexes
+        if index.condition is not None
+    }
+
+
+def select_levels(sql):
+    """
+    Return the text of each SELECT in a statement, its subqueries left out
+    """
+    levels = []
+    stack = [[0, []]]
+    for index, char in enumerate(sql):
+        if char == '(':
+            stack[-1][1].append(sql[stack[-1][0]:index + 1])
+            stack.append([index + 1, []])
+        elif char == ')' and len(stack) > 1:
+            start, parts = stack.pop()
+            levels.append(''.join(parts) + sql[start:index])
+            stack[-1][0] = index
+    start, parts = stack.pop()
+    levels.append(''.join(parts) + sql[start:])
+    return [level for level in levels if re.match(r'\s*SELECT\b', level, re.IGNORECASE)]
+
+
+def plan_problems(sql, plan):
+    """
+    Return the reasons a query plan is unacceptable on a large dataset.
+
+    A filtered query must seek an index or walk a partial index holding only
+    the matching rows. A query that is only limited may walk an index but
+    never the table. Whole-table reads (the snapshot builds) may scan, but
+    on SQLite must not sort the table in memory. A step reading a table is
+    judged by every SELECT naming that table, so a subquery is held to its
+    own filter and limit.
+    """
+    partial = partial_indexes()
+    levels = select_levels(sql) or [sql]
+
+    def conditions(table):
+        named = [
+            level for level in levels
+            if re.search(rf'(?<![\w.]){re.escape(table)}(?!\w)', level.replace('"', ''))
+        ] or levels
+        return (
+            any(re.search(r'\bWHERE\b', level, re.IGNORECASE) for level in named),
+            any(re.search(r'\bLIMIT\b', level, re.IGNORECASE) for level in named),
+        )
+
+    # Subqueries SQLite runs as co-routines or materializes are no tables
+    subqueries = {match.group(1) for match in map(SQLITE_SUBQUERY.match, plan) if match}
+    filtered = re.search(r'\bWHERE\b', sql, re.IGNORECASE)
+    limited = re.search(r'\bLIMIT\b', sql, re.IGNORECASE)
+    problems = []
+    for line in plan:
+        step = line.strip()
+        table = SQLITE_TABLE_SCAN.match(step) or POSTGRES_TABLE_SCAN.search(step)
+        index = SQLITE_INDEX_SCAN.match(step)
+        if table and table.group(1) not in subqueries and any(conditions(table.group(1))):
+            problems.append(f'full table scan of {table.group(1)}')
+        elif index and conditions(index.group(1))[0] and index.group(2) not in partial:
+            problems.append(f'full index scan of {index.group(1)}')
+        elif step.startswith('USE TEMP B-TREE FOR ORDER BY'):
+            problems.append('rows sorted without an index')
+        elif step == 'Sort' and (filtered or limited):
+            problems.append('rows sorted without an index')
+    return problems
+
+
+class PlanCheckMixin(QueryBudgetMixin):
+    """
+    TestCase mixin failing when a request runs a query with a bad plan
+    """
+
+    def assertIndexedPlans(self, method, url, data=None):
+        response, recorder = self.request_cold(method, url, data)
+        self.assertLess(response.status_code, 400, f'{method} {url}')
+        failures = []
+        for query in recorder.queries:
+            if not query['sql'].lstrip().upper().startswith('SELECT'):
+                continue
+            plan = explain(query['sql'], query['params'])
+            problems = plan_problems(query['sql'], plan)
+            if problems:
+                failures.append('\n'.join(
+                    [f"{', '.join(problems)}:", f"  {query['sql']}"]
+                    + [f'  | {line}' for line in plan]
+                    + [f'     {frame}' for frame in query['stack']]
+                ))
+        if failures:
+            self.fail(f'{method} {url} runs unindexed queries:\n' + '\n'.join(failures))
+        return response
+
+
+def seed_portfolio(projects=50, skills=40, experience=5, certifications=10,
+                   education=2, contacts=0):
+    """
+    Add a portfolio of the given size to the database
+    """
+    seed_models({
+        'personal_info': 1, 'about': 1, 'social_links': 5, 'projects': projects,
+        'skills': skills, 'experience': experience, 'certifications': certifications,
+        'education': education, 'contacts': contacts,
+    })
+
+
+class SMTPStandIn:
+    """
+    Minimal threaded SMTP server keeping received messages in memory.
+
+    ``fail_next`` rejects that many messages with a temporary 451 at the end
+    of DATA. Use as a context manager; ``port`` is picked by the OS.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.fail_next = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                with standin.lock:
+                    standin.connections += 1
+                self.reply('220 localhost SMTP stand-in')
+                envelope = {'from': None, 'to': []}
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb in ('HELO', 'EHLO'):
+                        self.reply('250 localhost')
+                    elif verb == 'MAIL':
+                        envelope = {'from': command[10:].strip('<> '), 'to': []}
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        envelope['to'].append(command[8:].strip('<> '))
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = []
+                        for raw in iter(self.rfile.readline, b''):
+                            if raw in (b'.\r\n', b'.\n'):
+                                break
+                            data.append(raw)
+                        with standin.lock:
+                            if standin.fail_next:
+                                standin.fail_next -= 1
+                                self.reply('451 Try again later')
+                                continue
+                            standin.messages.append({**envelope, 'data': b''.join(data).decode()})
+                        self.reply('250 Queued')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:  # RSET, NOOP
+                        self.reply('250 OK')
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,8 +1,80 @@
-from django.test import TestCase
-from rest_framework.test import APITestCase
-from rest_framework import status
-from django.urls import reverse
-from .models import Contact, Project
+import asyncio
+import base64
+import csv
+import gzip
+import importlib
+import io
+import json
+import os
+import multiprocessing
+import runpy
+import tempfile
+import threading
+import unittest
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+import brotli
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.models.deletion import Collector
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import serializers, status
+from django.urls import include, path, reverse, reverse_lazy
+from .cache import SECTIONS, build_portfolio_summary, clear_snapshots, get_section, get_snapshot
+from .compiled import compile_serializer
+from . import (
+    archive, async_views, changelist, export, ingest, metrics, middleware, outbox, receivers, search, spam,
+    technologies, throttling, urls as api_urls, warmup,
+)
+from .models import (
+    BlockedSender, Certification, Contact, ContactFingerprint, Education, Experience,
+    ExperienceTechnology, OutboxEmail, Project, ProjectTechnology, Skill, Technology
+)
+from .query_budgets import DATASET_SIZES, QUERY_BUDGETS
+from .serializers import (
+    PersonalInfoSerializer, AboutSerializer, SocialLinkSerializer,
+    ContactSerializer, ProjectSerializer, SkillSerializer,
+    ExperienceSerializer, CertificationSerializer, EducationSerializer
+)
+from .pagination import KeysetPagination
+from .seeding import seed_models
+from .testing import (
+    PlanCheckMixin, QueryBudgetMixin, QueryRecorder, SMTPStandIn, explain, plan_problems,
+    seed_portfolio
+)
+
+
+def setUpModule():
+    # Throttle buckets go to a temporary database, and only ThrottleTestCase
+    # sets rates, so other tests may post as often as they need. The metrics
+    # files go to a temporary directory too, like the cache (see
+    # api.testing.TestRunner). Outbox tests deliver explicitly, never from a
+    # background drainer.
+    directory = tempfile.TemporaryDirectory()
+    unittest.addModuleCleanup(directory.cleanup)
+    throttle = override_settings(
+        API_THROTTLE_DB=str(Path(directory.name) / 'buckets.sqlite3'),
+        REST_FRAMEWORK={**django_settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}},
+        API_METRICS_DIR=str(Path(directory.name) / 'metrics'),
+        API_OUTBOX_IN_PROCESS=False,
+    )
+    throttle.enable()
+    unittest.addModuleCleanup(throttle.disable)
+    # Retire into the temporary directory while it is still configured
+    unittest.addModuleCleanup(metrics.registry.retire)
 
 
 class ContactAPITestCase(APITestCase):
@@ -36,5 +108,1883 @@ class ProjectAPITestCase(APITestCase):
         url = reverse('project-list')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Test Project')
+        # A page of the paginated list, newest first
+        results = response.json()['results']
+        self.assertEqual(results[0]['title'], 'Test Project')
+        self.assertEqual(len(results), min(Project.objects.count(), django_settings.REST_FRAMEWORK['PAGE_SIZE']))
+
+
+class SnapshotCacheTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        self.project = Project.objects.create(
+            title='Cached Project',
+            description='Cached Description',
+            technologies=['Python'],
+            status='completed',
+            is_featured=True
+        )
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def get_project(self):
+        response = self.client.get(reverse('project-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return next(p for p in response.json()['results'] if p['id'] == self.project.id)
+
+    def test_repeated_reads_skip_database(self):
+        """Test that a warm snapshot is served without queries"""
+        self.get_project()
+        self.client.get(reverse('portfolio-summary'))
+        with self.assertNumQueries(0):
+            self.get_project()
+            self.client.get(reverse('portfolio-summary'))
+
+    def test_admin_edit_visible_on_next_request(self):
+        """Test that saving through the admin invalidates the snapshot"""
+        self.assertEqual(self.get_project()['title'], 'Cached Project')
+
+        self.client.force_login(self.admin)
+        url = reverse('admin:api_project_change', args=[self.project.id])
+        data = {
+            'title': 'Edited Project',
+            'description': 'Cached Description',
+            'long_description': '',
+            'technologies': '["Python"]',
+            'features': '[]',
+            'github_url': '',
+            'live_url': '',
+            'status': 'completed',
+            'is_featured': 'on',
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.client.logout()
+
+        self.assertEqual(self.get_project()['title'], 'Edited Project')
+
+    def test_bulk_update_invalidates_snapshot(self):
+        """Test that queryset.update() invalidates the snapshot"""
+        self.get_project()
+        Project.objects.filter(id=self.project.id).update(title='Bulk Edited')
+        self.assertEqual(self.get_project()['title'], 'Bulk Edited')
+
+    def test_receivers_only_for_cached_models(self):
+        """Test that models outside the snapshot, search and technologies get no receivers"""
+        self.assertTrue(post_save.has_listeners(Project))
+        self.assertTrue(post_delete.has_listeners(Contact))
+        self.assertTrue(pre_delete.has_listeners(Experience))
+        for signal in (post_save, pre_delete, post_delete):
+            self.assertFalse(signal.has_listeners(OutboxEmail))
+        # So the deletion collector may delete such rows in one query
+        self.assertTrue(Collector('default').can_fast_delete(OutboxEmail.objects.all()))
+
+
+class BootstrapAPITestCase(APITestCase):
+    endpoints = {
+        'personal_info': reverse_lazy('personal-info'),
+        'about': reverse_lazy('about-info'),
+        'social_links': reverse_lazy('social-links'),
+        'projects': reverse_lazy('project-list'),
+        'skills': reverse_lazy('skill-list'),
+        'experience': reverse_lazy('experience-list'),
+        'education': reverse_lazy('education-list'),
+        'certifications': reverse_lazy('certification-list'),
+        'portfolio_summary': reverse_lazy('portfolio-summary'),
+    }
+
+    def setUp(self):
+        clear_snapshots()
+        for i in range(25):
+            Project.objects.create(
+                title=f'Project {i}',
+                description='Description',
+                technologies=['Python'],
+                is_featured=i % 2 == 0
+            )
+
+    def test_sections_match_endpoints(self):
+        """Test that every section has the body of its own endpoint"""
+        response = self.client.get(reverse('bootstrap'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for name, url in self.endpoints.items():
+            self.assertEqual(response.json()[name], self.client.get(url).json(), name)
+        self.assertEqual(
+            response.json()['featured_projects'],
+            self.client.get(reverse('project-list'), {'featured': 'true'}).json()
+        )
+
+    def test_sections_parameter(self):
+        """Test that only the requested sections are returned"""
+        response = self.client.get(reverse('bootstrap'), {'sections': 'skills,about'})
+        self.assertEqual(set(response.json()), {'skills', 'about'})
+
+        response = self.client.get(reverse('bootstrap'), {'sections': 'skills,nope'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def cold_query_count(self):
+        clear_snapshots()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('bootstrap'))
+        return len(queries)
+
+    def test_fixed_query_count(self):
+        """Test that the query count does not grow with the data"""
+        small = self.cold_query_count()
+        for i in range(50):
+            Project.objects.create(title=f'More {i}', description='More')
+        self.assertEqual(self.cold_query_count(), small)
+        with self.assertNumQueries(0):
+            self.client.get(reverse('bootstrap'))
+
+
+class ConditionalGetTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        cache.clear()
+        self.project = Project.objects.create(title='Conditional', description='Description')
+
+    def test_etag_and_last_modified(self):
+        """Test that read endpoints answer revalidation with 304"""
+        for url in [reverse('project-list'), reverse('skill-list'),
+                    reverse('portfolio-summary'), reverse('personal-info')]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            etag = response.headers['ETag']
+            self.assertFalse(etag.startswith('W/'))
+
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            response = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response.headers['Last-Modified']
+            )
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED, url)
+
+    def test_variants_have_distinct_etags(self):
+        """Test that query-parameter variants are tagged separately"""
+        url = reverse('project-list')
+        all_projects = self.client.get(url).headers['ETag']
+        featured = self.client.get(url, {'featured': 'true'}).headers['ETag']
+        self.assertNotEqual(all_projects, featured)
+
+    def test_edit_changes_etag(self):
+        """Test that an edit invalidates previously issued validators"""
+        url = reverse('project-list')
+        etag = self.client.get(url).headers['ETag']
+        self.project.title = 'Edited'
+        self.project.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_freshness_check_cost(self):
+        """Test that a 304 costs one query cold and none when cached"""
+        url = reverse('project-list')
+        cache.clear()
+        etag = self.client.get(url).headers['ETag']
+        cache.clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(0):
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_every_model_tracks_modification(self):
+        """Test that all content models record when they were last modified"""
+        for model in apps.get_app_config('api').get_models():
+            if model in (OutboxEmail, ContactFingerprint, Technology, ProjectTechnology, ExperienceTechnology):
+                continue  # A delivery queue and derived indexes, not content
+            self.assertIn('updated_at', [f.name for f in model._meta.fields], model)
+
+
+class MaterializedResponseTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        Project.objects.create(title='Materialized', description='Description', is_featured=True)
+
+    def test_repeat_reads_skip_rendering(self):
+        """Test that stored bytes are served without serializing or rendering"""
+        url = reverse('project-list')
+        first = self.client.get(url, {'featured': 'true'})
+        with mock.patch.object(JSONRenderer, 'render', side_effect=AssertionError), \
+                mock.patch.object(ProjectSerializer, 'to_representation', side_effect=AssertionError):
+            second = self.client.get(url, {'featured': 'true'})
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second.headers['Content-Type'], 'application/json')
+        self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+
+    def test_unknown_parameters_are_rendered(self):
+        """Test that unknown query parameters do not create stored variants"""
+        url = reverse('portfolio-summary')
+        self.client.get(url, {'utm_source': 'x'})
+        with mock.patch.object(JSONRenderer, 'render', wraps=JSONRenderer().render) as render:
+            self.client.get(url, {'utm_source': 'x'})
+        self.assertTrue(render.called)
+
+    def test_negotiated_renderings_are_tagged_apart(self):
+        """Test that a rendering picked by Accept never shares the stored bytes' ETag"""
+        url = reverse('project-list')
+        stored = self.client.get(url)
+        indented = self.client.get(url, HTTP_ACCEPT='application/json; indent=4', HTTP_IF_NONE_MATCH=stored['ETag'])
+        self.assertEqual(indented.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(indented.content, stored.content)
+        self.assertNotEqual(indented['ETag'], stored['ETag'])
+        self.assertIn('Accept', indented['Vary'])
+        again = self.client.get(url, HTTP_ACCEPT='application/json; indent=4', HTTP_IF_NONE_MATCH=indented['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_edit_rerenders(self):
+        """Test that an edit replaces the stored bytes"""
+        url = reverse('project-list')
+        self.client.get(url)
+        Project.objects.create(title='Newest', description='Description')
+        self.assertEqual(self.client.get(url).json()['results'][0]['title'], 'Newest')
+
+
+class CompressedResponseTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        for i in range(10):
+            Project.objects.create(title=f'Compressed {i}', description='Description ' * 20)
+
+    def test_encodings(self):
+        """Test that stored variants are chosen by Accept-Encoding"""
+        url = reverse('project-list')
+        plain = self.client.get(url)
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertIn('Accept-Encoding', plain.headers['Vary'])
+
+        gzipped = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(gzipped.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', gzipped.headers['Vary'])
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertNotEqual(gzipped.headers['ETag'], plain.headers['ETag'])
+
+        brotlied = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0.5, br')
+        self.assertEqual(brotlied.headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(brotlied.content), plain.content)
+
+        refused = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        self.assertNotIn('Content-Encoding', refused.headers)
+
+    def test_compression_runs_once(self):
+        """Test that compression happens once per content change"""
+        url = reverse('portfolio-summary')
+        with mock.patch('api.materialized.gzip.compress', wraps=gzip.compress) as compress:
+            for _ in range(3):
+                self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compress.call_count, 1)
+
+
+class CompiledSerializerParityTestCase(TestCase):
+    serializers = [
+        PersonalInfoSerializer, AboutSerializer, SocialLinkSerializer,
+        ContactSerializer, ProjectSerializer, SkillSerializer,
+        ExperienceSerializer, CertificationSerializer, EducationSerializer,
+    ]
+
+    def setUp(self):
+        Project.objects.create(
+            title='With image', description='Ünïcode “quotes”', image='projects/shot.png',
+            technologies=['Python', {'nested': [1, 2.5, None]}], features=[],
+            is_featured=True
+        )
+        Project.objects.create(title='', description='', technologies=[], status='planned')
+        Experience.objects.create(
+            title='Current', company='Co', location='Remote', start_date=date(2024, 2, 1),
+            is_current=True
+        )
+        Experience.objects.create(
+            title='Ended', company='Co', location='Remote', start_date=date(2021, 2, 1),
+            end_date=date(2022, 3, 1)
+        )
+        Experience.objects.create(
+            title='Open', company='Co', location='Remote', start_date=date(2020, 2, 1)
+        )
+        Education.objects.create(
+            degree='Current', institution='U', location='L', start_date=date(2022, 8, 1),
+            is_current=True, description='', coursework=[]
+        )
+        Certification.objects.create(
+            title='Logo', issuer='I', date_issued=date(2023, 1, 1), description='',
+            logo='certifications/logo.png'
+        )
+        Certification.objects.create(title='No logo', issuer='I', date_issued=date(2023, 2, 1), description='')
+        Contact.objects.create(name='N', email='n@example.com', subject='S', message='M')
+        Skill.objects.create(name='Python', category='programming', level=90)
+
+    def assertParity(self, context):
+        renderer = JSONRenderer()
+        for serializer_class in self.serializers:
+            queryset = serializer_class.Meta.model.objects.all()
+            expected = renderer.render(serializer_class(queryset, many=True, context=context).data)
+            compiled = compile_serializer(serializer_class).serialize(queryset, context)
+            self.assertEqual(renderer.render(compiled), expected, serializer_class.__name__)
+
+    def test_parity_without_request(self):
+        """Test that compiled output matches DRF byte for byte"""
+        self.assertParity({})
+
+    def test_parity_with_request(self):
+        """Test that file URLs are made absolute like DRF does"""
+        self.assertParity({'request': APIRequestFactory().get('/')})
+
+    def test_uncompilable_field(self):
+        """Test that fields without a fast path are rejected at compile time"""
+        class MethodSerializer(serializers.ModelSerializer):
+            label = serializers.SerializerMethodField()
+
+            class Meta:
+                model = Skill
+                fields = ['id', 'label']
+
+        with self.assertRaises(TypeError):
+            compile_serializer(MethodSerializer)
+
+
+class PortfolioSummaryTestCase(APITestCase):
+    # Query budget of portfolio_summary; raise only with a good reason.
+    COLD_QUERIES = 1        # counts and latest rows in one query
+
+    def setUp(self):
+        clear_snapshots()
+        cache.clear()
+        self.client.get(reverse('portfolio-summary'))  # cache the version
+
+    def test_query_budget(self):
+        """Test the portfolio_summary query budget"""
+        clear_snapshots()
+        with self.assertNumQueries(self.COLD_QUERIES):
+            self.client.get(reverse('portfolio-summary'))
+        with self.assertNumQueries(0):
+            self.client.get(reverse('portfolio-summary'))
+
+    def test_rows_match_sections(self):
+        """Test that the summary rows are those of the sections they come from"""
+        Project.objects.update(is_featured=True)
+        clear_snapshots()
+        summary = build_portfolio_summary({})
+        self.assertEqual(summary['projects'], get_section('featured_projects')[:6])
+        self.assertEqual(summary['education'], (get_section('education') or [None])[0])
+        self.assertEqual(summary['latest_experience'], (get_section('experience') or [None])[0])
+
+    def test_empty_tables(self):
+        """Test that empty slices do not hide the counts or each other"""
+        Project.objects.update(is_featured=False)
+        Education.objects.all().delete()
+        clear_snapshots()
+        summary = build_portfolio_summary({})
+        self.assertEqual((summary['projects'], summary['education']), ([], None))
+        self.assertEqual(summary['skills_count'], Skill.objects.count())
+        latest = Experience.objects.order_by('-start_date', '-id').first()
+        self.assertEqual(summary['latest_experience']['id'], latest.id if latest else None)
+
+    def test_summary_content(self):
+        """Test that summary values match the database"""
+        data = self.client.get(reverse('portfolio-summary')).json()
+        self.assertEqual(data['skills_count'], Skill.objects.count())
+        self.assertEqual(data['experience_count'], Experience.objects.count())
+        self.assertEqual(data['certifications_count'], Certification.objects.count())
+        self.assertEqual(
+            [p['id'] for p in data['projects']],
+            list(Project.objects.filter(is_featured=True).values_list('id', flat=True)[:6])
+        )
+        latest = Experience.objects.first()
+        self.assertEqual(data['latest_experience']['id'], latest.id if latest else None)
+
+
+@override_settings(API_METRICS_TOKEN='budget', API_EXPORT_TOKEN='budget')
+class QueryBudgetTestCase(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer budget')
+
+    def route_names(self, patterns):
+        for pattern in patterns:
+            if hasattr(pattern, 'url_patterns'):
+                yield from self.route_names(pattern.url_patterns)
+            else:
+                yield pattern.name
+
+    def test_every_route_has_budget(self):
+        """Test that no route in api/urls.py lacks a query budget"""
+        budgeted = {route for route, method in QUERY_BUDGETS}
+        self.assertEqual(set(self.route_names(api_urls.urlpatterns)) - budgeted, set())
+
+    def test_budgets_hold_as_data_grows(self):
+        """Test every route against its budget on increasingly large datasets"""
+        seeded = 0
+        for size in DATASET_SIZES:
+            seed_portfolio(
+                projects=size - seeded, skills=size - seeded, experience=size - seeded,
+                certifications=size - seeded, education=size - seeded, contacts=size - seeded
+            )
+            seeded = size
+            for route, method in QUERY_BUDGETS:
+                with self.subTest(route=route, method=method, size=size):
+                    self.assertWithinBudget(route, method, *self.route_request(route, method))
+
+    def test_report_shows_sql_and_call_site(self):
+        """Test that budget failures print the SQL and where it was issued"""
+        with QueryRecorder() as recorder:
+            list(Project.objects.filter(title='report'))
+        report = recorder.report()
+        self.assertIn('"api_project"', report)
+        self.assertIn('tests.py', report)
+        self.assertIn('test_report_shows_sql_and_call_site', report)
+
+
+@override_settings(API_SERVER_TIMING=True)
+class ServerTimingTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        cache.clear()
+        Skill.objects.create(name='Timing', category='tools', level=80)
+
+    def test_phases_in_header_and_log(self):
+        """Test that API responses report their db, serialize and render time"""
+        with self.assertLogs('api.timing', 'INFO') as logs, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('skill-list'))
+        header = response.headers['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(metric, header)
+        self.assertIn(f'desc="{len(queries)} queries"', header)
+
+        timing = logs.records[0].timing
+        self.assertEqual(timing['path'], reverse('skill-list'))
+        self.assertEqual(timing['status'], 200)
+        self.assertEqual(timing['queries'], len(queries))
+        self.assertGreater(timing['serialize_ms'], 0)
+        self.assertGreater(timing['render_ms'], 0)
+        self.assertLessEqual(
+            timing['db_ms'] + timing['serialize_ms'] + timing['render_ms'],
+            timing['total_ms'] + 0.05
+        )
+
+    def test_cached_read_has_no_phases(self):
+        """Test that a materialized read reports no queries and no rendering"""
+        url = reverse('skill-list')
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertIn('db;dur=0.00;desc="0 queries"', response.headers['Server-Timing'])
+        self.assertIn('render;dur=0.00', response.headers['Server-Timing'])
+
+    @override_settings(API_SERVER_TIMING=False)
+    def test_disabled(self):
+        """Test that the middleware drops out when disabled"""
+        response = self.client.get(reverse('skill-list'))
+        self.assertNotIn('Server-Timing', response.headers)
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(
+            API_METRICS=True, API_METRICS_DIR=directory.name, API_METRICS_TOKEN='secret'
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # A cached version, whichever tests ran before
+        get_snapshot('content')
+        metrics.registry.reset()
+
+    def scrape(self):
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        return response.content.decode()
+
+    def test_requests_are_recorded(self):
+        """Test per-route counters, latency histograms and cache hit rates"""
+        url = reverse('skill-list')
+        self.client.get(url)
+        self.client.get(url)
+        self.client.get(reverse('project-detail', args=[0]))
+        text = self.scrape()
+        self.assertIn('api_requests_total{route="skill-list",method="GET",status="200"} 2', text)
+        self.assertIn('api_requests_total{route="project-detail",method="GET",status="404"} 1', text)
+        self.assertIn('api_request_duration_seconds_count{route="skill-list",method="GET"} 2', text)
+        self.assertIn('api_request_duration_seconds_bucket{route="skill-list",method="GET",le="+Inf"} 2', text)
+        # The second read is served from stored bytes without a query.
+        self.assertIn('api_db_queries_total{route="skill-list",method="GET"} 1', text)
+        self.assertIn('api_cache_requests_total{cache="response",result="hit"} 1', text)
+        self.assertIn('api_cache_requests_total{cache="response",result="miss"} 1', text)
+
+    def test_workers_are_summed(self):
+        """Test that samples written by other workers are aggregated"""
+        self.client.get(reverse('health-check'))
+        # pid 1 outlives the test
+        self.write_worker('1-other', 4)
+        self.assertIn('api_requests_total{route="health-check",method="GET",status="200"} 5', self.scrape())
+
+    def write_worker(self, name, requests):
+        (self.directory / f'{name}.json').write_text(json.dumps({
+            'counters': [['api_requests_total', [['route', 'health-check'], ['method', 'GET'],
+                                                 ['status', '200']], requests]],
+            'histograms': [],
+        }))
+
+    def test_dead_workers_are_folded(self):
+        """Test that files of dead workers are pruned without losing their counts"""
+        process = multiprocessing.Process(target=int)
+        process.start()
+        process.join()
+        self.write_worker(f'{process.pid}-killed', 4)
+        self.client.get(reverse('health-check'))
+        sample = 'api_requests_total{route="health-check",method="GET",status="200"} 5'
+        self.assertIn(sample, self.scrape())
+        self.assertFalse((self.directory / f'{process.pid}-killed.json').exists())
+        # A worker exiting folds its own file, and counts never go down
+        self.addCleanup(metrics.registry.reset)
+        metrics.registry.retire()
+        self.assertEqual(sorted(path.name for path in self.directory.glob('*.json')), ['dead.json'])
+        self.assertIn(sample, metrics.render())
+
+    def test_concurrent_flushes(self):
+        """Test that flushes racing each other, like the timer and a scrape, all succeed"""
+        metrics.registry.inc('api_requests_total', (('route', 'health-check'),))
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(50):
+                    metrics.registry.flush()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=flush) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual([path.suffix for path in self.directory.iterdir()], ['.json'])
+
+    def test_protected(self):
+        """Test that the endpoint needs the configured token"""
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+        wrong = self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(wrong.status_code, status.HTTP_401_UNAUTHORIZED)
+        with override_settings(API_METRICS_TOKEN=''):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class KeysetPaginationTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        Project.objects.all().delete()
+        created = timezone.now()
+        # Ties on created_at must be broken by id, never repeated or skipped.
+        Project.objects.bulk_create(
+            Project(title=f'Keyset {i}', description='Description',
+                    created_at=created - timedelta(days=i // 3), is_featured=i % 2 == 0)
+            for i in range(45)
+        )
+        self.expected = list(Project.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def walk(self, url, direction):
+        ids = []
+        while url:
+            page = self.client.get(url).json()
+            ids.append([project['id'] for project in page['results']])
+            url = page[direction]
+        return ids
+
+    def test_pages_cover_every_row_once(self):
+        """Test that following next and then previous links is stable"""
+        forward = self.walk(reverse('project-list') + '?cursor=', 'next')
+        self.assertEqual([len(page) for page in forward], [20, 20, 5])
+        self.assertEqual(sum(forward, []), self.expected)
+
+        last = self.client.get(reverse('project-list') + '?cursor=').json()
+        while last['next']:
+            last = self.client.get(last['next']).json()
+        backward = self.walk(last['previous'], 'previous')
+        self.assertEqual(backward, forward[-2::-1])
+
+    def test_featured_filter(self):
+        """Test that keyset pages honour ?featured=true"""
+        featured = self.walk(reverse('project-list') + '?featured=true&cursor=', 'next')
+        self.assertEqual(
+            sum(featured, []),
+            list(Project.objects.filter(is_featured=True).order_by('-created_at', '-id')
+                 .values_list('id', flat=True))
+        )
+
+    def test_deep_page_is_one_seek(self):
+        """Test that a page is one query without COUNT or OFFSET"""
+        page = self.client.get(reverse('project-list') + '?cursor=').json()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(page['next'])
+        self.assertEqual(len(queries), 1)
+        sql = queries[0]['sql'].upper()
+        self.assertNotIn('COUNT', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_invalid_cursor(self):
+        """Test that a malformed cursor is a 404"""
+        response = self.client.get(reverse('project-list'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # Well-formed JSON that is no cursor
+        for payload in ([None, 1, 0], ['2024-01-01T00:00:00', None, 0], {'a': 1}, 7, []):
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            response = self.client.get(reverse('project-list'), {'cursor': cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, payload)
+
+    def test_other_lists(self):
+        """Test cursor mode of experience, certifications and the inbox"""
+        seed_portfolio(projects=0, skills=0, experience=25, certifications=25, contacts=25)
+        for route, model, ordering in (
+            ('experience-list', Experience, ('-start_date', '-id')),
+            ('certification-list', Certification, ('-date_issued', '-id')),
+            ('contact-list', Contact, ('-created_at', '-id')),
+        ):
+            with self.subTest(route=route):
+                ids = sum(self.walk(reverse(route) + '?cursor=', 'next'), [])
+                self.assertEqual(ids, list(model.objects.order_by(*ordering).values_list('id', flat=True)))
+
+    def test_inbox_is_paged_from_the_database(self):
+        """Test that the contact list is one keyset query after every submission"""
+        seed_portfolio(projects=0, skills=0, contacts=25)
+        url = reverse('contact-list')
+        for i in range(2):
+            self.client.post(url, {'name': 'New', 'email': f'new{i}@example.com', 'subject': 'Hi',
+                                   'message': f'Inbox message {i}'}, format='json')
+            with CaptureQueriesContext(connection) as queries:
+                page = self.client.get(url).json()
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('COUNT', queries[0]['sql'].upper())
+            self.assertEqual(page['results'][0]['email'], f'new{i}@example.com')
+            self.assertEqual(len(page['results']), 20)
+            self.assertIn('cursor=', page['next'])
+        self.assertNotIn('contacts', SECTIONS)
+
+
+@override_settings(API_METRICS_TOKEN='plans', API_EXPORT_TOKEN='plans')
+class QueryPlanTestCase(PlanCheckMixin, APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_portfolio(
+            projects=5000, skills=2000, experience=1000, certifications=1000,
+            education=500, contacts=5000
+        )
+        # Inactive rows, so single-row tables are large too
+        seed_models({'personal_info': 2000, 'about': 2000, 'social_links': 2000})
+        # Planner statistics, as a production database would have
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer plans')
+
+    def deep_cursor(self, ordering, queryset):
+        rows = queryset.order_by(*ordering).values_list(*[name.lstrip('-') for name in ordering])
+        key = rows[rows.count() // 2]
+        return KeysetPagination(ordering).encode_cursor(key, False)
+
+    def test_routes_use_indexes(self):
+        """Test that no query of any route scans a large table"""
+        for route, method in QUERY_BUDGETS:
+            with self.subTest(route=route, method=method):
+                self.assertIndexedPlans(method, *self.route_request(route, method))
+
+    def test_list_variants_use_indexes(self):
+        """Test the featured filter and deep keyset pages"""
+        projects = reverse('project-list')
+        urls = [f'{projects}?featured=true', f'{projects}?cursor=', f'{projects}?featured=true&cursor=']
+        for route, model, ordering in (
+            ('project-list', Project, ('-created_at', '-id')),
+            ('experience-list', Experience, ('-start_date', '-id')),
+            ('certification-list', Certification, ('-date_issued', '-id')),
+            ('contact-list', Contact, ('-created_at', '-id')),
+        ):
+            cursor = self.deep_cursor(ordering, model.objects.all())
+            urls.append(f'{reverse(route)}?cursor={cursor}')
+        featured = self.deep_cursor(('-created_at', '-id'), Project.objects.filter(is_featured=True))
+        urls.append(f'{projects}?featured=true&cursor={featured}')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertIndexedPlans('GET', url)
+
+    def test_full_scan_is_reported(self):
+        """Test that the harness catches an unindexed filter"""
+        sql, params = Project.objects.filter(title='x').order_by().query.sql_with_params()
+        self.assertIn('full table scan of api_project', plan_problems(sql, explain(sql, params)))
+        # Also inside a subquery of an unfiltered statement
+        sql = f'SELECT COUNT(*) FROM ({sql}) AS inner_rows'
+        self.assertIn('full table scan of api_project', plan_problems(sql, explain(sql, params)))
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1', EMAIL_USE_TLS=False,
+)
+class OutboxTestCase(APITestCase):
+    contact = {'name': 'Outbox', 'email': 'outbox@example.com', 'subject': 'Hi', 'message': 'Hello'}
+
+    def test_post_queues_without_smtp(self):
+        """Test that a submission queues its email instead of sending it"""
+        with mock.patch('django.core.mail.backends.smtp.EmailBackend.open', side_effect=AssertionError):
+            response = self.client.post(reverse('contact-list'), self.contact, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.subject, 'New Contact Form Submission: Hi')
+        self.assertIn('outbox@example.com', email.body)
+        self.assertIsNone(email.sent_at)
+
+    def test_invalid_post_queues_nothing(self):
+        """Test that no email is queued for a rejected submission"""
+        self.client.post(reverse('contact-list'), {'name': 'x'}, format='json')
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_batch_uses_one_connection(self):
+        """Test that run_outbox drains the queue over one SMTP connection"""
+        for i in range(5):
+            self.client.post(reverse('contact-list'), {**self.contact, 'subject': f'Hi {i}'}, format='json')
+        with SMTPStandIn() as smtp, override_settings(EMAIL_PORT=smtp.port):
+            call_command('run_outbox', '--once', stdout=io.StringIO())
+        self.assertEqual(smtp.connections, 1)
+        self.assertEqual(len(smtp.messages), 5)
+        self.assertIn('Subject: New Contact Form Submission: Hi 0', smtp.messages[0]['data'])
+        self.assertFalse(OutboxEmail.objects.filter(sent_at__isnull=True).exists())
+
+    @override_settings(API_OUTBOX_IN_PROCESS=True)
+    def test_commit_wakes_drainer(self):
+        """Test that queueing email schedules the in-process drainer on commit"""
+        with mock.patch.object(outbox.drainer, 'schedule') as schedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('contact-list'), self.contact, format='json')
+            schedule.assert_called_once_with(0)
+
+    def test_drainer_delivers_and_waits_for_retry(self):
+        """Test that a drain sends what is due and sleeps until the next retry"""
+        outbox.enqueue('Now', 'Body', 'from@example.com', ['to@example.com'])
+        later = outbox.enqueue('Later', 'Body', 'from@example.com', ['to@example.com'])
+        OutboxEmail.objects.filter(pk=later.pk).update(next_attempt_at=timezone.now() + timedelta(minutes=5))
+        drainer = outbox.Drainer()
+        with SMTPStandIn() as smtp, override_settings(EMAIL_PORT=smtp.port), \
+                mock.patch.object(drainer, 'schedule') as schedule, \
+                mock.patch('api.outbox.connections.close_all'):
+            drainer.drain()
+        self.assertEqual(len(smtp.messages), 1)
+        self.assertIn('Subject: Now', smtp.messages[0]['data'])
+        (delay,), _ = schedule.call_args
+        self.assertAlmostEqual(delay, 300, delta=5)
+
+    def test_failures_back_off(self):
+        """Test that a rejected message is retried later and others still go out"""
+        for i in range(3):
+            outbox.enqueue(f'Message {i}', 'Body', 'from@example.com', ['to@example.com'])
+        with SMTPStandIn() as smtp, override_settings(EMAIL_PORT=smtp.port):
+            smtp.fail_next = 1
+            with self.assertLogs('api.outbox', 'WARNING'):
+                self.assertEqual(outbox.deliver_batch(), (2, 1))
+            failed = OutboxEmail.objects.get(sent_at__isnull=True)
+            self.assertEqual(failed.subject, 'Message 0')
+            self.assertEqual(failed.attempts, 1)
+            self.assertIn('451', failed.last_error)
+            self.assertGreater(failed.next_attempt_at, timezone.now())
+            # Not due yet
+            self.assertEqual(outbox.deliver_batch(), (0, 0))
+
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            self.assertEqual(outbox.deliver_batch(), (1, 0))
+        self.assertEqual(len(smtp.messages), 3)
+
+    def test_gives_up_after_max_attempts(self):
+        """Test that a message is dead-lettered after the last attempt"""
+        email = outbox.enqueue('Doomed', 'Body', 'from@example.com', ['to@example.com'])
+        OutboxEmail.objects.filter(pk=email.pk).update(attempts=outbox.MAX_ATTEMPTS - 1)
+        with SMTPStandIn() as smtp, override_settings(EMAIL_PORT=smtp.port):
+            smtp.fail_next = 1
+            with self.assertLogs('api.outbox', 'ERROR'):
+                outbox.deliver_batch()
+        email.refresh_from_db()
+        self.assertIsNotNone(email.failed_at)
+
+    def test_unreachable_server_backs_off(self):
+        """Test that messages survive an SMTP outage and back off through it"""
+        outbox.enqueue('Later', 'Body', 'from@example.com', ['to@example.com'])
+        with SMTPStandIn() as smtp:
+            port = smtp.port
+        with override_settings(EMAIL_PORT=port), self.assertLogs('api.outbox', 'WARNING'):
+            self.assertEqual(outbox.deliver_batch(), (0, 1))
+        email = OutboxEmail.objects.get()
+        self.assertIsNone(email.sent_at)
+        self.assertIsNone(email.claim)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('Connection refused', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        OutboxEmail.objects.update(attempts=outbox.MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+        with override_settings(EMAIL_PORT=port), self.assertLogs('api.outbox', 'ERROR'):
+            outbox.deliver_batch()
+        email.refresh_from_db()
+        self.assertIsNotNone(email.failed_at)
+
+
+class WriteBehindTestCase(APITestCase):
+    contact = {'name': 'Burst', 'email': 'burst@example.com', 'subject': 'Hi', 'message': 'Hello'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        settings = override_settings(
+            API_CONTACT_WRITE_BEHIND=True, API_CONTACT_BUFFER_DIR=directory.name,
+            API_CONTACT_FLUSH_SIZE=3,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Flushes run synchronously in the test instead of on a timer thread
+        patcher = mock.patch.object(ingest.buffer, 'schedule_flush')
+        self.schedule_flush = patcher.start()
+        self.addCleanup(patcher.stop)
+        ingest.buffer.reset()
+        self.addCleanup(ingest.buffer.reset)
+        self.addCleanup(lambda: ingest.buffer.file and ingest.buffer.file.close())
+
+    def buffered(self):
+        return Contact.objects.filter(submission_id__isnull=False)
+
+    def submit(self, **fields):
+        return self.client.post(reverse('contact-list'), {**self.contact, **fields}, format='json')
+
+    def test_post_is_buffered(self):
+        """Test that a submission is acknowledged before it reaches the database"""
+        response = self.submit()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['email'], 'burst@example.com')
+        self.assertIsNone(response.data['id'])
+        self.assertFalse(self.buffered().exists())
+        self.schedule_flush.assert_called_once_with(ingest.settings.API_CONTACT_FLUSH_INTERVAL)
+
+        ingest.buffer.flush()
+        contact = self.buffered().get()
+        self.assertEqual(str(contact.submission_id), response.data['submission_id'])
+        self.assertEqual(contact.created_at.isoformat(), response.data['created_at'].replace('Z', '+00:00'))
+        self.assertEqual(OutboxEmail.objects.get().subject, 'New Contact Form Submission: Hi')
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_invalid_post_is_rejected(self):
+        """Test that validation still happens in the request"""
+        response = self.submit(email='not-an-email')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.directory.exists() and any(self.directory.iterdir()))
+
+    def test_full_segment_flushes_at_once(self):
+        """Test that the size bound seals the segment and flushes without waiting"""
+        for i in range(3):
+            self.submit(subject=f'Hi {i}')
+        self.schedule_flush.assert_called_with(0)
+        self.assertEqual(len(list(self.directory.glob('sealed-*.jsonl'))), 1)
+        with self.assertNumQueries(6):
+            # Id lookup, savepoint, contacts, search index, emails, release
+            self.assertEqual(ingest.flush_pending(), 3)
+        self.assertEqual(
+            list(self.buffered().order_by('created_at').values_list('subject', flat=True)),
+            ['Hi 0', 'Hi 1', 'Hi 2'],
+        )
+
+    def test_replay_inserts_nothing_twice(self):
+        """Test that a segment replayed after a partial flush is idempotent"""
+        self.submit()
+        self.submit(subject='Second')
+        ingest.buffer.seal()
+        segment = next(self.directory.glob('sealed-*.jsonl'))
+        copy = segment.read_bytes()
+        self.assertEqual(ingest.flush_pending(), 2)
+
+        segment.write_bytes(copy)
+        self.assertEqual(ingest.flush_pending(), 0)
+        self.assertEqual(self.buffered().count(), 2)
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+    def test_crash_recovery(self):
+        """Test that flush_contacts replays segments of dead processes"""
+        self.submit()
+        ingest.buffer.file.close()
+        # A process that died mid-append, and one that died mid-flush
+        dead = 2 ** 22 + 1
+        active = self.directory / f'active-{os.getpid()}.jsonl'
+        torn = active.read_bytes() + b'{"name": "Tor'
+        active.rename(self.directory / f'active-{dead}.jsonl')
+        (self.directory / f'active-{dead}.jsonl').write_bytes(torn)
+        ingest.buffer.reset()
+        self.submit(subject='Flushing')
+        ingest.buffer.seal()
+        sealed = next(self.directory.glob('sealed-*.jsonl'))
+        sealed.rename(self.directory / f'flushing-{dead}-{sealed.name}')
+
+        with mock.patch.object(ingest, 'is_alive', return_value=False), \
+                self.assertLogs('api.ingest', 'WARNING') as logs:
+            call_command('flush_contacts', stdout=io.StringIO())
+        self.assertEqual(sorted(self.buffered().values_list('subject', flat=True)), ['Flushing', 'Hi'])
+        self.assertTrue(any('torn line' in line for line in logs.output))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_failed_flush_keeps_segment(self):
+        """Test that a segment survives a database error and is retried"""
+        self.submit()
+        ingest.buffer.seal()
+        with mock.patch.object(ingest, 'insert', side_effect=RuntimeError), \
+                self.assertRaises(RuntimeError), self.assertLogs('api.ingest', 'ERROR'):
+            ingest.flush_pending()
+        self.assertEqual(len(list(self.directory.glob('sealed-*.jsonl'))), 1)
+        self.assertEqual(ingest.flush_pending(), 1)
+
+    def test_bad_segment_is_quarantined(self):
+        """Test that a failing segment is retried, then set aside, without blocking later ones"""
+        self.submit(subject='Bad')
+        ingest.buffer.seal()
+        self.submit(subject='Good')
+        ingest.buffer.seal()
+        real_insert = ingest.insert
+
+        def insert(records):
+            if records[0]['subject'] == 'Bad':
+                raise ValueError('bad record')
+            return real_insert(records)
+
+        with mock.patch.object(ingest, 'insert', side_effect=insert), self.assertLogs('api.ingest', 'ERROR'):
+            for attempt in range(1, ingest.MAX_ATTEMPTS + 1):
+                with self.assertRaises(ValueError):
+                    ingest.flush_pending()
+                self.assertEqual(list(self.buffered().values_list('subject', flat=True)), ['Good'])
+                if attempt < ingest.MAX_ATTEMPTS:
+                    self.assertTrue(next(self.directory.glob('sealed-*.jsonl')).stem.endswith(f'-{attempt}'))
+        self.assertEqual([path.name.split('-')[0] for path in self.directory.iterdir()], ['quarantined'])
+        self.assertEqual(ingest.flush_pending(), 0)
+
+    def test_database_error_is_not_counted(self):
+        """Test that a connection error ends the flush without counting against the segment"""
+        self.submit()
+        ingest.buffer.seal()
+        name = next(self.directory.glob('sealed-*.jsonl')).name
+        for _ in range(ingest.MAX_ATTEMPTS):
+            with mock.patch.object(ingest, 'insert', side_effect=OperationalError('database is locked')), \
+                    self.assertRaises(OperationalError):
+                ingest.flush_pending()
+        self.assertEqual([path.name for path in self.directory.iterdir()], [name])
+
+    def test_flush_at_worker_start(self):
+        """Test that a starting worker schedules a flush of what is left"""
+        ingest.flush_at_start()
+        self.schedule_flush.assert_called_once_with(0)
+
+    def test_failed_background_flush_is_retried(self):
+        """Test that a failed timer flush schedules another one"""
+        self.submit()
+        self.schedule_flush.reset_mock()
+        with mock.patch.object(ingest, 'insert', side_effect=RuntimeError), \
+                self.assertLogs('api.ingest', 'ERROR'):
+            ingest.buffer.background_flush()
+        self.schedule_flush.assert_called_once_with(ingest.settings.API_CONTACT_FLUSH_INTERVAL)
+        self.assertEqual(ingest.flush_pending(), 1)
+
+
+def take_in_child(key, queue):
+    queue.put(throttling.store.take(key, 2, 60))
+
+
+class ThrottleTestCase(APITestCase):
+    contact = {'name': 'Flood', 'email': 'flood@example.com', 'subject': 'Hi', 'message': 'Hello'}
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(
+            API_THROTTLE_DB=str(Path(directory.name) / 'buckets.sqlite3'),
+            REST_FRAMEWORK={**django_settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {
+                'contact-ip': '3/minute', 'contact-email': '2/hour',
+            }},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def submit(self, address='10.0.0.1', **fields):
+        return self.client.post(
+            reverse('contact-list'), {**self.contact, **fields}, format='json', REMOTE_ADDR=address
+        )
+
+    def test_ip_bucket(self):
+        """Test that one address gets a burst of its rate, then 429 with Retry-After"""
+        for i in range(3):
+            self.assertEqual(self.submit(email=f'user{i}@example.com').status_code, status.HTTP_201_CREATED)
+        with mock.patch.object(metrics, 'record_throttle') as record:
+            response = self.submit(email='user9@example.com')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn(int(response.headers['Retry-After']), (19, 20))
+        record.assert_called_once_with('contact', 'ip')
+        # Other clients are unaffected
+        self.assertEqual(self.submit('10.0.0.2', email='other@example.com').status_code, status.HTTP_201_CREATED)
+
+    def test_email_bucket(self):
+        """Test that one address is limited whichever client submits it"""
+        self.assertEqual(self.submit('10.0.0.1').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.submit('10.0.0.2', email='Flood@Example.com ').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.submit('10.0.0.3').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_forwarded_for(self):
+        """Test that X-Forwarded-For is only trusted behind a configured proxy"""
+        def submit(i):
+            return self.client.post(
+                reverse('contact-list'), {**self.contact, 'email': f'user{i}@example.com'}, format='json',
+                REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+            )
+
+        for i in range(3):
+            self.assertEqual(submit(i).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(submit(3).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        with override_settings(REST_FRAMEWORK={**django_settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}):
+            # The client address the proxy recorded, not the proxy's own
+            self.assertEqual(submit(4).status_code, status.HTTP_201_CREATED)
+
+    def test_rejected_before_validation(self):
+        """Test that a throttled request never reaches the serializer"""
+        for i in range(3):
+            self.submit(email=f'user{i}@example.com')
+        with mock.patch.object(ContactSerializer, 'is_valid') as is_valid:
+            response = self.submit(email='not-an-email')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        is_valid.assert_not_called()
+
+    def test_refill(self):
+        """Test that tokens come back at the configured rate"""
+        now = 1_000_000.0
+        with mock.patch('api.throttling.time.time', side_effect=lambda: now):
+            for i in range(3):
+                self.submit(email=f'user{i}@example.com')
+            self.assertEqual(self.submit(email='user3@example.com').status_code, 429)
+            now += 20
+            self.assertEqual(self.submit(email='user4@example.com').status_code, 201)
+            self.assertEqual(self.submit(email='user5@example.com').status_code, 429)
+
+    def test_reads_not_throttled(self):
+        """Test that only submissions spend tokens"""
+        for i in range(5):
+            self.assertEqual(self.client.get(reverse('contact-list'), REMOTE_ADDR='10.0.0.1').status_code, 200)
+        self.assertEqual(self.submit().status_code, status.HTTP_201_CREATED)
+
+    def test_shared_across_processes(self):
+        """Test that a forked worker spends from the same buckets"""
+        self.assertEqual(throttling.store.take('shared', 2, 60), 0)
+        queue = multiprocessing.get_context('fork').Queue()
+        child = multiprocessing.get_context('fork').Process(target=take_in_child, args=('shared', queue))
+        child.start()
+        child.join()
+        self.assertEqual(queue.get(timeout=5), 0)
+        self.assertAlmostEqual(throttling.store.take('shared', 2, 60), 30, delta=1)
+
+
+class SpamScreeningTestCase(APITestCase):
+    spam = (
+        'Buy cheap followers now and grow your instagram account fast with our '
+        'premium marketing service, limited offer for portfolio owners today'
+    )
+    variant = (
+        'Buy cheap followers now and grow your tiktok account fast with our '
+        'premium marketing service, limited offer for portfolio owners today!'
+    )
+    other = (
+        'I enjoyed your computer vision project and would like to discuss a '
+        'machine learning internship at our company next summer'
+    )
+
+    def setUp(self):
+        cache.clear()
+
+    def submit(self, message, email='sender@example.com', subject='Offer'):
+        response = self.client.post(reverse('contact-list'), {
+            'name': 'Sender', 'email': email, 'subject': subject, 'message': message,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return Contact.objects.get(pk=response.data['id'])
+
+    def test_band_keys(self):
+        """Test that near duplicates share a band and unrelated messages do not"""
+        spam_set, variant_set = spam.shingles(self.spam), spam.shingles(self.variant)
+        self.assertGreaterEqual(spam.jaccard(spam_set, variant_set), spam.SIMILARITY)
+        keys = spam.band_keys(spam_set)
+        self.assertEqual(len(keys), spam.BANDS)
+        self.assertTrue(set(keys) & set(spam.band_keys(variant_set)))
+        self.assertFalse(set(keys) & set(spam.band_keys(spam.shingles(self.other))))
+        self.assertIsNone(spam.band_keys(spam.shingles('Hello there, how are you')))
+
+    def test_near_duplicate_is_flagged(self):
+        """Test that a varied copy of a recent message is stored as spam, unsent"""
+        first = self.submit(self.spam)
+        copy = self.submit(self.variant, email='another@example.com')
+        unrelated = self.submit(self.other)
+        self.assertEqual([first.is_spam, copy.is_spam, unrelated.is_spam], [False, True, False])
+        self.assertEqual(first.fingerprints.count(), spam.BANDS)
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+        self.assertNotIn('tiktok', ' '.join(OutboxEmail.objects.values_list('body', flat=True)))
+
+    def test_window(self):
+        """Test that only recent messages are compared"""
+        first = self.submit(self.spam)
+        first.fingerprints.update(created_at=timezone.now() - spam.WINDOW - timedelta(minutes=1))
+        self.assertFalse(self.submit(self.variant).is_spam)
+
+    def test_short_messages_are_not_compared(self):
+        """Test that short, common messages are never duplicates"""
+        self.assertFalse(self.submit('Hi, can we talk?').is_spam)
+        self.assertFalse(self.submit('Hi, can we talk?').is_spam)
+        self.assertFalse(ContactFingerprint.objects.exists())
+
+    def test_candidates_are_capped(self):
+        """Test that a flood of copies is read only up to the cap, until a match"""
+        for i in range(4):
+            self.submit(self.spam, email=f'flood{i}@example.com')
+        contact = Contact(name='Sender', email='last@example.com', subject='Offer', message=self.variant)
+        with mock.patch.object(spam, 'MAX_CANDIDATES', 2), CaptureQueriesContext(connection) as queries, \
+                mock.patch.object(spam, 'shingles', wraps=spam.shingles) as shingles:
+            spam.screen([contact])
+        self.assertTrue(contact.is_spam)
+        [texts] = [query['sql'] for query in queries if '"api_contact"."message"' in query['sql']]
+        self.assertEqual(texts.split(' IN (')[1].split(')')[0].count(',') + 1, 2)
+        # Its own message, then the first candidate already matches
+        self.assertEqual(shingles.call_count, 2)
+
+    def test_batch_seeks_and_blocklist(self):
+        """Test that a batch seeks each band with a LIMIT and reads the blocklist once"""
+        BlockedSender.objects.create(value='@junk.test')
+        self.submit(self.spam, email='first@example.com')
+        contacts = [
+            Contact(name='Sender', email=email, subject='Offer', message=message)
+            for email, message in (('a@example.com', self.variant), ('b@junk.test', self.other))
+        ]
+        with mock.patch.object(spam, 'get_version', wraps=spam.get_version) as get_version, \
+                CaptureQueriesContext(connection) as queries:
+            keys = spam.screen(contacts)
+        self.assertEqual(get_version.call_count, 1)
+        self.assertEqual([contact.is_spam for contact in contacts], [True, True])
+        [seeks] = [query['sql'] for query in queries if 'api_contactfingerprint' in query['sql']]
+        self.assertEqual(seeks.count('LIMIT'), len({key for own in keys for key in own}))
+        self.assertEqual(len([query for query in queries if 'api_blockedsender' in query['sql']]), 1)
+
+    def test_blocked_senders(self):
+        """Test that blocked addresses and domains are screened"""
+        BlockedSender.objects.create(value=' Spammer@Example.com ')
+        BlockedSender.objects.create(value='@junk.test')
+        self.assertTrue(self.submit(self.other, email='spammer@example.com').is_spam)
+        self.assertTrue(self.submit(self.other, email='anyone@JUNK.test', subject='Other').is_spam)
+        self.assertFalse(self.submit(self.spam, email='friend@example.com').is_spam)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_blocklist_miss_needs_no_query(self):
+        """Test that the Bloom filter answers unblocked senders from memory"""
+        BlockedSender.objects.create(value='spammer@example.com')
+        self.assertTrue(spam.blocklist.is_blocked('spammer@example.com'))
+        with self.assertNumQueries(0):
+            self.assertFalse(spam.blocklist.is_blocked('friend@example.com'))
+        # A new entry changes the blocklist version
+        BlockedSender.objects.create(value='friend@example.com')
+        self.assertTrue(spam.blocklist.is_blocked('friend@example.com'))
+
+    def test_bloom_filter(self):
+        """Test no false negatives and about the configured false positive rate"""
+        bloom = spam.BloomFilter(10000)
+        for i in range(10000):
+            bloom.add(f'user{i}@example.com')
+        self.assertTrue(all(f'user{i}@example.com' in bloom for i in range(10000)))
+        false_positives = sum(f'other{i}@example.com' in bloom for i in range(10000))
+        self.assertLess(false_positives, 10000 * spam.BLOOM_ERROR_RATE * 3)
+
+    def test_batch_screens_its_own_duplicates(self):
+        """Test that a write-behind batch catches copies within itself"""
+        records = [
+            {'submission_id': str(uuid.uuid4()), 'name': 'Sender', 'email': f'wave{i}@example.com',
+             'subject': 'Offer', 'message': message, 'created_at': timezone.now().isoformat()}
+            for i, message in enumerate((self.spam, self.variant, self.other))
+        ]
+        self.assertEqual(ingest.insert(records), 3)
+        flags = Contact.objects.filter(email__startswith='wave').order_by('email').values_list('is_spam', flat=True)
+        self.assertEqual(list(flags), [False, True, False])
+        self.assertEqual(OutboxEmail.objects.count(), 2)
+
+
+@unittest.skipIf(search.backend() is None, 'no full-text search on this database')
+class SearchTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.project = Project.objects.create(
+            title='Zephyrgrid telemetry dashboard',
+            description='Streams sensor readings into charts',
+            technologies=['Quasarflow', 'React'],
+        )
+        self.mention = Project.objects.create(
+            title='Weather station',
+            description='Feeds a zephyrgrid dashboard with readings',
+            technologies=['Python'],
+        )
+
+    def ids(self, query, kinds=search.PUBLIC_KINDS):
+        return [(kind, pk) for kind, pk, score in search.search(query, kinds)]
+
+    def test_index_follows_writes(self):
+        """Test that saves, bulk writes and deletes keep the index in sync"""
+        self.assertIn(('project', self.project.pk), self.ids('quasarflow'))
+        self.project.title = 'Nebulatrack dashboard'
+        self.project.save()
+        self.assertIn(('project', self.project.pk), self.ids('nebulatrack'))
+        self.assertNotIn(('project', self.project.pk), self.ids('zephyrgrid'))
+
+        Project.objects.filter(pk=self.project.pk).update(description='Now about Orbitalmesh')
+        self.assertEqual(self.ids('orbitalmesh'), [('project', self.project.pk)])
+        Project.objects.bulk_update([self.project], ['is_featured'])
+        self.assertEqual(self.ids('orbitalmesh'), [('project', self.project.pk)])
+
+        contacts = Contact.objects.bulk_create([
+            Contact(name='Ada', email='ada@example.com', subject='Hello', message='About Kryptonvale'),
+        ])
+        self.assertEqual(self.ids('kryptonvale', ['contact']), [('contact', contacts[0].pk)])
+        self.assertEqual(self.ids('kryptonvale'), [])
+
+        self.project.delete()
+        self.assertEqual(self.ids('nebulatrack'), [])
+
+    def test_ranking_and_prefixes(self):
+        """Test that every word is matched as a prefix and titles rank first"""
+        self.assertEqual(self.ids('zephyr'), [('project', self.project.pk), ('project', self.mention.pk)])
+        self.assertEqual(self.ids('zephyrgrid weather'), [('project', self.mention.pk)])
+        self.assertEqual(self.ids('"zephyrgrid*'), self.ids('zephyrgrid'))
+        self.assertEqual(self.ids('  '), [])
+
+    def test_search_endpoint(self):
+        """Test ranked results with serialized rows, and parameter validation"""
+        url = reverse('search')
+        response = self.client.get(url, {'q': 'zephyrgrid', 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['query'], 'zephyrgrid')
+        [result] = response.json()['results']
+        self.assertEqual((result['type'], result['id']), ('project', self.project.pk))
+        self.assertEqual(result['data'], json.loads(JSONRenderer().render(
+            ProjectSerializer(self.project, context={'request': response.wsgi_request}).data
+        )))
+
+        response = self.client.get(url, {'q': 'zephyrgrid', 'type': 'skill,experience'})
+        self.assertEqual(response.json()['results'], [])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'q': 'x', 'type': 'contact'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'q': 'x', 'limit': 'all'}).status_code, status.HTTP_400_BAD_REQUEST)
+        # Searches are not materialized into the shared response store
+        self.assertEqual(get_snapshot('content')['responses'], {})
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_admin_search_uses_index(self):
+        """Test that admin changelist search matches message bodies through the index"""
+        contact = Contact.objects.create(
+            name='Grace', email='grace@example.com', subject='Question', message='Is Vortexmill open source?'
+        )
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:api_contact_changelist'), {'q': 'vortexmill'})
+        self.assertEqual(list(response.context['cl'].result_list), [contact])
+        self.assertTrue(any(search.table('contact') in query['sql'] for query in queries))
+        self.assertFalse(any('LIKE' in query['sql'] for query in queries))
+
+    def test_rebuild_command(self):
+        """Test that rebuild_search_index repopulates the index after raw writes"""
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {search.table('project')}")
+        self.assertEqual(self.ids('zephyrgrid'), [])
+        call_command('rebuild_search_index', 'project', stdout=io.StringIO())
+        self.assertEqual(len(self.ids('zephyrgrid')), 2)
+
+
+class TechnologyTestCase(APITestCase):
+    def setUp(self):
+        clear_snapshots()
+        cache.clear()
+        self.vision = Project.objects.create(
+            title='Vision', description='Detector', technologies=['Python', 'OpenCV', 'PyTorch'],
+        )
+        self.web = Project.objects.create(
+            title='Web', description='Portal', technologies=['python ', 'Django', 'React'],
+        )
+        self.game = Project.objects.create(title='Game', description='Engine', technologies=['C++'])
+
+    def counts(self, names):
+        rows = Technology.objects.filter(key__in=[name.lower() for name in names])
+        return dict(rows.values_list('name', 'project_count'))
+
+    def filtered(self, query):
+        response = self.client.get(reverse('project-list') + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {project['title'] for project in response.json()['results']}
+
+    def test_links_follow_json(self):
+        """Test that saves, bulk writes and deletes keep links and counts in sync"""
+        baseline = Technology.objects.get(key='python').project_count
+        self.assertEqual(self.counts(['OpenCV', 'Django', 'C++']), {'OpenCV': 1, 'Django': 1, 'C++': 1})
+        self.assertEqual(self.vision.technology_links.count(), 3)
+
+        self.vision.technologies = ['PyTorch', 'Rust', {'not': 'a name'}]
+        self.vision.save()
+        self.assertEqual(self.counts(['OpenCV', 'Rust', 'PyTorch']), {'OpenCV': 0, 'Rust': 1, 'PyTorch': 1})
+        self.assertEqual(Technology.objects.get(key='python').project_count, baseline - 1)
+
+        Project.objects.filter(pk=self.web.pk).update(technologies=['Django'])
+        Project.objects.bulk_update([self.game], ['title'])
+        Project.objects.bulk_create([Project(title='New', description='', technologies=['Django', 'Go'])])
+        self.assertEqual(self.counts(['Django', 'React', 'Go', 'C++']), {'Django': 2, 'React': 0, 'Go': 1, 'C++': 1})
+
+        Project.objects.filter(title__in=['Web', 'New']).delete()
+        self.assertEqual(self.counts(['Django', 'Go']), {'Django': 0, 'Go': 0})
+        self.assertFalse(ProjectTechnology.objects.filter(project__title='Web').exists())
+
+        Experience.objects.create(
+            title='Intern', company='Lab', location='Remote', start_date=date(2024, 1, 1), technologies=['Go'],
+        )
+        self.assertEqual(Technology.objects.get(key='go').experience_count, 1)
+
+    def test_rebuild(self):
+        """Test that rebuild_technologies recomputes links and counts from the lists"""
+        expected = dict(Technology.objects.values_list('key', 'project_count'))
+        ProjectTechnology.objects.all().delete()
+        Technology.objects.update(project_count=0)
+        call_command('rebuild_technologies', stdout=io.StringIO())
+        rebuilt = dict(Technology.objects.values_list('key', 'project_count'))
+        self.assertEqual(rebuilt, {key: count for key, count in expected.items() if key in rebuilt})
+        self.assertEqual(ExperienceTechnology.objects.count(), sum(
+            len(technologies.normalize(names)) for names in Experience.objects.values_list('technologies', flat=True)
+        ))
+
+    def test_migration_backfill(self):
+        """Test that migration 0023's frozen backfill links what rebuild_technologies does"""
+        Experience.objects.create(
+            title='Engineer', company='Acme', location='Remote', start_date=date(2020, 1, 1),
+            description=['Work'], technologies=['Python', 'Go'],
+        )
+
+        def state():
+            return (
+                set(Technology.objects.values_list('key', 'name', 'project_count', 'experience_count')),
+                set(ProjectTechnology.objects.values_list('project_id', 'technology__key')),
+                set(ExperienceTechnology.objects.values_list('experience_id', 'technology__key')),
+            )
+
+        expected = state()
+        Technology.objects.all().delete()
+        migration = importlib.import_module('api.migrations.0023_technologies')
+        migration.link_technologies(apps, None)
+        self.assertEqual(state(), expected)
+
+    def test_filter(self):
+        """Test that ?tech= matches all names by default, or any with match=any"""
+        self.assertEqual(self.filtered('?tech=Python&tech=pytorch'), {'Vision'})
+        self.assertEqual(self.filtered('?tech=Python,Django'), {'Web'})
+        self.assertEqual(self.filtered('?tech=Python&tech=Unknown'), set())
+        self.assertEqual(self.filtered('?tech=C%2B%2B&tech=Django&match=any'), {'Web', 'Game'})
+        self.assertEqual(
+            self.client.get(reverse('project-list'), {'tech': 'Python', 'match': 'some'}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+    def test_filtered_envelope(self):
+        """Test that ?tech= pages like the unfiltered list, and ?cursor= still switches to keyset"""
+        unfiltered = self.client.get(reverse('project-list')).json()
+        filtered = self.client.get(reverse('project-list'), {'tech': 'Python'}).json()
+        self.assertEqual(filtered.keys(), unfiltered.keys())
+        self.assertEqual(filtered['count'], technologies.filter_owners(Project.objects.all(), ['Python']).count())
+        expected = [
+            project for project in unfiltered['results']
+            if 'python' in (name.strip().lower() for name in project['technologies'])
+        ]
+        self.assertEqual(filtered['results'][:len(expected)], expected)
+        self.assertIn(self.web.pk, [project['id'] for project in filtered['results']])
+        keyset = self.client.get(reverse('project-list'), {'tech': 'Python', 'cursor': ''}).json()
+        self.assertEqual(set(keyset), {'next', 'previous', 'results'})
+
+    def test_filter_never_reads_json(self):
+        """Test that the filter resolves through the link table's index"""
+        queryset = technologies.filter_owners(Project.objects.all(), ['Python', 'React'])
+        sql, params = queryset.query.sql_with_params()
+        self.assertNotIn('technologies', sql.split('FROM')[1])
+        plan = explain(sql, params)
+        self.assertTrue(any('technology_project_idx' in line for line in plan), plan)
+
+    def test_facets(self):
+        """Test that /api/technologies/ lists used technologies, most used first"""
+        response = self.client.get(reverse('technologies'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        facets = response.json()
+        self.assertEqual(facets, sorted(facets, key=lambda row: (-row['project_count'], -row['experience_count'], row['name'])))
+        by_name = {row['name']: row for row in facets}
+        self.assertEqual(by_name['OpenCV']['project_count'], 1)
+        self.assertNotIn('python ', by_name)
+
+        self.game.delete()
+        self.assertNotIn('C++', [row['name'] for row in self.client.get(reverse('technologies')).json()])
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class HighVolumeAdminTestCase(TestCase):
+    def setUp(self):
+        seed_models({'contacts': 250})
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.url = reverse('admin:api_contact_changelist')
+
+    def changelist(self, url=None, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url or self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['cl'], queries
+
+    def test_keyset_pages(self):
+        """Test that next and previous links walk every contact once, newest first"""
+        expected = list(Contact.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+        seen, pages = [], []
+        cl, _ = self.changelist()
+        self.assertIsNone(cl.previous_url)
+        while True:
+            seen += [contact.pk for contact in cl.result_list]
+            pages.append(cl)
+            if cl.next_url is None:
+                break
+            cl, _ = self.changelist(self.url + cl.next_url)
+        self.assertEqual(seen, expected)
+        back, _ = self.changelist(self.url + pages[-1].previous_url)
+        self.assertEqual(list(back.result_list), list(pages[-2].result_list))
+
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_queries_are_bounded(self):
+        """Test that no query counts, offsets or sorts the whole table"""
+        for params in ({}, {'is_read__exact': '0'}, {'is_spam__exact': '1', 'created_at__year': '2024'}):
+            cl, queries = self.changelist(**params)
+            for query in queries:
+                sql = query['sql']
+                if 'api_contact' not in sql or not sql.startswith('SELECT'):
+                    continue
+                self.assertNotIn('OFFSET', sql)
+                if 'COUNT(' in sql:
+                    self.assertIn('LIMIT', sql)
+                # The bounded count scans only its own LIMITed subquery
+                problems = [problem for problem in plan_problems(sql, explain(sql, [])) if 'subquery' not in problem]
+                self.assertEqual(problems, [], sql)
+
+    def test_counts(self):
+        """Test exact counts up to the limit, then estimates"""
+        cl, _ = self.changelist(is_read__exact='0')
+        self.assertEqual(cl.result_count, Contact.objects.filter(is_read=False).count())
+        self.assertEqual(cl.count_display(), str(cl.result_count))
+        with mock.patch.object(changelist, 'COUNT_LIMIT', 10):
+            cl, _ = self.changelist(is_read__exact='0')
+            self.assertEqual(cl.count_display(), 'more than 10')
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            cl, _ = self.changelist()
+            self.assertEqual(cl.count_display(), f'about {Contact.objects.count()}')
+
+    def test_date_hierarchy(self):
+        """Test that the date links match the years, months and days holding contacts"""
+        cl, _ = self.changelist()
+        years = [d.year for d in Contact.objects.dates('created_at', 'year')]
+        self.assertEqual([choice['title'] for choice in cl.date_navigation()['choices']], [str(y) for y in years])
+
+        cl, _ = self.changelist(created_at__year=years[-1])
+        months = list(Contact.objects.filter(created_at__year=years[-1]).dates('created_at', 'month'))
+        self.assertEqual(len(cl.date_navigation()['choices']), len(months))
+
+        cl, _ = self.changelist(created_at__year=years[-1], created_at__month=months[-1].month)
+        days = Contact.objects.filter(created_at__year=years[-1], created_at__month=months[-1].month)
+        choices = cl.date_navigation()['choices']
+        self.assertEqual(len(choices), len(days.dates('created_at', 'day')))
+        self.assertIn(f'created_at__day={days.dates("created_at", "day")[0].day}', choices[0]['link'])
+
+    def test_mark_as_read_in_chunks(self):
+        """Test that mark_as_read over all contacts updates them chunk by chunk"""
+        unread = Contact.objects.filter(is_read=False).count()
+        with mock.patch.object(changelist, 'CHUNK_SIZE', 50), CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {
+                'action': 'mark_as_read', 'select_across': '1', 'index': '0', '_selected_action': ['1'],
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Contact.objects.filter(is_read=False).exists())
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "api_contact"')]
+        self.assertEqual(len(updates), -(-unread // 50))
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ArchiveTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(API_CONTACT_ARCHIVE_DIR=directory.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(archive._indexes.clear)
+        self.directory = Path(directory.name)
+        now = timezone.now()
+        self.old = [
+            Contact.objects.create(
+                name=f'Sender {i}', email=f'Sender{i % 3}@Example.com', subject=f'Old {i}',
+                message='Interested in a machine learning project' if i % 2 else 'Hello there',
+                created_at=now - timedelta(days=400 + i), is_read=True,
+            )
+            for i in range(25)
+        ]
+        self.unread = Contact.objects.create(
+            name='Unread', email='unread@example.com', subject='Old unread', message='Hi',
+            created_at=now - timedelta(days=500),
+        )
+        self.recent = Contact.objects.create(
+            name='Recent', email='recent@example.com', subject='Recent', message='Hi',
+            created_at=now - timedelta(days=10), is_read=True,
+        )
+        self.cutoff = now - timedelta(days=365)
+
+    def test_archive_moves_old_read_messages(self):
+        """Test that old read contacts move to gzip segments and leave no derived rows"""
+        ContactFingerprint.objects.create(contact=self.old[0], band=1)
+        archived, written = archive.archive(self.cutoff, segment_rows=10, block_rows=4)
+        self.assertEqual((archived, written), (25, 3))
+        self.assertFalse(Contact.objects.filter(pk__in=[contact.pk for contact in self.old]).exists())
+        self.assertTrue(Contact.objects.filter(pk__in=[self.unread.pk, self.recent.pk]).count() == 2)
+        self.assertFalse(ContactFingerprint.objects.filter(band=1).exists())
+        if search.backend() is not None:
+            with connection.cursor() as cursor:
+                cursor.execute(*search.matching_ids('contact', 'machine'))
+                self.assertEqual(cursor.fetchall(), [])
+
+        # The segments are plain gzip NDJSON, oldest first
+        segments = archive.segments()
+        self.assertEqual(len(segments), 3)
+        rows = [json.loads(line) for segment in reversed(segments) for line in gzip.open(segment, 'rt')]
+        self.assertEqual(sorted(row['id'] for row in rows), sorted(contact.pk for contact in self.old))
+        self.assertEqual([row['subject'] for row in rows[:2]], ['Old 24', 'Old 23'])
+        self.assertEqual(archive.archive(self.cutoff), (0, 0))
+
+    def test_find_and_get(self):
+        """Test archived lookups by words, email and date, and by id"""
+        archive.archive(self.cutoff, block_rows=4)
+        found = archive.find(query='machine learn')
+        self.assertEqual(len(found), 12)
+        self.assertTrue(all('machine' in row['message'] for row in found))
+        found = archive.find(email='sender1@example.com')
+        self.assertEqual({row['subject'] for row in found}, {f'Old {i}' for i in range(1, 25, 3)})
+        since = timezone.now() - timedelta(days=406)
+        found = archive.find(since=since, until=since + timedelta(days=3))
+        self.assertEqual(sorted(row['subject'] for row in found), ['Old 3', 'Old 4', 'Old 5'])
+        self.assertEqual(len(archive.find(limit=5)), 5)
+
+        message = archive.get(self.old[7].pk)
+        self.assertEqual(message['subject'], 'Old 7')
+        self.assertEqual(message['created_at'], self.old[7].created_at)
+        self.assertIsNone(archive.get(self.recent.pk))
+
+    def test_interrupted_run_is_completed(self):
+        """Test that a crash between writing a segment and deleting its rows archives nothing twice"""
+        with mock.patch.object(archive, 'delete_contacts', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                archive.archive(self.cutoff)
+        self.assertEqual(archive.segments(), [])
+        self.assertEqual(Contact.objects.filter(pk__in=[contact.pk for contact in self.old]).count(), 25)
+
+        self.assertEqual(archive.archive(self.cutoff), (0, 0))
+        self.assertFalse(Contact.objects.filter(pk__in=[contact.pk for contact in self.old]).exists())
+        self.assertEqual(len(archive.segments()), 1)
+        self.assertEqual(len(archive.find()), 25)
+
+    def test_deletes_in_chunks(self):
+        """Test that each chunk of deletes is its own short transaction"""
+        with mock.patch.object(archive, 'CHUNK_SIZE', 10), CaptureQueriesContext(connection) as queries:
+            archive.archive(self.cutoff)
+        deletes = [query for query in queries if query['sql'].startswith('DELETE FROM "api_contact" ')]
+        self.assertEqual(len(deletes), 3)
+
+    def test_command_and_admin(self):
+        """Test archive_contacts and the admin pages of archived messages"""
+        out = io.StringIO()
+        call_command('archive_contacts', days=365, stdout=out)
+        self.assertIn('Archived 25 messages into 1 segments', out.getvalue())
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.get(reverse('admin:api_contact_changelist'))
+        self.assertContains(response, reverse('admin:api_contact_archive'))
+        response = self.client.get(reverse('admin:api_contact_archive'), {'email': 'SENDER2@example.com'})
+        self.assertEqual(len(response.context['results']), 8)
+        url = reverse('admin:api_contact_archived', args=[self.old[2].pk])
+        self.assertContains(response, url)
+        self.assertContains(self.client.get(url), 'Old 2')
+        self.assertEqual(self.client.get(reverse('admin:api_contact_archived', args=[10 ** 9])).status_code, 404)
+
+
+@override_settings(API_EXPORT_TOKEN='secret')
+class ExportTestCase(APITestCase):
+    def setUp(self):
+        seed_models({'contacts': 120, 'projects': 30})
+        self.url = reverse('export', args=['contacts'])
+
+    def get(self, url=None, **kwargs):
+        kwargs.setdefault('HTTP_AUTHORIZATION', 'Bearer secret')
+        return self.client.get(url or self.url, **kwargs)
+
+    def test_csv_and_ndjson(self):
+        """Test that exports hold every row and field, in primary key order"""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="contacts-', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], [field.attname for field in Contact._meta.concrete_fields])
+        contacts = list(Contact.objects.order_by('pk'))
+        self.assertEqual([int(row[0]) for row in rows[1:]], [contact.pk for contact in contacts])
+        self.assertEqual(rows[1][rows[0].index('message')], contacts[0].message)
+
+        response = self.get(reverse('export', args=['projects']), data={'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        first = json.loads(lines[0])
+        project = Project.objects.order_by('pk').first()
+        self.assertEqual(len(lines), Project.objects.count())
+        self.assertEqual((first['id'], first['technologies']), (project.pk, project.technologies))
+        self.assertEqual(first['created_at'], project.created_at.isoformat())
+
+    def test_csv_formulas_escaped(self):
+        """Test that CSV cells which spreadsheets would evaluate are quoted"""
+        Contact.objects.filter(pk=Contact.objects.order_by('pk').first().pk).update(
+            name='=HYPERLINK("http://example.com")', subject='@SUM(A1)', message='-1+1',
+        )
+        rows = list(csv.reader(io.StringIO(b''.join(self.get().streaming_content).decode())))
+        header, first = rows[0], rows[1]
+        self.assertEqual(first[header.index('name')], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(first[header.index('subject')], "'@SUM(A1)")
+        self.assertEqual(first[header.index('message')], "'-1+1")
+        self.assertEqual(first[header.index('id')], str(Contact.objects.order_by('pk').first().pk))
+        # NDJSON is data, not a spreadsheet
+        line = b''.join(self.get(data={'format': 'ndjson'}).streaming_content).splitlines()[0]
+        self.assertEqual(json.loads(line)['subject'], '@SUM(A1)')
+
+    def test_access_and_errors(self):
+        """Test that only staff and token holders export, and bad requests fail"""
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.client.force_login(User.objects.create_user('visitor', password='password'))
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(self.get(reverse('export', args=['users'])).status_code, 404)
+        self.assertEqual(self.get(data={'format': 'xml'}).status_code, 400)
+
+    def test_compression(self):
+        """Test on-the-fly gzip and brotli matching the plain export"""
+        plain = b''.join(self.get().streaming_content)
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+        response = self.get(HTTP_ACCEPT_ENCODING='br, gzip')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_streams_from_one_cursor(self):
+        """Test that the rows are read in batches of one query and sent in pieces"""
+        with mock.patch.object(export, 'BUFFER_SIZE', 1024), CaptureQueriesContext(connection) as queries:
+            chunks = list(self.get().streaming_content)
+        self.assertGreater(len(chunks), 10)
+        self.assertEqual(len([query for query in queries if 'api_contact' in query['sql']]), 1)
+
+    async def test_async_stream_under_asgi(self):
+        """Test that ASGI requests get an async iterator with the same bytes"""
+        expected = b''.join(await sync_to_async(lambda: list(self.get().streaming_content))())
+        response = await self.async_client.get(self.url, headers={'Authorization': 'Bearer secret'})
+        self.assertTrue(response.is_async)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), expected)
+
+    def test_command_and_admin_action(self):
+        """Test export_data and the contact admin's CSV action"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'contacts.ndjson.gz'
+            call_command('export_data', 'contacts', format='ndjson', gzip=True, output=str(path), stderr=io.StringIO())
+            with gzip.open(path, 'rt') as file:
+                self.assertEqual(sum(1 for _ in file), Contact.objects.count())
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        selected = list(Contact.objects.order_by('pk').values_list('pk', flat=True)[:3])
+        response = self.client.post(reverse('admin:api_contact_changelist'), {
+            'action': 'export_csv', '_selected_action': selected,
+        })
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([int(row[0]) for row in rows[1:]], selected)
+
+    @unittest.skipUnless(connection.vendor == 'sqlite' and os.path.exists('/proc/self/statm'), 'Linux and SQLite only')
+    def test_memory_stays_flat(self):
+        """Test that exporting a million contacts keeps peak RSS flat"""
+        rows = 1_000_000
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) '
+                'INSERT INTO api_contact (name, email, subject, message, created_at, updated_at, is_read, is_spam) '
+                "SELECT 'Sender ' || i, 'sender' || i || '@example.com', 'Subject ' || i, "
+                "'A message long enough to look like a real one, number ' || i, "
+                "datetime('2024-01-01', '+' || i || ' seconds'), datetime('2024-01-01'), 1, 0 FROM n",
+                [rows],
+            )
+        page_size = os.sysconf('SC_PAGE_SIZE')
+
+        def rss():
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * page_size
+
+        baseline = peak = rss()
+        lines = 0
+        for chunk in self.get().streaming_content:
+            lines += chunk.count(b'\n')
+            peak = max(peak, rss())
+        self.assertEqual(lines, Contact.objects.count() + 1)
+        # Loading the rows at once would take several hundred megabytes
+        self.assertLess(peak - baseline, 32 * 1024 * 1024)
+
+
+class AsyncURLConf:
+    # api/urls.py as API_ASYNC_VIEWS builds it
+    urlpatterns = [
+        path('api/', include(async_views.urlpatterns_for(api_urls.router) + api_urls.urlpatterns)),
+    ]
+
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        seed_portfolio(projects=45, contacts=25)
+        self.project = Project.objects.order_by('pk').first()
+
+    def cold(self):
+        clear_snapshots()
+        cache.clear()
+
+    async def get_async(self, url, **kwargs):
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            response = await self.async_client.get(url, **kwargs)
+            # resolver_match resolves lazily, with the urlconf of the moment
+            self.assertTrue(asyncio.iscoroutinefunction(response.resolver_match.func), url)
+        return response
+
+    async def test_responses_match_sync_views(self):
+        """Test that every async read route returns the body and status of its sync view"""
+        urls = [
+            '/api/projects/', '/api/projects/?page=2', '/api/projects/?page=9', '/api/projects/?featured=true',
+            f'/api/projects/{self.project.pk}/', '/api/projects/999999/', '/api/projects/abc/',
+            '/api/skills/', '/api/experience/', '/api/certifications/', '/api/education/',
+            '/api/personal-info/', '/api/about/', '/api/social-links/', '/api/portfolio-summary/',
+            '/api/bootstrap/', '/api/bootstrap/?sections=skills,about', '/api/bootstrap/?sections=nope',
+            '/api/technologies/',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                await sync_to_async(self.cold)()
+                expected = await sync_to_async(self.client.get)(url)
+                await sync_to_async(self.cold)()
+                response = await self.get_async(url)
+                self.assertEqual(response.status_code, expected.status_code)
+                self.assertEqual(response.content, expected.content)
+                self.assertEqual(response.get('Allow'), expected.get('Allow'))
+                # Only the sync views read the session, for DRF's authentication
+                self.assertEqual(
+                    'Accept' in response.get('Vary', '').split(', '), 'Accept' in expected.get('Vary', '').split(', ')
+                )
+
+    def test_drf_headers(self):
+        """Test that async views send the Allow and Vary: Accept of their sync view"""
+        callback = next(pattern.callback for pattern in api_urls.router.urls if pattern.name == 'project-list')
+        self.assertEqual(async_views.drf_headers(callback), {'Allow': self.client.get('/api/projects/')['Allow']})
+        with mock.patch.object(callback.cls, 'renderer_classes', [JSONRenderer, BrowsableAPIRenderer]):
+            self.assertEqual(async_views.drf_headers(callback)['Vary'], 'Accept')
+
+    def test_materialized_and_conditional(self):
+        """Test that warm async reads come from stored bytes, compressed and revalidated"""
+        get = async_to_sync(self.get_async)
+        self.cold()
+        expected = self.client.get('/api/bootstrap/')
+        get('/api/bootstrap/')
+        with CaptureQueriesContext(connection) as queries:
+            response = get('/api/bootstrap/', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), expected.content)
+        response = get('/api/bootstrap/', headers={'Accept-Encoding': 'gzip', 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_other_requests_fall_back_to_sync_views(self):
+        """Test that posts, cursors and filters still work through the async routes"""
+        with override_settings(ROOT_URLCONF=AsyncURLConf):
+            response = await self.async_client.post('/api/contact/', {
+                'name': 'Async', 'email': 'async@example.com', 'subject': 'Hello',
+                'message': 'Sent through the async route and queued for run_outbox',
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(await OutboxEmail.objects.filter(subject__contains='Hello').aexists())
+            response = await self.async_client.get('/api/projects/?cursor=')
+            self.assertEqual(len(response.json()['results']), 20)
+
+    @override_settings(API_SERVER_TIMING=True, DEBUG=True)
+    def test_middleware_runs_async(self):
+        """Test that the ASGI handler needs no sync adapter for any middleware"""
+        from django.core.handlers.asgi import ASGIHandler
+
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+        self.cold()
+        response = async_to_sync(self.get_async)('/api/skills/')
+        # The version and the skills, queried from the request's sync thread
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+    def test_query_hook_keeps_wrapper_stack(self):
+        """Test that a connection opened inside execute_wrapper() leaves no wrapper behind"""
+        connection.execute_wrappers.remove(middleware.instrument)
+        with connection.execute_wrapper(middleware.QueryCounter()):
+            receivers.instrument_connection(sender=type(connection), connection=connection)
+        self.assertEqual(connection.execute_wrappers, [middleware.instrument])
+
+
+class WarmUpTestCase(TestCase):
+    def setUp(self):
+        seed_portfolio(projects=30, contacts=10)
+        clear_snapshots()
+        cache.clear()
+
+    def test_primes_every_public_read(self):
+        """Test that after the warm-up the public reads run no query"""
+        with self.assertLogs('api.warmup', 'INFO') as logs:
+            summary = warmup.warm_up(hosts=['testserver'])
+        self.assertIn('0 failed', logs.output[0])
+        self.assertEqual(summary['failed'], [])
+        self.assertEqual(summary['requests'], len(warmup.PAGES) + len(warmup.DETAILS))
+        self.assertGreater(summary['patterns'], len(api_urls.urlpatterns))
+        for name, query in warmup.PAGES:
+            with self.subTest(route=name, query=query), CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse(name) + query, HTTP_ACCEPT_ENCODING='gzip, br')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 0)
+
+    def test_caches_are_per_host(self):
+        """Test that only the listed hosts are warmed"""
+        with self.assertLogs('api.warmup', 'INFO'):
+            warmup.warm_up(hosts=['localhost'])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('bootstrap'))
+        self.assertGreater(len(queries), 0)
+
+    @override_settings(API_WARMUP=True)
+    def test_gunicorn_hook(self):
+        """Test that gunicorn workers warm up, and still start when that fails"""
+        hook = runpy.run_path(str(django_settings.BASE_DIR / 'gunicorn.conf.py'))['post_worker_init']
+        worker = mock.Mock()
+        with mock.patch.object(warmup, 'warm_up') as warm_up:
+            hook(worker)
+        warm_up.assert_called_once_with()
+        with mock.patch.object(warmup, 'warm_up', side_effect=RuntimeError):
+            hook(worker)
+        worker.log.exception.assert_called_once()
+        with override_settings(API_WARMUP=False), mock.patch.object(warmup, 'warm_up') as warm_up:
+            hook(worker)
+        warm_up.assert_not_called()
@@ -0,0 +1,171 @@
+"""
+Token-bucket throttling shared by all gunicorn workers.
+
+Buckets live in a small SQLite database in WAL mode at ``API_THROTTLE_DB``,
+apart from the main database so throttling never waits on its write lock.
+Taking a token is a single ``INSERT ... ON CONFLICT DO UPDATE ... RETURNING``
+on the bucket's primary key, atomic across processes without an external
+service, so allowing or rejecting a request costs one indexed statement.
+DRF runs throttles before the handler, so rejected requests are never
+validated.
+
+A view opts in with ``throttle_scope``; its rates are the
+``DEFAULT_THROTTLE_RATES`` entries ``<scope>-ip`` and ``<scope>-email``. A
+rate of ``N/period`` is a bucket of N tokens refilled at N per period, so a
+client may burst N requests and then keeps a steady N per period. Only
+unsafe methods are throttled.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Full buckets are deleted once per this many granted tokens
+PRUNE_EVERY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bucket (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    full_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+# Refill by the time elapsed, then take one token if there is one. SET
+# expressions see the old row, and no row is returned when the WHERE fails.
+TAKE = """
+INSERT INTO bucket (key, tokens, updated, full_at)
+VALUES (:key, :capacity - 1, :now, :now + 1 / :rate)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = min(:capacity, tokens + (:now - updated) * :rate) - 1,
+    updated = :now,
+    full_at = :now + (:capacity + 1 - min(:capacity, tokens + (:now - updated) * :rate)) / :rate
+WHERE min(:capacity, tokens + (:now - updated) * :rate) >= 1
+RETURNING tokens
+"""
+
+
+def parse_rate(rate):
+    """
+    ``'5/minute'`` -> ``(5, 60)``, like DRF's SimpleRateThrottle
+    """
+    count, period = rate.split('/')
+    return int(count), DURATIONS[period[0]]
+
+
+class BucketStore:
+    """
+    One process's connection to the shared bucket table
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pid = os.getpid()
+        self.path = None
+        self.connection = None
+        self.granted = 0
+
+    def connect(self):
+        path = Path(settings.API_THROTTLE_DB)
+        # Reconnect in a forked worker, or when the setting changes in tests
+        if self.pid != os.getpid() or self.path != path:
+            self.reset()
+        if self.connection is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode = WAL')
+            # Losing the last buckets in a power cut only forgives a few requests.
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(SCHEMA)
+            self.path, self.connection = path, connection
+        return self.connection
+
+    def take(self, key, capacity, period):
+        """
+        Take a token from ``key``'s bucket; return 0, or seconds until one refills
+        """
+        rate = capacity / period
+        now = time.time()
+        with self.lock:
+            connection = self.connect()
+            params = {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+            if connection.execute(TAKE, params).fetchone() is not None:
+                self.granted += 1
+                if self.granted % PRUNE_EVERY == 0:
+                    connection.execute('DELETE FROM bucket WHERE full_at < ?', (now,))
+                return 0
+            tokens, updated = connection.execute(
+                'SELECT tokens, updated FROM bucket WHERE key = ?', (key,)
+            ).fetchone()
+        return (1 - min(capacity, tokens + (now - updated) * rate)) / rate
+
+
+store = BucketStore()
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle unsafe requests by ``view.throttle_scope`` and one client key
+    """
+    kind = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if request.method in SAFE_METHODS or scope is None:
+            return True
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}-{self.kind}')
+        if rate is None:
+            return True
+        key = self.get_key(request)
+        if key is None:
+            return True
+
+        self.delay = store.take(f'{scope}-{self.kind}:{key}', *parse_rate(rate))
+        if self.delay:
+            metrics.record_throttle(scope, self.kind)
+            return False
+        return True
+
+    def wait(self):
+        return self.delay
+
+
+class ClientIPThrottle(TokenBucketThrottle):
+    """
+    Bucket per client address (see NUM_PROXIES)
+    """
+    kind = 'ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """
+    Bucket per submitted ``email``, whichever address it comes from
+    """
+    kind = 'email'
+
+    def get_key(self, request):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Hashed to keep addresses out of the throttle database
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
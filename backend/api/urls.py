@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 # Create a router and register our viewsets with it
 router = DefaultRouter()
@@ -18,5 +19,14 @@ urlpatterns = [
     path('about/', views.about_info, name='about-info'),
     path('social-links/', views.social_links, name='social-links'),
     path('portfolio-summary/', views.portfolio_summary, name='portfolio-summary'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
+    path('search/', views.search_view, name='search'),
+    path('technologies/', views.technology_facets, name='technologies'),
+    path('export/<str:name>/', views.export_view, name='export'),
     path('health/', views.health_check, name='health-check'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
+
+if settings.API_ASYNC_VIEWS:
+    # Async read views first; they hand anything else to the views above
+    urlpatterns = async_views.urlpatterns_for(router) + urlpatterns
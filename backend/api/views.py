@@ -1,22 +1,88 @@
+import hmac
+import uuid
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from django.core.mail import send_mail
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from django.core.paginator import Paginator
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 
+from . import export, ingest, metrics, outbox, search, spam, technologies
+from .cache import get_section, serialize
+from .compiled import compile_serializer
+from .materialized import materialized, preferred_coding
+from .pagination import KeysetPagination
 from .models import (
-    PersonalInfo, About, SocialLink, Contact, Project, 
-    Skill, Experience, Certification, Education
+    Contact, Project, Skill, Experience, Certification, Education
 )
 from .serializers import (
-    PersonalInfoSerializer, AboutSerializer, SocialLinkSerializer,
     ContactSerializer, ProjectSerializer, SkillSerializer,
     ExperienceSerializer, CertificationSerializer, EducationSerializer
 )
 
 
+class KeysetListMixin:
+    """
+    Page ``list`` by ``keyset_ordering`` straight from the database
+    """
+    keyset_ordering = None
+
+    def list(self, request, *args, **kwargs):
+        return self.keyset_list(request)
+
+    def keyset_list(self, request):
+        paginator = KeysetPagination(self.keyset_ordering)
+        data = paginator.paginate(
+            self.get_queryset(), request, self.get_serializer_class(), self.get_serializer_context()
+        )
+        return paginator.get_paginated_response(data)
+
+
+class SnapshotListMixin(KeysetListMixin):
+    """
+    Serve ``list`` from a cached snapshot section instead of the queryset.
+
+    The list route is also wrapped in ``materialized`` so repeated reads are
+    answered from stored response bytes. Views with a ``keyset_ordering``
+    switch to keyset pagination from the database when ``?cursor=`` is passed.
+    """
+    snapshot_section = None
+    snapshot_scope = 'content'
+    materialized_params = ('page',)
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if actions and actions.get('get') == 'list':
+            view = materialized(cls.snapshot_scope, cls.materialized_params)(view)
+        return view
+
+    def get_snapshot_section(self):
+        return self.snapshot_section
+
+    def list(self, request, *args, **kwargs):
+        if self.keyset_ordering and KeysetPagination.cursor_query_param in request.query_params:
+            return self.keyset_list(request)
+        data = get_section(self.get_snapshot_section(), request)
+        page = self.paginate_queryset(data)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(data)
+
+
+@materialized('content')
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def personal_info(request):
@@ -24,14 +90,15 @@ def personal_info(request):
     Get personal information
     """
     try:
-        personal_info = PersonalInfo.objects.filter(is_active=True).first()
+        personal_info = get_section('personal_info', request)
         if personal_info:
-            return Response(PersonalInfoSerializer(personal_info).data)
+            return Response(personal_info)
         return Response({'error': 'Personal info not found'}, status=404)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+@materialized('content')
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def about_info(request):
@@ -39,14 +106,15 @@ def about_info(request):
     Get about information
     """
     try:
-        about = About.objects.filter(is_active=True).first()
+        about = get_section('about', request)
         if about:
-            return Response(AboutSerializer(about).data)
+            return Response(about)
         return Response({'error': 'About info not found'}, status=404)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
+@materialized('content')
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def social_links(request):
@@ -54,120 +122,146 @@ def social_links(request):
     Get social links
     """
     try:
-        links = SocialLink.objects.filter(is_active=True).order_by('order')
-        return Response(SocialLinkSerializer(links, many=True).data)
+        return Response(get_section('social_links', request))
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 
-class ContactViewSet(viewsets.ModelViewSet):
+class ContactViewSet(KeysetListMixin, viewsets.ModelViewSet):
     """
     ViewSet for handling contact form submissions
     """
     queryset = Contact.objects.all()
     serializer_class = ContactSerializer
     permission_classes = [AllowAny]
+    # The inbox grows with every submission, which would also invalidate a
+    # snapshot of it, so every page is one keyset query instead
+    keyset_ordering = ('-created_at', '-id')
+    throttle_scope = 'contact'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            contact = serializer.save()
-            
-            # Send email notification
-            try:
-                subject = f"New Contact Form Submission: {contact.subject}"
-                message = f"""
-                New contact form submission from your portfolio website:
-                
-                Name: {contact.name}
-                Email: {contact.email}
-                Subject: {contact.subject}
-                
-                Message:
-                {contact.message}
-                
-                Submitted at: {contact.created_at}
-                """
-                
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[settings.DEFAULT_FROM_EMAIL],
-                    fail_silently=False,
-                )
-            except Exception as e:
-                # Log the error but don't fail the request
-                print(f"Failed to send email: {e}")
+            if settings.API_CONTACT_WRITE_BEHIND:
+                # Buffered and inserted in a later batch with its notification
+                contact = Contact(submission_id=uuid.uuid4(), **serializer.validated_data)
+                ingest.submit(contact)
+                data = {**self.get_serializer(contact).data, 'submission_id': str(contact.submission_id)}
+                return Response(data, status=status.HTTP_202_ACCEPTED)
+
+            # Near duplicates and blocked senders are stored but not emailed
+            screened = Contact(**serializer.validated_data)
+            keys = spam.screen([screened])
+            # The notification is queued with the row and sent by run_outbox
+            # or the in-process drainer, so the request never waits on SMTP.
+            with transaction.atomic():
+                contact = serializer.save(is_spam=screened.is_spam)
+                spam.index([contact], keys)
+                if not contact.is_spam:
+                    outbox.contact_notification(contact).save()
+                    outbox.queued()
             
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+class ProjectViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for displaying projects
     """
     queryset = Project.objects.filter(is_featured=True)
     serializer_class = ProjectSerializer
     permission_classes = [AllowAny]
+    materialized_params = ('featured', 'page', 'tech', 'match')
+    keyset_ordering = ('-created_at', '-id')
     
     def get_queryset(self):
         queryset = Project.objects.all()
         featured_only = self.request.query_params.get('featured', None)
         if featured_only == 'true':
             queryset = queryset.filter(is_featured=True)
-        return queryset.order_by('-created_at')
+        names = self.get_technologies()
+        if names:
+            match = self.request.query_params.get('match', 'all')
+            if match not in technologies.MATCH_MODES:
+                raise ValidationError({'match': f"Must be one of: {', '.join(technologies.MATCH_MODES)}"})
+            # Resolved through the technology link tables, not the JSON
+            queryset = technologies.filter_owners(queryset, names, match)
+        return queryset.order_by('-created_at', '-id')
+
+    def get_technologies(self):
+        """
+        Names from ``?tech=Python&tech=TensorFlow`` or ``?tech=Python,TensorFlow``
+        """
+        return [
+            name.strip()
+            for value in self.request.query_params.getlist('tech')
+            for name in value.split(',') if name.strip()
+        ]
+
+    def list(self, request, *args, **kwargs):
+        if self.get_technologies() and KeysetPagination.cursor_query_param not in request.query_params:
+            # Filtered lists are read from the database, in the page-number
+            # envelope of the unfiltered list
+            compiled = compile_serializer(self.get_serializer_class())
+            page = self.paginate_queryset(self.get_queryset().values_list(*compiled.columns))
+            return self.get_paginated_response(compiled.serialize_rows(page, self.get_serializer_context()))
+        return super().list(request, *args, **kwargs)
 
+    def get_snapshot_section(self):
+        if self.request.query_params.get('featured', None) == 'true':
+            return 'featured_projects'
+        return 'projects'
 
-class SkillViewSet(viewsets.ReadOnlyModelViewSet):
+
+class SkillViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for displaying skills
     """
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [AllowAny]
+    snapshot_section = 'skills'
+    materialized_params = ()
     
     def list(self, request, *args, **kwargs):
-        skills = self.get_queryset()
-        # Group skills by category
-        skills_by_category = {}
-        for skill in skills:
-            category = skill.get_category_display()
-            if category not in skills_by_category:
-                skills_by_category[category] = []
-            skills_by_category[category].append(SkillSerializer(skill).data)
-        
-        return Response(skills_by_category)
+        # Skills are grouped by category and not paginated
+        return Response(get_section(self.snapshot_section, request))
 
 
-class ExperienceViewSet(viewsets.ReadOnlyModelViewSet):
+class ExperienceViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for displaying work experience
     """
     queryset = Experience.objects.all()
     serializer_class = ExperienceSerializer
     permission_classes = [AllowAny]
+    snapshot_section = 'experience'
+    keyset_ordering = ('-start_date', '-id')
 
 
-class CertificationViewSet(viewsets.ReadOnlyModelViewSet):
+class CertificationViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for displaying certifications
     """
     queryset = Certification.objects.all()
     serializer_class = CertificationSerializer
     permission_classes = [AllowAny]
+    snapshot_section = 'certifications'
+    keyset_ordering = ('-date_issued', '-id')
 
 
-class EducationViewSet(viewsets.ReadOnlyModelViewSet):
+class EducationViewSet(SnapshotListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for displaying education
     """
     queryset = Education.objects.all()
     serializer_class = EducationSerializer
     permission_classes = [AllowAny]
+    snapshot_section = 'education'
 
 
+@materialized('content')
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def portfolio_summary(request):
@@ -175,22 +269,7 @@ def portfolio_summary(request):
     API endpoint that returns a summary of all portfolio data
     """
     try:
-        data = {
-            'projects': ProjectSerializer(
-                Project.objects.filter(is_featured=True)[:6], 
-                many=True
-            ).data,
-            'skills_count': Skill.objects.count(),
-            'experience_count': Experience.objects.count(),
-            'certifications_count': Certification.objects.count(),
-            'education': EducationSerializer(
-                Education.objects.first()
-            ).data if Education.objects.exists() else None,
-            'latest_experience': ExperienceSerializer(
-                Experience.objects.first()
-            ).data if Experience.objects.exists() else None,
-        }
-        return Response(data)
+        return Response(get_section('portfolio_summary', request))
     except Exception as e:
         return Response(
             {'error': 'Failed to fetch portfolio summary'}, 
@@ -198,6 +277,142 @@ def portfolio_summary(request):
         )
 
 
+def first_page(data, url):
+    """
+    Build the page-one body the paginated list endpoint at ``url`` returns
+    """
+    page = Paginator(data, api_settings.PAGE_SIZE).page(1)
+    return {
+        'count': page.paginator.count,
+        'next': replace_query_param(url, 'page', 2) if page.has_next() else None,
+        'previous': None,
+        'results': list(page),
+    }
+
+
+# Bootstrap section -> (snapshot section, list route, query string). Sections
+# with a route are wrapped in the same pagination envelope as that endpoint.
+BOOTSTRAP_SECTIONS = {
+    'personal_info': ('personal_info', None, ''),
+    'about': ('about', None, ''),
+    'social_links': ('social_links', None, ''),
+    'projects': ('projects', 'project-list', ''),
+    'featured_projects': ('featured_projects', 'project-list', '?featured=true'),
+    'skills': ('skills', None, ''),
+    'experience': ('experience', 'experience-list', ''),
+    'education': ('education', 'education-list', ''),
+    'certifications': ('certifications', 'certification-list', ''),
+    'portfolio_summary': ('portfolio_summary', None, ''),
+}
+
+
+@materialized('content', params=('sections',))
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def bootstrap(request):
+    """
+    Return every portfolio section in one response.
+
+    Each section has the same body as its own endpoint. Pass
+    ``?sections=projects,skills`` to fetch only some of them.
+    """
+    requested = request.query_params.get('sections')
+    if requested:
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in BOOTSTRAP_SECTIONS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown sections: {', '.join(unknown)}",
+                 'sections': list(BOOTSTRAP_SECTIONS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        names = list(BOOTSTRAP_SECTIONS)
+
+    try:
+        data = {}
+        for name in names:
+            section, route, query = BOOTSTRAP_SECTIONS[name]
+            payload = get_section(section, request)
+            if route is not None:
+                url = request.build_absolute_uri(reverse(route)) + query
+                payload = first_page(payload, url)
+            data[name] = payload
+        return Response(data)
+    except Exception as e:
+        return Response(
+            {'error': 'Failed to fetch portfolio bootstrap'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+SEARCH_SERIALIZERS = {
+    'project': ProjectSerializer,
+    'skill': SkillSerializer,
+    'experience': ExperienceSerializer,
+}
+SEARCH_MAX_LIMIT = 50
+
+
+# Not materialized: every distinct ?q= would take a slot of the shared
+# per-version response store and soon crowd out the fixed pages.
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_view(request):
+    """
+    Ranked full-text search over projects, skills and experience.
+
+    ``?q=`` is required; ``?type=project,skill`` narrows the kinds searched
+    and ``?limit=`` caps the results (default 20, at most 50).
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Missing search query q'}, status=status.HTTP_400_BAD_REQUEST)
+    requested = request.query_params.get('type')
+    if requested:
+        kinds = [kind.strip() for kind in requested.split(',') if kind.strip()]
+        unknown = [kind for kind in kinds if kind not in SEARCH_SERIALIZERS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown types: {', '.join(unknown)}", 'types': list(SEARCH_SERIALIZERS)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        kinds = list(SEARCH_SERIALIZERS)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), SEARCH_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    matches = search.search(query, kinds, limit)
+    # One query per kind for the matched rows, then back in rank order
+    context = {'request': request}
+    rows = {}
+    for kind in kinds:
+        ids = [pk for match_kind, pk, score in matches if match_kind == kind]
+        if ids:
+            queryset = search.DOCUMENTS[kind].model.objects.filter(pk__in=ids).order_by()
+            rows[kind] = {row['id']: row for row in serialize(SEARCH_SERIALIZERS[kind], queryset, context)}
+    results = [
+        {'type': kind, 'id': pk, 'score': round(score, 4), 'data': rows[kind][pk]}
+        for kind, pk, score in matches if pk in rows.get(kind, {})
+    ]
+    return Response({'query': query, 'results': results})
+
+
+@materialized('content')
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def technology_facets(request):
+    """
+    Technologies used by projects and experience, most used first, with counts
+    """
+    try:
+        return Response(get_section('technologies', request))
+    except Exception as e:
+        return Response({'error': str(e)}, status=500)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def health_check(request):
@@ -205,3 +420,47 @@ def health_check(request):
     Simple health check endpoint
     """
     return Response({'status': 'healthy', 'message': 'Portfolio API is running!'})
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus metrics of all workers, for scrapers holding API_METRICS_TOKEN
+    """
+    token = getattr(settings, 'API_METRICS_TOKEN', '')
+    if not token:
+        raise Http404
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED, headers={'WWW-Authenticate': 'Bearer'})
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+def export_view(request, name):
+    """
+    Stream every row of one model as CSV or NDJSON, to staff users and
+    holders of API_EXPORT_TOKEN
+    """
+    if not export.is_authorized(request):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED, headers={'WWW-Authenticate': 'Bearer'})
+    model = export.EXPORTS.get(name)
+    if model is None:
+        raise Http404
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in export.CONTENT_TYPES:
+        return HttpResponseBadRequest(f"format must be one of {', '.join(export.CONTENT_TYPES)}")
+    coding = preferred_coding(request)
+    stream = export.astream if isinstance(request, ASGIRequest) else export.stream
+    response = StreamingHttpResponse(
+        stream(model._default_manager.all(), file_format, coding),
+        content_type=export.CONTENT_TYPES[file_format],
+        headers={
+            'Content-Disposition': f'attachment; filename="{name}-{timezone.now():%Y%m%d}.{file_format}"',
+            'Cache-Control': 'private, no-store',
+        },
+    )
+    if coding != 'identity':
+        response.headers['Content-Encoding'] = coding
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,119 @@
+"""
+Warm-up of a freshly started worker before it takes traffic.
+
+The first requests a new process serves are slow for reasons unrelated to
+the data: URL patterns compile their regexes and the resolver builds its
+reverse lookup on first use, serializers are compiled, view and renderer
+modules finish importing, the database connection is opened, and every
+snapshot section and materialized response (see api/cache.py and
+api/materialized.py) starts empty in each process.
+
+``warm_up`` does all of that up front. It compiles every URL pattern, then
+sends one GET per public read route through the full middleware stack, so
+the caches of the process hold the same entries steady traffic would have
+left there. Sections and stored responses are keyed by the requesting host,
+so the requests go to each of ``API_WARMUP_HOSTS``. gunicorn.conf.py runs it
+in ``post_worker_init``, after the application is loaded and before the
+worker accepts connections, unless ``API_WARMUP`` is off.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.test import Client
+from django.urls import URLResolver, get_resolver, reverse
+
+from .models import Certification, Contact, Education, Experience, Project, Skill
+
+logger = logging.getLogger('api.warmup')
+
+# Route name -> query string of each page requested
+PAGES = (
+    ('api-root', ''),
+    ('health-check', ''),
+    ('personal-info', ''),
+    ('about-info', ''),
+    ('social-links', ''),
+    ('portfolio-summary', ''),
+    ('bootstrap', ''),
+    ('technologies', ''),
+    ('project-list', ''),
+    ('project-list', '?featured=true'),
+    ('skill-list', ''),
+    ('experience-list', ''),
+    ('certification-list', ''),
+    ('education-list', ''),
+)
+# Detail routes, requested for the first row of their model
+DETAILS = {
+    'project-detail': Project,
+    'skill-detail': Skill,
+    'experience-detail': Experience,
+    'certification-detail': Certification,
+    'education-detail': Education,
+    'contact-detail': Contact,
+}
+
+
+def compile_patterns(resolver=None):
+    """
+    Compile the regex of every URL pattern; return how many there are
+    """
+    resolver = resolver or get_resolver()
+    # Builds the reverse lookup of the whole tree as well
+    resolver.reverse_dict
+    count = 0
+    for pattern in resolver.url_patterns:
+        pattern.pattern.regex
+        if isinstance(pattern, URLResolver):
+            count += compile_patterns(pattern)
+        else:
+            count += 1
+    return count
+
+
+def urls():
+    found = [reverse(name) + query for name, query in PAGES]
+    for name, model in DETAILS.items():
+        pk = model._default_manager.order_by('pk').values_list('pk', flat=True).first()
+        if pk is not None:
+            found.append(reverse(name, args=[pk]))
+    return found
+
+
+def warm_up(hosts=None):
+    """
+    Prepare this process for traffic; return what was done
+    """
+    started = time.perf_counter()
+    for alias in connections:
+        connections[alias].ensure_connection()
+    patterns = compile_patterns()
+
+    hosts = hosts if hosts is not None else settings.API_WARMUP_HOSTS
+    # Real traffic arrives over HTTPS wherever HTTP is redirected to it
+    secure = getattr(settings, 'SECURE_SSL_REDIRECT', False)
+    client = Client(raise_request_exception=False)
+    failed = []
+    requests = 0
+    for host in hosts:
+        for url in urls():
+            response = client.get(url, secure=secure, HTTP_HOST=host, HTTP_ACCEPT_ENCODING='gzip, br')
+            requests += 1
+            if response.status_code >= 400:
+                failed.append((host, url, response.status_code))
+
+    summary = {
+        'patterns': patterns,
+        'requests': requests,
+        'failed': failed,
+        'ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info(
+        'Warmed up in %s ms: %s URL patterns compiled, %s requests, %s failed',
+        summary['ms'], patterns, requests, len(failed),
+    )
+    for host, url, status in failed:
+        logger.warning('Warm-up request to %s%s returned %s', host, url, status)
+    return summary
@@ -0,0 +1,98 @@
+"""
+Contact admin changelist load time: Django's stock changelist versus the
+high-volume one.
+
+Seeds ``--contacts`` messages (3 years, older ones mostly read) and renders
+the changelist for a few typical views with both admins, in process through
+``changelist_view``. The stock admin counts twice, pages by ``OFFSET`` and
+lists the date hierarchy with ``SELECT DISTINCT``; the high-volume admin
+should take the same time at any size::
+
+    python -m benchmarks.admin --contacts 10000000
+"""
+import argparse
+import time
+
+from benchmarks.harness import setup
+
+
+def median_ms(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--contacts', type=int, default=1_000_000, help='contacts to seed')
+    parser.add_argument('--repeat', type=int, default=5, help='timed loads per view')
+    parser.add_argument('--batch-size', type=int, default=20000, help='rows per bulk_create')
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib import admin
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test import RequestFactory, override_settings
+
+    from api.admin import ContactAdmin
+    from api.models import Contact
+    from api.pagination import KeysetPagination
+    from api.seeding import seed_models
+
+    override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage').enable()
+
+    started = time.perf_counter()
+    seed_models({'contacts': args.contacts}, batch_size=args.batch_size)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    print(f'seeded {args.contacts:,} contacts in {time.perf_counter() - started:.0f}s\n')
+
+    class StockContactAdmin(admin.ModelAdmin):
+        list_display = ContactAdmin.list_display
+        list_filter = ContactAdmin.list_filter
+        date_hierarchy = 'created_at'
+        ordering = ['-created_at']
+
+    admins = {
+        'stock': StockContactAdmin(Contact, admin.site),
+        'high-volume': ContactAdmin(Contact, admin.site),
+    }
+    user = User.objects.create_superuser('bench', 'bench@example.com', 'password')
+    factory = RequestFactory()
+    middle = Contact.objects.order_by('-created_at').values_list('created_at', flat=True)[args.contacts // 2]
+    deep_page = args.contacts // 2 // ContactAdmin.list_per_page
+
+    def load(model_admin, params):
+        request = factory.get('/admin/api/contact/', params)
+        request.user = user
+        response = model_admin.changelist_view(request)
+        response.render()
+        assert response.status_code == 200, response.status_code
+
+    def cursor_at(value):
+        return KeysetPagination(ContactAdmin.keyset_ordering).encode_cursor([value, 0], False)
+
+    views = {
+        'first page': ({}, {}),
+        'unread': ({'is_read__exact': '0'}, {'is_read__exact': '0'}),
+        'year drill-down': ({'created_at__year': middle.year}, {'created_at__year': middle.year}),
+        'month drill-down': (
+            {'created_at__year': middle.year, 'created_at__month': middle.month},
+            {'created_at__year': middle.year, 'created_at__month': middle.month},
+        ),
+        'middle page': ({'p': deep_page}, {'cursor': cursor_at(middle)}),
+    }
+    print(f"{'view':18} {'stock ms':>10} {'high-volume ms':>15}")
+    for name, (stock_params, params) in views.items():
+        stock = median_ms(lambda: load(admins['stock'], stock_params), args.repeat)
+        fast = median_ms(lambda: load(admins['high-volume'], params), args.repeat)
+        print(f'{name:18} {stock:10.1f} {fast:15.1f}')
+
+
+if __name__ == '__main__':
+    main()
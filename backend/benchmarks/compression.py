@@ -0,0 +1,62 @@
+"""
+Size and latency report for precompressed API payloads.
+
+For each endpoint and content-coding this prints the body size, the time
+one worker spends per request serving the stored variant, the time
+compressing on every request would add (what GZipMiddleware does), and the
+transfer time on slow and fast links. Output is a Markdown table.
+"""
+import argparse
+import gzip
+import time
+
+from benchmarks.harness import seed, setup, wsgi_rps
+
+ENDPOINTS = ['/api/projects/', '/api/portfolio-summary/']
+
+# Link speeds in bits per second
+LINKS = {'3G (1.6 Mbit/s)': 1.6e6, 'cable (20 Mbit/s)': 20e6}
+
+
+def per_request_compression(content, coding, repeat=200):
+    if coding == 'identity':
+        return 0.0
+    if coding == 'gzip':
+        compress = lambda: gzip.compress(content, compresslevel=6)  # noqa: E731
+    else:
+        import brotli
+        compress = lambda: brotli.compress(content, quality=4)  # noqa: E731
+    started = time.perf_counter()
+    for _ in range(repeat):
+        compress()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=1.0, help='duration per measurement')
+    parser.add_argument('--projects', type=int, default=100, help='number of seeded projects')
+    args = parser.parse_args()
+
+    setup()
+    seed(projects=args.projects)
+
+    from django.test import Client
+    from api.materialized import CODINGS
+
+    links = ' | '.join(f'transfer {name}' for name in LINKS)
+    print(f'| endpoint | coding | bytes | ratio | stored (µs) | on the fly (µs) | {links} |')
+    print('|' + ' --- |' * (6 + len(LINKS)))
+    for path in ENDPOINTS:
+        identity = Client().get(path).content
+        for coding in ('identity',) + CODINGS:
+            rps, size = wsgi_rps(path, seconds=args.seconds, **{'Accept-Encoding': coding})
+            served = 1e6 / rps
+            extra = per_request_compression(identity, coding) * 1e6
+            transfers = ' | '.join(f'{size * 8 / speed * 1e3:.1f} ms' for speed in LINKS.values())
+            print(f'| {path} | {coding} | {size} | {size / len(identity):.2f} | '
+                  f'{served:.0f} | {served + extra:.0f} | {transfers} |')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Shared setup for the API benchmarks.
+
+Benchmarks run against a throwaway test database, never db.sqlite3. Run
+them from the backend directory, for example::
+
+    python -m benchmarks.materialized --seconds 3
+"""
+import io
+import os
+import sys
+import time
+
+import django
+
+
+def setup():
+    """
+    Configure Django and create an empty test database
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_backend.settings')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def seed(**sizes):
+    """
+    Fill the test database with a portfolio of the given size
+    """
+    from api.testing import seed_portfolio
+
+    seed_portfolio(**sizes)
+
+
+def wsgi_environ(path, query='', **headers):
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    return environ
+
+
+def wsgi_rps(path, query='', seconds=2.0, before=None, **headers):
+    """
+    Drive the WSGI handler in-process, the way one sync gunicorn worker
+    does, and return (requests per second, response size in bytes)
+    """
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+    statuses = []
+
+    def start_response(status, response_headers, exc_info=None):
+        statuses.append(status)
+
+    requests = 0
+    size = 0
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    while time.perf_counter() < deadline:
+        if before is not None:
+            before()
+        response = handler(wsgi_environ(path, query, **headers), start_response)
+        size = sum(len(chunk) for chunk in response)
+        response.close()
+        requests += 1
+    elapsed = time.perf_counter() - started
+
+    if not statuses[-1].startswith(('200', '304')):
+        raise RuntimeError(f'{path}?{query} returned {statuses[-1]}')
+    return requests / elapsed, size
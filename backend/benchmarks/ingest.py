@@ -0,0 +1,135 @@
+"""
+Contact form throughput under a burst: direct inserts versus write-behind.
+
+A seeded SQLite database is copied for each mode and served by gunicorn,
+while ``--submitters`` concurrent clients (threads spread over
+``--processes`` client processes) POST to /api/contacts/ for ``--seconds``.
+After the server stops, ``flush_contacts`` replays anything still buffered
+and the rows are counted, so a mode that lost acknowledged submissions is
+reported as such::
+
+    python -m benchmarks.ingest --submitters 500 --workers 4
+"""
+import argparse
+import json
+import multiprocessing
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.load import BACKEND_DIR, CONTACT, percentile, prepare_database, request, server_environ, start_server
+
+MODES = {
+    'direct': {'API_CONTACT_WRITE_BEHIND': 'False'},
+    'write-behind': {'API_CONTACT_WRITE_BEHIND': 'True'},
+}
+
+
+def submit_until(job):
+    """
+    Client process: ``threads`` submitters posting until the deadline
+    """
+    port, path, threads, deadline = job
+    samples = []
+    lock = threading.Lock()
+    body = json.dumps(CONTACT)
+
+    def submitter():
+        mine = []
+        while time.time() < deadline:
+            started = time.perf_counter()
+            try:
+                status = request(port, 'POST', path, body)
+            except OSError:
+                status = 0
+            mine.append((time.perf_counter() - started, status))
+        with lock:
+            samples.extend(mine)
+
+    workers = [threading.Thread(target=submitter) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return samples
+
+
+def count_contacts(database):
+    with sqlite3.connect(database) as db:
+        return db.execute('SELECT COUNT(*) FROM api_contact').fetchone()[0]
+
+
+def run_mode(args, environ, path, database):
+    before = count_contacts(database)
+    server = start_server(environ, args.workers, args.port)
+    try:
+        deadline = time.time() + args.seconds
+        share, extra = divmod(args.submitters, args.processes)
+        jobs = [(args.port, path, share + (i < extra), deadline) for i in range(args.processes)]
+        with multiprocessing.Pool(args.processes) as pool:
+            samples = [sample for part in pool.map(submit_until, jobs) for sample in part]
+    finally:
+        server.terminate()
+        server.wait()
+    subprocess.run(
+        [sys.executable, 'manage.py', 'flush_contacts'], cwd=BACKEND_DIR, env=environ,
+        check=True, stdout=subprocess.DEVNULL,
+    )
+
+    accepted = sorted(latency for latency, status in samples if status in (201, 202))
+    stored = count_contacts(database) - before
+    return {
+        'submissions': len(samples),
+        'accepted': len(accepted),
+        'errors': len(samples) - len(accepted),
+        'stored': stored,
+        'lost': len(accepted) - stored,
+        'rps': round(len(accepted) / args.seconds, 1),
+        **{f'p{q}_ms': round(percentile(accepted, q) * 1000, 2) if accepted else None for q in (50, 95, 99)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--submitters', type=int, default=500, help='concurrent clients')
+    parser.add_argument('--processes', type=int, default=8, help='client processes')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers')
+    parser.add_argument('--seconds', type=float, default=15.0, help='duration per mode')
+    parser.add_argument('--port', type=int, default=8766, help='port for gunicorn')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        base = server_environ(directory)
+        routes = prepare_database(base, {
+            'projects': 10, 'skills': 10, 'experience': 2,
+            'certifications': 2, 'education': 1, 'contacts': 1000,
+        })
+        path = routes['contact-create'][1]
+
+        results = {}
+        for mode, overrides in MODES.items():
+            database = directory / f'{mode}.sqlite3'
+            shutil.copy(directory / 'load.sqlite3', database)
+            environ = {
+                **base, **overrides,
+                'DATABASE_URL': f'sqlite:///{database}',
+                'API_CONTACT_BUFFER_DIR': str(directory / f'{mode}-buffer'),
+            }
+            results[mode] = run_mode(args, environ, path, database)
+            print(f'{mode}: {results[mode]}', file=sys.stderr)
+
+    print(f'\n{args.submitters} submitters, {args.workers} workers, {args.seconds:g} s per mode\n')
+    print(f"{'mode':14} {'req/s':>8} {'errors':>7} {'lost':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, result in results.items():
+        print(f"{mode:14} {result['rps']:8.1f} {result['errors']:7} {result['lost']:5} "
+              f"{result['p50_ms']:8} {result['p95_ms']:8} {result['p99_ms']:8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+"""
+HTTP load benchmark of the API under gunicorn with 1, 2, 4 and 8 workers.
+
+A throwaway SQLite database is migrated and seeded, then for every worker
+count a gunicorn server is started on it and driven by client processes
+with a weighted mix of every public route in api/urls.py, including search
+and technology filters, plus contact form submissions. Requests per second
+and p50/p95/p99 latency per route are written to a JSON and a Markdown
+report::
+
+    python -m benchmarks.load --seconds 15 --output reports/base
+    python -m benchmarks.load --mix skill-list=10,contact-create=0 --workers 4
+    python -m benchmarks.load --compare reports/base.json reports/new.json
+
+``--asgi`` runs the same load against portfolio_backend/asgi.py under
+uvicorn workers, with the async views of api/async_views.py; compare it
+with a sync run at the same worker counts and high ``--concurrency``::
+
+    python -m benchmarks.load --workers 1,2 --concurrency 64 --output reports/sync
+    python -m benchmarks.load --workers 1,2 --concurrency 64 --asgi --output reports/asgi
+    python -m benchmarks.load --compare reports/sync.json reports/asgi.json
+
+``--compare`` exits non-zero when a route lost more than ``--threshold``
+of its throughput or gained as much p95 latency. Client processes share the
+machine with the server, so compare runs made on the same hardware only.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Default share of traffic per route, roughly a portfolio page load pattern
+DEFAULT_MIX = {
+    'bootstrap': 10,
+    'portfolio-summary': 8,
+    'personal-info': 6,
+    'about-info': 4,
+    'social-links': 4,
+    'project-list': 8,
+    'project-list-featured': 6,
+    'project-detail': 4,
+    'project-list-tech': 2,
+    'skill-list': 6,
+    'skill-detail': 1,
+    'experience-list': 4,
+    'experience-detail': 1,
+    'certification-list': 3,
+    'certification-detail': 1,
+    'education-list': 3,
+    'education-detail': 1,
+    'contact-list': 1,
+    'contact-detail': 1,
+    'search': 2,
+    'technologies': 2,
+    'api-root': 1,
+    'health-check': 2,
+    'contact-create': 1,
+}
+
+# Sent by the reverse proxy in production; gunicorn trusts it from 127.0.0.1,
+# so DEBUG=False does not redirect the benchmark to HTTPS.
+HEADERS = {
+    'Host': 'localhost',
+    'X-Forwarded-Proto': 'https',
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, br',
+}
+
+CONTACT = {'name': 'Load', 'email': 'load@example.com', 'subject': 'Load', 'message': 'Load test'}
+
+
+def server_environ(directory):
+    return {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'portfolio_backend.settings',
+        'DATABASE_URL': f'sqlite:///{directory / "load.sqlite3"}',
+        'CACHE_LOCATION': str(directory / 'cache'),
+        'API_METRICS_DIR': str(directory / 'metrics'),
+        # Throttles stay on, with rates no benchmark client reaches
+        'API_THROTTLE_DB': str(directory / 'throttle.sqlite3'),
+        'CONTACT_IP_RATE': '1000000/s',
+        'CONTACT_EMAIL_RATE': '1000000/s',
+        'EMAIL_BACKEND': 'django.core.mail.backends.dummy.EmailBackend',
+        'DEBUG': 'False',
+    }
+
+
+def prepare_database(environ, sizes):
+    """
+    Migrate and seed the benchmark database, and return the route table
+    """
+    os.environ.update(environ)
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    from django.urls import reverse
+
+    from api.models import Certification, Contact, Education, Experience, Project, Skill
+    from api.seeding import TECHNOLOGIES, WORDS
+    from api.testing import seed_portfolio
+
+    call_command('migrate', verbosity=0)
+    # bulk_create fills the search index and the technology tables as well
+    seed_portfolio(**sizes)
+
+    routes = {
+        name: ('GET', reverse(name), None)
+        for name in (
+            'api-root', 'health-check', 'personal-info', 'about-info', 'social-links',
+            'portfolio-summary', 'bootstrap', 'project-list', 'skill-list', 'experience-list',
+            'certification-list', 'education-list', 'contact-list', 'technologies',
+        )
+    }
+    routes['project-list-featured'] = ('GET', reverse('project-list') + '?featured=true', None)
+    # The most common seeded technology, and a prefix of seeded title words
+    routes['project-list-tech'] = ('GET', f"{reverse('project-list')}?tech={TECHNOLOGIES[0]}", None)
+    routes['search'] = ('GET', f"{reverse('search')}?q={WORDS[-1][:4]}", None)
+    for name, model in (
+        ('project-detail', Project), ('skill-detail', Skill), ('experience-detail', Experience),
+        ('certification-detail', Certification), ('education-detail', Education),
+        ('contact-detail', Contact),
+    ):
+        routes[name] = ('GET', reverse(name, args=[model.objects.order_by('pk').first().pk]), None)
+    routes['contact-create'] = ('POST', reverse('contact-list'), json.dumps(CONTACT))
+    return routes
+
+
+def start_server(environ, workers, port, asgi=False):
+    if asgi:
+        app = ['portfolio_backend.asgi:application', '--worker-class', 'uvicorn_worker.UvicornWorker']
+    else:
+        app = ['portfolio_backend.wsgi:application']
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', *app,
+         '--workers', str(workers), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=environ,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if request(port, 'GET', '/api/health/', None) == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start')
+
+
+def request(port, method, path, body):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    try:
+        headers = dict(HEADERS)
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def drive(job):
+    """
+    Client process: send weighted random requests until the deadline
+    """
+    port, routes, mix, deadline, seed = job
+    chooser = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = []
+    while time.time() < deadline:
+        name = chooser.choices(names, weights)[0]
+        method, path, body = routes[name]
+        started = time.perf_counter()
+        try:
+            status = request(port, method, path, body)
+        except OSError:
+            status = 0
+        samples.append((name, time.perf_counter() - started, status))
+    return samples
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile of sorted ``values``
+    """
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))]
+
+
+def summarize(samples, seconds):
+    routes = {}
+    for name, latency, status in samples:
+        routes.setdefault(name, ([], []))[0 if 200 <= status < 400 else 1].append(latency)
+
+    summary = {}
+    for name, (ok, errors) in sorted(routes.items()):
+        ok.sort()
+        summary[name] = {
+            'requests': len(ok) + len(errors),
+            'errors': len(errors),
+            'rps': round(len(ok) / seconds, 1),
+            **{f'p{q}_ms': round(percentile(ok, q) * 1000, 2) if ok else None for q in (50, 95, 99)},
+        }
+    total = sum(route['rps'] for route in summary.values())
+    return {'rps': round(total, 1), 'errors': sum(r['errors'] for r in summary.values()), 'routes': summary}
+
+
+def run(args):
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, args.mix.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in mix:
+            raise SystemExit(f'unknown route in --mix: {name}')
+        mix[name] = float(weight)
+    mix = {name: weight for name, weight in mix.items() if weight > 0}
+
+    with tempfile.TemporaryDirectory() as directory:
+        environ = server_environ(Path(directory))
+        routes = prepare_database(environ, {
+            'projects': args.projects, 'skills': args.skills, 'experience': 10,
+            'certifications': 20, 'education': 3, 'contacts': 50,
+        })
+        report = {
+            'seconds': args.seconds,
+            'concurrency': args.concurrency,
+            'mix': mix,
+            'cpus': os.cpu_count(),
+            'server': 'asgi' if args.asgi else 'wsgi',
+            'runs': {},
+        }
+        for workers in args.workers:
+            server = start_server(environ, workers, args.port, args.asgi)
+            try:
+                # Fill the snapshot and materialized stores of every worker.
+                for _ in range(workers * 2):
+                    for method, path, body in routes.values():
+                        if method == 'GET':
+                            request(args.port, method, path, body)
+                deadline = time.time() + args.seconds
+                jobs = [(args.port, routes, mix, deadline, seed) for seed in range(args.concurrency)]
+                with multiprocessing.Pool(args.concurrency) as pool:
+                    samples = [sample for part in pool.map(drive, jobs) for sample in part]
+            finally:
+                server.terminate()
+                server.wait()
+            report['runs'][str(workers)] = summarize(samples, args.seconds)
+            print(f"{workers} workers: {report['runs'][str(workers)]['rps']:.0f} req/s, "
+                  f"{report['runs'][str(workers)]['errors']} errors", file=sys.stderr)
+    return report
+
+
+def markdown(report):
+    lines = [
+        '# API load benchmark\n',
+        f"{report.get('server', 'wsgi').upper()}, {report['seconds']} s per run, "
+        f"{report['concurrency']} concurrent clients, {report['cpus']} CPUs.\n",
+        '| workers | req/s | errors |', '|---:|---:|---:|',
+    ]
+    lines += [f"| {w} | {run['rps']:.0f} | {run['errors']} |" for w, run in report['runs'].items()]
+    for workers, run in report['runs'].items():
+        lines += [
+            f'\n## {workers} workers\n',
+            '| route | requests | errors | req/s | p50 ms | p95 ms | p99 ms |',
+            '|---|---:|---:|---:|---:|---:|---:|',
+        ]
+        for name, route in run['routes'].items():
+            lines.append(
+                f"| {name} | {route['requests']} | {route['errors']} | {route['rps']} "
+                f"| {route['p50_ms']} | {route['p95_ms']} | {route['p99_ms']} |"
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def compare(base, new, threshold):
+    """
+    Print per-route changes between two reports; return the regressions
+    """
+    regressions = []
+    print(f"{'workers':>7} {'route':24} {'req/s':>16} {'p95 ms':>18}")
+    for workers, run in new['runs'].items():
+        old = base['runs'].get(workers)
+        if old is None:
+            continue
+        for name, route in run['routes'].items():
+            before = old['routes'].get(name)
+            if before is None or not before['rps'] or before['p95_ms'] is None or route['p95_ms'] is None:
+                continue
+            rps = route['rps'] / before['rps'] - 1
+            p95 = route['p95_ms'] / before['p95_ms'] - 1
+            flag = ''
+            if rps < -threshold or p95 > threshold:
+                regressions.append((workers, name))
+                flag = '  REGRESSION'
+            print(f"{workers:>7} {name:24} {route['rps']:8.1f} {rps:+7.1%} "
+                  f"{route['p95_ms']:9.2f} {p95:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4,8', help='comma-separated worker counts')
+    parser.add_argument('--seconds', type=float, default=10.0, help='duration per worker count')
+    parser.add_argument('--concurrency', type=int, default=16, help='client processes')
+    parser.add_argument('--mix', default='', help='route=weight overrides, e.g. bootstrap=20,contact-create=0')
+    parser.add_argument('--projects', type=int, default=50, help='number of seeded projects')
+    parser.add_argument('--skills', type=int, default=40, help='number of seeded skills')
+    parser.add_argument('--asgi', action='store_true', help='serve asgi.py with uvicorn workers')
+    parser.add_argument('--port', type=int, default=8765, help='port for gunicorn')
+    parser.add_argument('--output', default='load-report', help='report path without extension')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two JSON reports')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed relative regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        base, new = (json.loads(Path(path).read_text()) for path in args.compare)
+        regressions = compare(base, new, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    args.workers = [int(workers) for workers in args.workers.split(',')]
+    report = run(args)
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.with_suffix('.json').write_text(json.dumps(report, indent=2))
+    output.with_suffix('.md').write_text(markdown(report))
+    print(markdown(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Requests per second of one sync worker with and without the materialized
+response store.
+
+Three modes are compared for each endpoint:
+
+* ``uncached``: snapshot cleared before every request (ORM + DRF + render)
+* ``snapshot``: cached serialized data, rendered by JSONRenderer per request
+* ``materialized``: stored response bytes returned as-is
+"""
+import argparse
+
+from benchmarks.harness import seed, setup, wsgi_rps
+
+ENDPOINTS = [
+    ('/api/projects/', ''),
+    ('/api/projects/', 'featured=true'),
+    ('/api/skills/', ''),
+    ('/api/experience/', ''),
+    ('/api/portfolio-summary/', ''),
+    ('/api/bootstrap/', ''),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help='duration per measurement')
+    parser.add_argument('--projects', type=int, default=50, help='number of seeded projects')
+    args = parser.parse_args()
+
+    setup()
+    seed(projects=args.projects)
+
+    from django.test.utils import override_settings
+    from api.cache import clear_snapshots
+
+    print(f"{'endpoint':40} {'uncached':>10} {'snapshot':>10} {'material.':>10} {'speedup':>8}")
+    for path, query in ENDPOINTS:
+        with override_settings(API_MATERIALIZED_RESPONSES=False):
+            uncached, _ = wsgi_rps(path, query, args.seconds, before=clear_snapshots)
+            snapshot, _ = wsgi_rps(path, query, args.seconds)
+        materialized, _ = wsgi_rps(path, query, args.seconds)
+        label = f'{path}?{query}' if query else path
+        print(f'{label:40} {uncached:10.0f} {snapshot:10.0f} {materialized:10.0f} '
+              f'{materialized / snapshot:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
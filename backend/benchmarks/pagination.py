@@ -0,0 +1,78 @@
+"""
+Page-number (COUNT + OFFSET) versus keyset pagination at increasing depth.
+
+Both paths run the same ``values_list()`` query shape and the same compiled
+serializer for ``?page=N`` and its equivalent cursor, so the difference is
+the cost of reaching the page. Seeding 1M projects takes a few minutes::
+
+    python -m benchmarks.pagination --rows 1000000
+"""
+import argparse
+import time
+
+from benchmarks.harness import seed, setup
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='number of seeded projects')
+    parser.add_argument('--repeat', type=int, default=5, help='best of N runs')
+    args = parser.parse_args()
+
+    setup()
+    started = time.perf_counter()
+    seed(projects=args.rows, skills=0, experience=0, certifications=0, education=0)
+    print(f'seeded {args.rows:,} projects in {time.perf_counter() - started:.0f}s\n')
+
+    from rest_framework.pagination import PageNumberPagination
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+    from rest_framework.test import APIRequestFactory
+
+    from api.compiled import compile_serializer
+    from api.models import Project
+    from api.pagination import KeysetPagination
+    from api.serializers import ProjectSerializer
+
+    factory = APIRequestFactory()
+    compiled = compile_serializer(ProjectSerializer)
+    ordering = ('-created_at', '-id')
+    queryset = Project.objects.order_by(*ordering)
+    keyset = KeysetPagination(ordering)
+    page_size = api_settings.PAGE_SIZE
+
+    def offset_page(page):
+        request = Request(factory.get('/api/projects/', {'page': page}))
+        rows = PageNumberPagination().paginate_queryset(queryset.values_list(*compiled.columns), request)
+        return compiled.serialize_rows(rows)
+
+    def keyset_page(cursor):
+        request = Request(factory.get('/api/projects/', {'cursor': cursor}))
+        return keyset.paginate(Project.objects.all(), request, ProjectSerializer, {})
+
+    last_page = -(-args.rows // page_size)
+    pages = sorted({1, 10, 100, 1000, 10000, last_page // 2, last_page} & set(range(1, last_page + 1)))
+    print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10} {'speedup':>8}")
+    for page in pages:
+        cursor = ''
+        if page > 1:
+            # Cursor pointing after the last row of the previous page
+            key = queryset.values_list('created_at', 'id')[(page - 1) * page_size - 1]
+            cursor = keyset.encode_cursor(key, False)
+        assert [row['id'] for row in offset_page(page)] == [row['id'] for row in keyset_page(cursor)]
+        offset = timed(lambda: offset_page(page), args.repeat)
+        fast = timed(lambda: keyset_page(cursor), args.repeat)
+        print(f'{page:8} {offset * 1e3:10.2f} {fast * 1e3:10.2f} {offset / fast:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
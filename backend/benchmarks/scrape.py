@@ -0,0 +1,107 @@
+"""
+Local stand-in for a Prometheus server scraping /api/metrics/.
+
+Polls the endpoint at a fixed interval and prints, per route, the request
+rate and latency quantiles over the last interval, computed from counter and
+histogram deltas the way ``rate()`` and ``histogram_quantile()`` would:
+
+    API_METRICS_TOKEN=secret python -m benchmarks.scrape http://127.0.0.1:8000
+"""
+import argparse
+import os
+import re
+import time
+import urllib.request
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+def parse(text):
+    """
+    Return ``{(name, labels): value}`` from the text exposition format
+    """
+    samples = {}
+    for line in text.splitlines():
+        match = SAMPLE.match(line)
+        if match is None:
+            continue  # Comment or blank line
+        labels = tuple(sorted(LABEL.findall(match['labels'] or '')))
+        samples[(match['name'], labels)] = float(match['value'])
+    return samples
+
+
+def scrape(url, token):
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return parse(response.read().decode())
+
+
+def quantile(q, buckets):
+    """
+    Estimate a quantile from cumulative ``[(upper bound, count)]`` buckets
+    """
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if not total:
+        return None
+    rank = q * total
+    lower, below = 0.0, 0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float('inf'):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(count - below, 1)
+        lower, below = bound, count
+    return lower
+
+
+def report(previous, current, interval):
+    routes = {}
+    for (name, labels), value in current.items():
+        delta = value - previous.get((name, labels), 0)
+        labels = dict(labels)
+        key = (labels.get('route'), labels.get('method'))
+        if name == 'api_requests_total':
+            routes.setdefault(key, {'requests': 0, 'buckets': []})['requests'] += delta
+        elif name == 'api_request_duration_seconds_bucket':
+            routes.setdefault(key, {'requests': 0, 'buckets': []})['buckets'].append(
+                (float(labels['le']), delta)
+            )
+
+    print(f"{'route':28} {'method':6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for (route, method), data in sorted(routes.items()):
+        if not data['requests']:
+            continue
+        p50, p95 = (quantile(q, data['buckets']) for q in (0.5, 0.95))
+        print(f"{route:28} {method:6} {data['requests'] / interval:8.1f} "
+              f"{(p50 or 0) * 1000:8.2f} {(p95 or 0) * 1000:8.2f}")
+
+    hits = {labels: value - previous.get((name, labels), 0)
+            for (name, labels), value in current.items() if name == 'api_cache_requests_total'}
+    for cache in sorted({dict(labels)['cache'] for labels in hits}):
+        hit = sum(v for labels, v in hits.items() if dict(labels) == {'cache': cache, 'result': 'hit'})
+        miss = sum(v for labels, v in hits.items() if dict(labels) == {'cache': cache, 'result': 'miss'})
+        if hit + miss:
+            print(f'cache {cache}: {hit / (hit + miss):.1%} hit rate ({int(hit + miss)} lookups)')
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('base_url', help='server base URL, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--interval', type=float, default=5.0, help='seconds between scrapes')
+    parser.add_argument('--token', default=os.getenv('API_METRICS_TOKEN', ''), help='metrics token')
+    args = parser.parse_args()
+
+    url = args.base_url.rstrip('/') + '/api/metrics/'
+    previous = scrape(url, args.token)
+    while True:
+        time.sleep(args.interval)
+        current = scrape(url, args.token)
+        report(previous, current, args.interval)
+        previous = current
+
+
+if __name__ == '__main__':
+    main()
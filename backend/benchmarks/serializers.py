@@ -0,0 +1,59 @@
+"""
+DRF ModelSerializer versus compiled row serializers on large lists.
+
+Each timing includes the database query: model instances for DRF,
+``values_list()`` rows for the compiled path.
+"""
+import argparse
+import time
+
+from benchmarks.harness import seed, setup
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='rows per model')
+    parser.add_argument('--repeat', type=int, default=3, help='best of N runs')
+    args = parser.parse_args()
+
+    setup()
+    seed(projects=args.rows, skills=args.rows, experience=args.rows, certifications=args.rows)
+
+    from api.compiled import compile_serializer
+    from api.models import Certification, Experience, Project, Skill
+    from api.serializers import (
+        CertificationSerializer, ExperienceSerializer, ProjectSerializer, SkillSerializer
+    )
+
+    cases = [
+        (ProjectSerializer, Project),
+        (ExperienceSerializer, Experience),
+        (CertificationSerializer, Certification),
+        (SkillSerializer, Skill),
+    ]
+    print(f"{'serializer':26} {'rows':>7} {'drf ms':>9} {'compiled ms':>12} {'speedup':>8}")
+    for serializer_class, model in cases:
+        compiled = compile_serializer(serializer_class)
+        drf = timed(lambda: serializer_class(model.objects.all(), many=True).data, args.repeat)
+        fast = timed(lambda: compiled.serialize(model.objects.all()), args.repeat)
+        print(f'{serializer_class.__name__:26} {args.rows:7} {drf * 1e3:9.1f} '
+              f'{fast * 1e3:12.1f} {drf / fast:7.1f}x')
+
+    # The old SkillViewSet.list built one serializer per row
+    per_row = timed(lambda: [SkillSerializer(skill).data for skill in Skill.objects.all()], args.repeat)
+    fast = timed(lambda: compile_serializer(SkillSerializer).serialize(Skill.objects.all()), args.repeat)
+    print(f"{'SkillSerializer per row':26} {args.rows:7} {per_row * 1e3:9.1f} "
+          f'{fast * 1e3:12.1f} {per_row / fast:7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Spam screening cost with a large, recent contact table.
+
+Seeds ``--rows`` contacts and their MinHash fingerprints, all inside the
+near-duplicate window so every one is a potential candidate, and
+``--blocked`` blocked senders, then times the blocklist check for an
+unblocked sender and ``spam.screen`` for a new message and for a near
+duplicate of a stored one. Fingerprinting 1M messages takes several minutes::
+
+    python -m benchmarks.spam --rows 1000000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.harness import setup
+
+
+def latencies(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='stored contact messages')
+    parser.add_argument('--blocked', type=int, default=100_000, help='blocked senders')
+    parser.add_argument('--repeat', type=int, default=2000, help='timed calls per case')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per bulk_create')
+    args = parser.parse_args()
+
+    setup()
+    from django.utils import timezone
+
+    from api import spam
+    from api.models import BlockedSender, Contact
+    from api.seeding import generate_contacts, paragraph
+    from api.signals import bulk_changed
+
+    started = time.perf_counter()
+    rng = random.Random(0)
+    now = timezone.now()
+    contacts = generate_contacts(rng, args.rows)
+    stored = 0
+    while stored < args.rows:
+        batch = [next(contacts) for _ in range(min(args.batch_size, args.rows - stored))]
+        for contact in batch:
+            contact.created_at = now
+        keys = [spam.band_keys(spam.shingles(spam.contact_text(contact))) for contact in batch]
+        Contact.objects.bulk_create(batch)
+        spam.index(batch, keys)
+        stored += len(batch)
+    BlockedSender.objects.bulk_create(
+        BlockedSender(value=f'spammer{i}@example.com') for i in range(args.blocked)
+    )
+    bulk_changed.send(sender=BlockedSender)
+    print(f'seeded {args.rows:,} messages and {args.blocked:,} blocked senders '
+          f'in {time.perf_counter() - started:.0f}s\n')
+
+    spam.blocklist.load()
+    emails = iter(f'friend{i}@example.net' for i in range(10 ** 9))
+    stored_message = Contact.objects.order_by('?').values_list('subject', 'message')[0]
+    fresh = iter(paragraph(rng, 2) for _ in range(10 ** 9))
+
+    def screen(message, subject='Hello'):
+        return spam.screen([Contact(name='Bench', email='bench@example.net', subject=subject, message=message)])
+
+    cases = {
+        'blocklist miss': lambda: spam.blocklist.is_blocked(next(emails)),
+        'blocklist hit': lambda: spam.blocklist.is_blocked('spammer7@example.com'),
+        'screen new message': lambda: screen(next(fresh)),
+        'screen near duplicate': lambda: screen(stored_message[1] + ' Thanks!', stored_message[0]),
+    }
+    print(f"{'case':24} {'p50 us':>10} {'p99 us':>10}")
+    for name, function in cases.items():
+        p50, p99 = latencies(function, args.repeat)
+        print(f'{name:24} {p50:10.1f} {p99:10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Technology filters and facet counts: JSON scanning versus the link tables.
+
+Seeds ``--projects`` projects with the usual skewed technology lists, then
+times each case both ways. The scan loads every ``technologies`` list and
+tests it in Python, as filtering did before the Technology tables; the index
+resolves the names and reads the ``(technology, project)`` index. Each case
+returns the matching ids, or the counts per technology::
+
+    python -m benchmarks.technologies --projects 100000
+"""
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.harness import setup
+
+CASES = {
+    'all: Python, React': (['Python', 'React'], 'all'),
+    'all: Python, ONNX': (['Python', 'ONNX'], 'all'),
+    'all: Docker, Redis, AWS': (['Docker', 'Redis', 'AWS'], 'all'),
+    'any: Rust, Go': (['Rust', 'Go'], 'any'),
+}
+
+
+def timed(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--projects', type=int, default=100_000, help='projects to seed')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per case')
+    args = parser.parse_args()
+
+    setup()
+    from api import technologies
+    from api.models import Project, Technology
+    from api.seeding import seed_models
+
+    started = time.perf_counter()
+    seed_models({'projects': args.projects})
+    print(f'seeded {args.projects:,} projects and their links in {time.perf_counter() - started:.0f}s\n')
+
+    def scan(names, match):
+        keys = {name.lower() for name in names}
+        test = keys.issubset if match == 'all' else keys.intersection
+        return sorted(
+            pk for pk, values in Project.objects.values_list('pk', 'technologies').iterator(chunk_size=2000)
+            if test({value.lower() for value in values if isinstance(value, str)})
+        )
+
+    def index(names, match):
+        return sorted(technologies.filter_owners(Project.objects.all(), names, match).values_list('pk', flat=True))
+
+    def page(names, match):
+        # The first page as ProjectViewSet returns it, ids only
+        queryset = technologies.filter_owners(Project.objects.all(), names, match)
+        return list(queryset.order_by('-created_at', '-id').values_list('pk', flat=True)[:20])
+
+    def scan_facets():
+        counts = Counter()
+        for values in Project.objects.values_list('technologies', flat=True).iterator(chunk_size=2000):
+            counts.update(technologies.normalize(values).keys())
+        return dict(counts)
+
+    def index_facets():
+        return dict(Technology.objects.filter(project_count__gt=0).values_list('key', 'project_count'))
+
+    print(f"{'case':28} {'matches':>8} {'scan ms':>9} {'index ms':>9} {'page ms':>8} {'speedup':>8}")
+    for name, (names, match) in CASES.items():
+        scan_ms, expected = timed(lambda: scan(names, match), args.repeat)
+        index_ms, found = timed(lambda: index(names, match), args.repeat)
+        page_ms, _ = timed(lambda: page(names, match), args.repeat)
+        assert found == expected, name
+        print(f'{name:28} {len(found):8,} {scan_ms:9.1f} {index_ms:9.1f} {page_ms:8.2f} {scan_ms / index_ms:7.0f}x')
+
+    scan_ms, expected = timed(scan_facets, args.repeat)
+    index_ms, found = timed(index_facets, args.repeat)
+    assert found == expected
+    print(f"{'facet counts':28} {len(found):8,} {scan_ms:9.1f} {index_ms:9.1f} {'':>8} {scan_ms / index_ms:7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
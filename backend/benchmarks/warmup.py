@@ -0,0 +1,100 @@
+"""
+First-request latency of freshly started gunicorn workers, with and without
+the boot-time warm-up of api/warmup.py.
+
+For every round a one-worker gunicorn server (configured by gunicorn.conf.py,
+as deployed) is started on a seeded throwaway database and, as soon as its
+health check answers, every public read route is requested once, in a
+shuffled order: the first request each route gets after a deploy. The
+medians over all rounds are compared with the steady-state latency of the
+same routes on a server that has served them many times::
+
+    python -m benchmarks.warmup --rounds 5
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.load import prepare_database, request, server_environ, start_server
+
+ROUTES = (
+    'bootstrap', 'portfolio-summary', 'personal-info', 'about-info', 'social-links',
+    'project-list', 'project-list-featured', 'project-detail', 'skill-list',
+    'experience-list', 'certification-list', 'education-list', 'contact-list',
+)
+
+
+def timed(port, path):
+    started = time.perf_counter()
+    status = request(port, 'GET', path, None)
+    if status != 200:
+        raise RuntimeError(f'{path} returned {status}')
+    return (time.perf_counter() - started) * 1000
+
+
+def first_requests(environ, routes, port, seed):
+    """
+    Start a server and time the first request to every route, in milliseconds
+    """
+    server = start_server(environ, 1, port)
+    try:
+        order = list(routes)
+        random.Random(seed).shuffle(order)
+        return {name: timed(port, routes[name][1]) for name in order}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def steady_requests(environ, routes, port, repeats):
+    server = start_server(environ, 1, port)
+    try:
+        for name in routes:
+            timed(port, routes[name][1])
+        return {name: statistics.median(timed(port, routes[name][1]) for _ in range(repeats)) for name in routes}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5, help='server starts per mode')
+    parser.add_argument('--repeats', type=int, default=50, help='steady-state requests per route')
+    parser.add_argument('--projects', type=int, default=50, help='number of seeded projects')
+    parser.add_argument('--port', type=int, default=8765, help='port for gunicorn')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        environ = server_environ(Path(directory))
+        routes = prepare_database(environ, {
+            'projects': args.projects, 'skills': 40, 'experience': 10,
+            'certifications': 20, 'education': 3, 'contacts': 50,
+        })
+        routes = {name: routes[name] for name in ROUTES}
+        cold = {name: [] for name in routes}
+        warm = {name: [] for name in routes}
+        for seed in range(args.rounds):
+            for mode, samples in (('False', cold), ('True', warm)):
+                # The benchmark clients send Host: localhost
+                environ.update(API_WARMUP=mode, API_WARMUP_HOSTS='localhost')
+                for name, ms in first_requests(environ, routes, args.port, seed).items():
+                    samples[name].append(ms)
+            print(f'round {seed + 1}/{args.rounds} done', file=sys.stderr)
+        environ['API_WARMUP'] = 'False'
+        steady = steady_requests(environ, routes, args.port, args.repeats)
+
+    print(f"{'route':24} {'first, cold':>12} {'first, warm':>12} {'steady':>8}  (median ms)")
+    for name in routes:
+        print(f'{name:24} {statistics.median(cold[name]):12.2f} {statistics.median(warm[name]):12.2f} '
+              f'{steady[name]:8.2f}')
+    totals = [sum(statistics.median(samples[name]) for name in routes) for samples in (cold, warm)]
+    print(f"{'all routes':24} {totals[0]:12.2f} {totals[1]:12.2f} {sum(steady.values()):8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Gunicorn settings, read from the backend directory by every ``gunicorn`` run.
+
+``SERVER_MODE=asgi`` serves portfolio_backend/asgi.py with uvicorn workers,
+so the read endpoints run as the async views of api/async_views.py;
+anything else serves portfolio_backend/wsgi.py with sync workers. An
+application given on the command line still takes precedence.
+
+Every worker warms itself up (see api/warmup.py) before accepting
+connections, so the first visitors after a deploy are served as fast as
+later ones. It also starts replaying the contact buffer segments (see
+api/ingest.py) and sending the email (see api/outbox.py) that earlier
+workers left behind.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# WEB_CONCURRENCY sets the worker count, as gunicorn reads it by default
+
+if os.environ.get('SERVER_MODE', 'wsgi').lower() == 'asgi':
+    wsgi_app = 'portfolio_backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'portfolio_backend.wsgi:application'
+
+
+def post_worker_init(worker):
+    # The application, and with it Django, is loaded by now
+    from django.conf import settings
+
+    if settings.API_OUTBOX_IN_PROCESS:
+        from api.outbox import drainer
+
+        # Email queued while no worker was running
+        drainer.schedule(0)
+
+    if settings.API_CONTACT_WRITE_BEHIND:
+        from api.ingest import flush_at_start
+
+        # Contacts buffered by workers that died before flushing them
+        flush_at_start()
+
+    if settings.API_WARMUP:
+        from api.warmup import warm_up
+
+        try:
+            warm_up()
+        except Exception:
+            # A worker that failed to warm up still serves, only slower
+            worker.log.exception('Warm-up failed')
@@ -7,5 +7,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'portfolio_backend.settings')
+# Serve the read endpoints with the async views (see api/async_views.py)
+os.environ.setdefault('API_ASYNC_VIEWS', 'True')
+# Requests get a thread each, so persistent connections would pile up
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -34,9 +34,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'api.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -78,6 +80,107 @@ if os.getenv('DATABASE_URL'):
     import dj_database_url
     DATABASES['default'] = dj_database_url.parse(os.getenv('DATABASE_URL'))
 
+# Keep each worker's connection between requests, so the one opened by the
+# warm-up (api/warmup.py) is still there for the first visitor. Django's
+# async views use a thread per request, so portfolio_backend/asgi.py sets 0.
+DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', '600'))
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+# Cache
+# The API snapshot cache keeps its content version here, so the backend must be
+# shared by all gunicorn workers; the file cache needs no extra service.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+    }
+}
+
+# Runs the tests against a temporary cache (see api/testing.py)
+TEST_RUNNER = 'api.testing.TestRunner'
+
+# Serve repeated API reads from stored response bytes (see api/materialized.py)
+API_MATERIALIZED_RESPONSES = os.getenv('API_MATERIALIZED_RESPONSES', 'True') == 'True'
+
+# Server-Timing header and per-request timing log line (see api/middleware.py)
+API_SERVER_TIMING = os.getenv('API_SERVER_TIMING', 'False') == 'True'
+
+# Route the public read endpoints to the async views of api/async_views.py;
+# portfolio_backend/asgi.py turns this on
+API_ASYNC_VIEWS = os.getenv('API_ASYNC_VIEWS', 'False') == 'True'
+
+# Compile URL patterns, open the database connection and fill the response
+# caches of every gunicorn worker before it accepts traffic (see
+# api/warmup.py). Cached responses are per host, so list the public ones.
+API_WARMUP = os.getenv('API_WARMUP', 'True') == 'True'
+API_WARMUP_HOSTS = [
+    host for host in os.getenv('API_WARMUP_HOSTS', os.getenv('RENDER_EXTERNAL_HOSTNAME', 'localhost')).split(',')
+    if host
+]
+
+# Per-route request metrics, aggregated across workers through API_METRICS_DIR
+# and served to scrapers presenting API_METRICS_TOKEN (see api/metrics.py)
+API_METRICS = os.getenv('API_METRICS', 'True') == 'True'
+API_METRICS_DIR = os.getenv('API_METRICS_DIR', str(BASE_DIR / '.metrics'))
+API_METRICS_TOKEN = os.getenv('API_METRICS_TOKEN', '')
+
+# Deliver queued email from a thread of each web worker (see api/outbox.py).
+# Turn off where a separate ``manage.py run_outbox`` worker runs.
+API_OUTBOX_IN_PROCESS = os.getenv('API_OUTBOX_IN_PROCESS', 'True') == 'True'
+
+# Write-behind contact ingestion: submissions are fsynced to a local buffer and
+# inserted in batches of up to API_CONTACT_FLUSH_SIZE, at most
+# API_CONTACT_FLUSH_INTERVAL seconds after they arrive (see api/ingest.py)
+API_CONTACT_WRITE_BEHIND = os.getenv('API_CONTACT_WRITE_BEHIND', 'False') == 'True'
+API_CONTACT_BUFFER_DIR = os.getenv('API_CONTACT_BUFFER_DIR', str(BASE_DIR / '.buffer'))
+API_CONTACT_FLUSH_SIZE = int(os.getenv('API_CONTACT_FLUSH_SIZE', '500'))
+API_CONTACT_FLUSH_INTERVAL = float(os.getenv('API_CONTACT_FLUSH_INTERVAL', '1.0'))
+
+# Read contact messages older than API_CONTACT_ARCHIVE_DAYS are moved by
+# archive_contacts into compressed segments in API_CONTACT_ARCHIVE_DIR, which
+# must be on persistent storage (see api/archive.py)
+API_CONTACT_ARCHIVE_DIR = os.getenv('API_CONTACT_ARCHIVE_DIR', str(BASE_DIR / '.archive'))
+API_CONTACT_ARCHIVE_DAYS = int(os.getenv('API_CONTACT_ARCHIVE_DAYS', '365'))
+
+# Bearer token for /api/export/ besides staff sessions; empty disables it
+# (see api/export.py)
+API_EXPORT_TOKEN = os.getenv('API_EXPORT_TOKEN', '')
+
+# Token buckets shared by all workers of this machine (see api/throttling.py)
+API_THROTTLE_DB = os.getenv('API_THROTTLE_DB', str(BASE_DIR / '.throttle' / 'buckets.sqlite3'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.outbox': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.ingest': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'api.warmup': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -121,7 +224,21 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.JSONRenderer',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'PAGE_SIZE': 20,
+    # Token buckets for views with a throttle_scope (see api/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.ClientIPThrottle',
+        'api.throttling.EmailThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'contact-ip': os.getenv('CONTACT_IP_RATE', '5/minute'),
+        'contact-email': os.getenv('CONTACT_EMAIL_RATE', '3/hour'),
+    },
+    # Reverse proxies in front of gunicorn. With one or more, client
+    # addresses come from the X-Forwarded-For entry the outermost one added;
+    # by default there are none and X-Forwarded-For, which any client can
+    # send, is ignored.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
 }
 
 # CORS settings
@@ -153,7 +270,7 @@ CORS_ALLOWED_HEADERS = [
 ]
 
 # Email settings (for contact form)
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', '587'))
 EMAIL_USE_TLS = True
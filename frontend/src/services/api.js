@@ -81,6 +81,12 @@ class ApiService {
   static async getPortfolioSummary() {
     return this.request('/portfolio-summary/');
   }
+
+  // Every section in one request; each key has the body of its own endpoint
+  static async getBootstrap(sections = []) {
+    const query = sections.length ? `?sections=${sections.join(',')}` : '';
+    return this.request(`/bootstrap/${query}`);
+  }
 }
 
 export default ApiService;